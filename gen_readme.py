@@ -4,17 +4,7 @@ def read_mermaid_file(file_path):
     with open(file_path, 'r') as file:
         return file.read()
 
-def generate_readme():
-    # File paths
-    pie_chart_file = 'type_en_pie_chart.mmd'
-    dept_line_chart_file = 'dept_releases_line_chart.mmd'
-    topic_line_chart_file = 'topic_en_line_chart.mmd'
-
-    # Read Mermaid.js code from files
-    pie_chart_code = read_mermaid_file(pie_chart_file)
-    dept_line_chart_code = read_mermaid_file(dept_line_chart_file)
-    topic_line_chart_code = read_mermaid_file(topic_line_chart_file)
-
+def readme_content(pie_chart_code, dept_line_chart_code, topic_line_chart_code):
     # Start building the README content
     readme_content = '# Government of Canada News Releases Analysis\n\n'
     readme_content += 'This repository contains analyses of Government of Canada news releases. The following charts provide insights into the data.\n\n'
@@ -36,12 +26,27 @@ def generate_readme():
     readme_content += '```mermaid\n'
     readme_content += topic_line_chart_code.strip() + '\n'
     readme_content += '```\n\n'
+    return readme_content
 
+def write_readme(content):
     # Save the README.md file
     with open('README.md', 'w') as readme_file:
-        readme_file.write(readme_content)
+        readme_file.write(content)
 
     print("README.md has been generated successfully.")
 
+def generate_readme():
+    # File paths
+    pie_chart_file = 'type_en_pie_chart.mmd'
+    dept_line_chart_file = 'dept_releases_line_chart.mmd'
+    topic_line_chart_file = 'topic_en_line_chart.mmd'
+
+    # Read Mermaid.js code from files
+    pie_chart_code = read_mermaid_file(pie_chart_file)
+    dept_line_chart_code = read_mermaid_file(dept_line_chart_file)
+    topic_line_chart_code = read_mermaid_file(topic_line_chart_file)
+
+    write_readme(readme_content(pie_chart_code, dept_line_chart_code, topic_line_chart_code))
+
 if __name__ == '__main__':
     generate_readme()
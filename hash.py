@@ -1,19 +1,12 @@
-import csv
-import hashlib
+import os
+
+from scripts.row_hashing import hash_frame, read_news_csv
 
 input_file = 'combined_news (3).csv'
 output_file = 'combined_news.csv'
 
-def hash_row(row):
-    row_str = ','.join(row.values())
-    return hashlib.md5(row_str.encode()).hexdigest()
-
-with open(input_file, mode='r', newline='') as infile, open(output_file, mode='w', newline='') as outfile:
-    reader = csv.DictReader(infile)
-    fieldnames = reader.fieldnames + ['hash']
-    writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-    writer.writeheader()
-
-    for row in reader:
-        row['hash'] = hash_row(row)
-        writer.writerow(row)
+if __name__ == '__main__':
+    # Hash the same way update_news_data.py does so backfilled rows dedupe against new ones
+    df = read_news_csv(input_file)
+    df['hash'] = hash_frame(df.drop(columns=['hash'], errors='ignore'), workers=os.cpu_count() or 1)
+    df.to_csv(output_file, index=False)
@@ -2,7 +2,9 @@ import json
 import pandas as pd
 import re
 import requests
-import hashlib
+
+from scripts.news_pairing import normalize_minister_name, pair_feeds
+from scripts.row_hashing import hash_frame
 
 # Function to fetch data from a URL
 def fetch_json_data(url):
@@ -47,19 +49,6 @@ def extract_title_url(entry):
     entry['TITLE_URL_FR'] = clean_text(title_url_fr)
     return entry
 
-# Function to normalize Minister names
-def normalize_minister_name(name):
-    if name.startswith("Hon. "):
-        return name.replace("Hon. ", "")
-    elif name.startswith("L'hon. "):
-        return name.replace("L'hon. ", "")
-    return name
-
-# Function to compute MD5 hash of a row
-def hash_row(row):
-    row_str = ','.join(row.astype(str).fillna(''))
-    return hashlib.md5(row_str.encode()).hexdigest()
-
 # Main function to fetch data, process it, and return the DataFrame
 def main():
     url_en = "https://www.canada.ca/en/news.datatable.json"
@@ -87,39 +76,35 @@ def main():
             entry[key] = clean_text(entry[key])
     
     # Combine the data into a single DataFrame based on timestamp and minister name
+    pairs, unmatched_en, unmatched_fr = pair_feeds(news_en, news_fr)
+    if unmatched_en or unmatched_fr:
+        print(f"Unpaired feed entries: {len(unmatched_en)} English, {len(unmatched_fr)} French")
     combined_data = []
-    for en in news_en:
-        match_fr = None
-        for fr in news_fr:
-            if (en.get("PUBDATE") == fr.get("PUBDATE") and
-                normalize_minister_name(en.get("MINISTER", "")) == normalize_minister_name(fr.get("MINISTER", ""))):
-                match_fr = fr
-                break
-        if match_fr:
-            combined_entry = {
-                "PUBDATE": en.get("PUBDATE", ""),
-                "TITLE_EN": en.get("TITLE", ""),
-                "TEASER_EN": en.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_EN": en.get("AUDIENCE", ""),
-                "TYPE_EN": en.get("TYPE", ""),
-                "DEPT_EN": en.get("DEPT", ""),
-                "LOCATION_EN": en.get("LOCATION", ""),
-                "MINISTER_EN": en.get("MINISTER", ""),
-                "TOPIC_EN": en.get("TOPIC", ""),
-                "SUBJECT_EN": en.get("SUBJECT", ""),
-                "TITLE_FR": match_fr.get("TITLE", ""),
-                "TEASER_FR": match_fr.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
-                "TYPE_FR": match_fr.get("TYPE", ""),
-                "DEPT_FR": match_fr.get("DEPT", ""),
-                "LOCATION_FR": match_fr.get("LOCATION", ""),
-                "MINISTER_FR": match_fr.get("MINISTER", ""),
-                "TOPIC_FR": match_fr.get("TOPIC", ""),
-                "SUBJECT_FR": match_fr.get("SUBJECT", "")
-            }
-            combined_data.append(extract_title_url(combined_entry))
+    for en, match_fr in pairs:
+        combined_entry = {
+            "PUBDATE": en.get("PUBDATE", ""),
+            "TITLE_EN": en.get("TITLE", ""),
+            "TEASER_EN": en.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_EN": en.get("AUDIENCE", ""),
+            "TYPE_EN": en.get("TYPE", ""),
+            "DEPT_EN": en.get("DEPT", ""),
+            "LOCATION_EN": en.get("LOCATION", ""),
+            "MINISTER_EN": en.get("MINISTER", ""),
+            "TOPIC_EN": en.get("TOPIC", ""),
+            "SUBJECT_EN": en.get("SUBJECT", ""),
+            "TITLE_FR": match_fr.get("TITLE", ""),
+            "TEASER_FR": match_fr.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
+            "TYPE_FR": match_fr.get("TYPE", ""),
+            "DEPT_FR": match_fr.get("DEPT", ""),
+            "LOCATION_FR": match_fr.get("LOCATION", ""),
+            "MINISTER_FR": match_fr.get("MINISTER", ""),
+            "TOPIC_FR": match_fr.get("TOPIC", ""),
+            "SUBJECT_FR": match_fr.get("SUBJECT", "")
+        }
+        combined_data.append(extract_title_url(combined_entry))
     
     # Create a DataFrame
     df_combined = pd.DataFrame(combined_data)
@@ -159,11 +144,11 @@ if __name__ == "__main__":
             # Check if 'hash' column exists in the existing data
             if 'hash' not in existing_data.columns:
                 # Compute the hash for the existing data
-                existing_data['hash'] = existing_data.apply(hash_row, axis=1)
+                existing_data['hash'] = hash_frame(existing_data)
                 print("Backfilled 'hash' column for existing data.")
             
             # Compute the hash for the new data
-            new_data['hash'] = new_data.apply(hash_row, axis=1)
+            new_data['hash'] = hash_frame(new_data)
             
             # Combine data
             combined_data = pd.concat([existing_data, new_data], ignore_index=True)
@@ -175,7 +160,7 @@ if __name__ == "__main__":
             # If the file does not exist, use new data as the combined data
             combined_data = new_data
             # Compute the hash for the new data
-            combined_data['hash'] = combined_data.apply(hash_row, axis=1)
+            combined_data['hash'] = hash_frame(combined_data)
             print("Created new data with 'hash' column.")
         
         # Sort by PUBDATE descending
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Adaptive (AIMD) limit on the requests the scrapers have in flight to canada.ca.
+
+CONCURRENCY is one limit shared by every session that mounts a LimitedAdapter,
+whichever thread, engine or scraper sends the request. Each response that comes
+back while the limit is in use raises the limit by 1/limit, about one more
+request per round trip, as long as latency is not climbing: the recent average
+(of the last few responses) within a quarter of the long-run one. Queueing at
+the server shows up as climbing latency before it starts refusing requests.
+
+A 429 or 503 halves the limit, and an error or other 5xx cuts it by a quarter,
+at most once per round of requests sent before the cut. A throttled response
+also pauses every new request until its Retry-After (or 1, 2, 4... seconds) has
+passed; the adapter then sends it again, up to three times.
+With adaptive=False the limit stays fixed (the worker pools cap the requests),
+and only the throttled request waits before it is sent again.
+
+The limit is held from sending a request until its response headers are in (the
+whole body, unless the request streams).
+"""
+
+import csv
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from urllib3.util.retry import Retry
+
+from scripts.http_pool import CountingAdapter
+
+THROTTLE_STATUSES = {429, 503}
+LATENCY_TOLERANCE = 1.25
+LATENCY_SLACK = 0.005  # seconds
+MAX_PAUSE = 60.0
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self.configure()
+
+    def configure(self, initial: int = 8, maximum: int = 32, minimum: int = 1, adaptive: bool = True) -> None:
+        # Starts a new run: the limit, its bounds and the counters.
+        with self._cond:
+            self.adaptive = adaptive
+            self.minimum = max(minimum, 1)
+            self.maximum = max(maximum, self.minimum)
+            self.initial = min(max(initial, self.minimum), self.maximum)
+            self.limit = float(self.initial)
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.peak_limit = self.initial
+            # Moving averages of the latency over the last few and the last hundred or so responses
+            self.recent: Optional[float] = None
+            self.long_run: Optional[float] = None
+            self.paused_until = 0.0
+            self.last_cut = 0.0
+            self.consecutive_throttles = 0
+            self.throttled = self.errors = self.cuts = 0
+            self.started = time.monotonic()
+            # (seconds since configure, limit, requests in flight, event)
+            self.trace: List[Tuple[float, int, int, str]] = [(0.0, self.initial, 0, "start")]
+            self._cond.notify_all()
+
+    def ceiling(self) -> float:
+        return int(self.limit) if self.adaptive else float("inf")
+
+    def slots(self) -> int:
+        # Requests let through at once just now, for sizing the work kept under way.
+        with self._cond:
+            return int(self.limit) if self.adaptive else self.maximum
+
+    def acquire(self) -> float:
+        # Waits for a slot (and out any pause); returns the time the request started.
+        with self._cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < self.ceiling():
+                    break
+                self._cond.wait(pause if pause > 0 else None)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return time.monotonic()
+
+    def release(self, started: float, status: Optional[int] = None, retry_after: Optional[float] = None) -> float:
+        # status None: the request raised. Returns how long to wait before sending a throttled request again.
+        now = time.monotonic()
+        latency = now - started
+        with self._cond:
+            full = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self.consecutive_throttles += 1
+                pause = min(retry_after if retry_after is not None else 2.0 ** (self.consecutive_throttles - 1), MAX_PAUSE)
+                if self.adaptive:
+                    self.paused_until = max(self.paused_until, now + pause)
+                self._cut(0.5, started, now, f"HTTP {status}")
+                self._cond.notify_all()
+                return pause
+            elif status is None or status >= 500:
+                self.errors += 1
+                self._cut(0.75, started, now, "error" if status is None else f"HTTP {status}")
+            else:
+                self.consecutive_throttles = 0
+                self.recent = latency if self.recent is None else 0.7 * self.recent + 0.3 * latency
+                self.long_run = latency if self.long_run is None else 0.98 * self.long_run + 0.02 * latency
+                healthy = self.recent <= LATENCY_TOLERANCE * self.long_run + LATENCY_SLACK
+                if self.adaptive and full and healthy and self.limit < self.maximum:
+                    before = int(self.limit)
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    if int(self.limit) != before:
+                        self.peak_limit = max(self.peak_limit, int(self.limit))
+                        self.trace.append((now - self.started, int(self.limit), self.in_flight, "raise"))
+            self._cond.notify_all()
+            return 0.0
+
+    def _cut(self, factor: float, started: float, now: float, reason: str) -> None:
+        # Responses to requests sent before the last cut say nothing about the limit since.
+        if not self.adaptive or started < self.last_cut:
+            return
+        before = int(self.limit)
+        self.limit = max(float(self.minimum), self.limit * factor)
+        self.last_cut = now
+        self.cuts += 1
+        self.trace.append((now - self.started, int(self.limit), self.in_flight, reason))
+        logging.info("Concurrency %s -> %s after %s.", before, int(self.limit), reason)
+
+    def summary(self) -> str:
+        with self._cond:
+            if not self.adaptive:
+                return (
+                    f"fixed; at most {self.peak_in_flight} requests in flight, "
+                    f"{self.throttled} throttled responses, {self.errors} errors"
+                )
+            return (
+                f"started at {self.initial}, peaked at {self.peak_limit}, ended at {int(self.limit)} "
+                f"(at most {self.peak_in_flight} requests in flight); {self.throttled} throttled responses, "
+                f"{self.errors} errors, {self.cuts} cuts"
+            )
+
+    def trace_text(self, points: int = 16) -> str:
+        # An even sample of the trace, with every cut, for the run log.
+        with self._cond:
+            trace = list(self.trace)
+        step = max(len(trace) // points, 1)
+        sample = [point for index, point in enumerate(trace) if index % step == 0 or point[3] not in ("raise",)]
+        if sample[-1] is not trace[-1]:
+            sample.append(trace[-1])
+        return " ".join(
+            f"{seconds:.1f}s:{limit}" + ("" if event in ("raise", "start") else f"({event})")
+            for seconds, limit, _, event in sample
+        )
+
+    def write_trace(self, path: str) -> None:
+        with self._cond:
+            trace = list(self.trace)
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["seconds", "limit", "in_flight", "event"])
+            writer.writerows((f"{seconds:.3f}", limit, in_flight, event) for seconds, limit, in_flight, event in trace)
+
+
+CONCURRENCY = AdaptiveLimiter()
+
+
+class LimitedAdapter(CountingAdapter):
+    # Every request waits for a CONCURRENCY slot; a throttled one is sent again after the pause.
+    throttle_retries = 3
+
+    def send(self, request, *args, **kwargs):
+        attempt = 0
+        while True:
+            started = CONCURRENCY.acquire()
+            try:
+                response = super().send(request, *args, **kwargs)
+            except Exception:
+                CONCURRENCY.release(started)
+                raise
+            pause = CONCURRENCY.release(
+                started, response.status_code, retry_after_seconds(response.headers.get("Retry-After"))
+            )
+            if response.status_code not in THROTTLE_STATUSES or attempt >= self.throttle_retries:
+                return response
+            attempt += 1
+            response.close()
+            if not CONCURRENCY.adaptive:
+                time.sleep(pause)
+
+
+def limited_adapter() -> LimitedAdapter:
+    # urllib3 retries the server errors; 429 and 503 (with or without Retry-After) come back to
+    # the adapter, so the limiter sees them.
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=False,
+    )
+    return LimitedAdapter(max_retries=retry)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Quote and image counts per article, kept beside combined_news.csv instead of in it.
+
+data/article_counts.csv has one line per article hash: hash, QUOTE_COUNT and
+IMAGE_COUNT. The quote extractor appends a line for each article whose counts
+changed, so combined_news.csv is written by ingestion (update_news_data.py)
+alone. A later line for a hash overrides the earlier ones. Once more than half
+the lines are overridden, or belong to articles no longer in the news, the file
+is compacted: rewritten once, sorted by hash.
+
+Readers join the counts in when they need them:
+
+    counts = ArticleCounts()
+    counts.get(row["hash"])          # ArticleCount(quotes=2, images=1), or None
+    for row in counts.join(news_rows):
+        row["QUOTE_COUNT"]           # "" for articles not extracted yet
+
+Summarize the table:                       python -m scripts.article_counts
+Move the count columns out of the news CSV: python -m scripts.article_counts migrate
+"""
+
+import argparse
+import csv
+import os
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+ARTICLE_COUNTS_PATH = os.path.join("data", "article_counts.csv")
+COUNT_FIELDS = ["QUOTE_COUNT", "IMAGE_COUNT"]
+HEADER = ["hash"] + COUNT_FIELDS
+
+
+class ArticleCount(NamedTuple):
+    quotes: int
+    images: int
+
+
+class ArticleCounts:
+    def __init__(self, path: str = ARTICLE_COUNTS_PATH) -> None:
+        self.path = path
+        self.counts: Dict[str, ArticleCount] = {}
+        self.lines = 0
+        self.torn = False
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as fh:
+                for row in csv.DictReader(fh):
+                    try:
+                        self.counts[row["hash"]] = ArticleCount(int(row["QUOTE_COUNT"]), int(row["IMAGE_COUNT"]))
+                    except (KeyError, TypeError, ValueError):
+                        # A line cut short by a crash; the next update compacts it away.
+                        self.torn = True
+                        break
+                    self.lines += 1
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def get(self, article_hash: str) -> Optional[ArticleCount]:
+        return self.counts.get(article_hash)
+
+    def join(self, rows: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        # The rows with QUOTE_COUNT and IMAGE_COUNT added, one at a time.
+        for row in rows:
+            count = self.counts.get(row.get("hash", ""))
+            yield {
+                **row,
+                "QUOTE_COUNT": "" if count is None else str(count.quotes),
+                "IMAGE_COUNT": "" if count is None else str(count.images),
+            }
+
+    def update(self, counts: Dict[str, ArticleCount], current: Optional[Iterable[str]] = None) -> int:
+        # Appends the counts that changed; current, when given, is every hash still in the news.
+        # Returns the number of articles whose counts changed.
+        changed = {key: count for key, count in counts.items() if self.counts.get(key) != count}
+        self.counts.update(changed)
+        stale = set(self.counts) - set(current) if current is not None else set()
+        for key in stale:
+            del self.counts[key]
+        if stale or self.torn or self.lines + len(changed) > 2 * max(len(self.counts), 1):
+            self.compact()
+        elif changed:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh, lineterminator="\n")
+                if new_file:
+                    writer.writerow(HEADER)
+                writer.writerows((key, count.quotes, count.images) for key, count in changed.items())
+            self.lines += len(changed)
+        return len(changed)
+
+    def compact(self) -> None:
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(f"{self.path}.tmp", "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh, lineterminator="\n")
+            writer.writerow(HEADER)
+            writer.writerows((key, count.quotes, count.images) for key, count in sorted(self.counts.items()))
+        os.replace(f"{self.path}.tmp", self.path)
+        self.lines = len(self.counts)
+        self.torn = False
+
+
+def migrate(counts: ArticleCounts, news_path: str) -> int:
+    # Moves the count columns an older extractor wrote into the news CSV over to the table.
+    # Returns the number of articles whose counts were taken.
+    with open(news_path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+    if not any(field in fieldnames for field in COUNT_FIELDS):
+        return 0
+    taken = {}
+    for row in rows:
+        try:
+            taken[row["hash"]] = ArticleCount(int(row["QUOTE_COUNT"]), int(row["IMAGE_COUNT"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    counts.update(taken)
+    kept = [field for field in fieldnames if field not in COUNT_FIELDS]
+    with open(f"{news_path}.tmp", "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=kept, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(f"{news_path}.tmp", news_path)
+    return len(taken)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize the article count table, or fill it from the news CSV.")
+    parser.add_argument("command", nargs="?", choices=["stats", "migrate"], default="stats")
+    parser.add_argument("--counts", default=ARTICLE_COUNTS_PATH)
+    parser.add_argument("--input", default="combined_news.csv")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    counts = ArticleCounts(args.counts)
+    if args.command == "migrate":
+        print(f"Moved the counts of {migrate(counts, args.input)} articles from {args.input} to {args.counts}")
+    else:
+        quotes = sum(1 for count in counts.counts.values() if count.quotes > 0)
+        images = sum(1 for count in counts.counts.values() if count.images > 0)
+        print(
+            f"{len(counts)} articles in {counts.lines} lines: {quotes} with quotes, {images} with images "
+            f"({sum(count.quotes for count in counts.counts.values())} quotes, "
+            f"{sum(count.images for count in counts.counts.values())} images)"
+        )
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Rate- and concurrency-limited HTTP GETs for asyncio code.
+
+AsyncFetcher runs each request as an asyncio task under three limits: a global
+cap on requests in flight, a cap per host, and a requests-per-second rate. The
+requests themselves go through a blocking fetch function (a requests session with
+its retry adapter) on a thread pool sized to the global cap, so the scrapers keep
+one HTTP stack and no extra dependency.
+"""
+
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float) -> None:
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_start = 0.0
+
+    async def wait(self) -> None:
+        # Hands out evenly spaced start times; the event loop is single-threaded,
+        # so reserving a slot needs no lock.
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.next_start)
+        self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class AsyncFetcher:
+    def __init__(
+        self,
+        fetch: Callable[..., requests.Response],
+        max_concurrency: int = 8,
+        per_host: int = 8,
+        requests_per_second: float = 0,
+    ) -> None:
+        self.fetch = fetch
+        self.max_concurrency = max(max_concurrency, 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self.in_flight = asyncio.Semaphore(self.max_concurrency)
+        self.per_host: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(max(per_host, 1)))
+        self.rate = RateLimiter(requests_per_second)
+
+    async def run(self, url: str, call: Callable[[], T]) -> T:
+        # Runs a blocking request to url (a streamed download, say) on the pool, under the same
+        # limits as get(). The host slot is taken first, so requests queued for a busy host do
+        # not hold global slots.
+        async with self.per_host[urlparse(url).netloc]:
+            async with self.in_flight:
+                await self.rate.wait()
+                return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        # Keyword arguments (request headers, say) go to the fetch function.
+        return await self.run(url, partial(self.fetch, url, **kwargs))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import csv, json, re
+import argparse, csv, json, re, sys
 from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
@@ -9,6 +9,9 @@ NEWS_CSV = ROOT / "combined_news.csv"
 QUOTES_CSV = ROOT / "combined_news_quotes.csv"
 IMAGES_CSV = ROOT / "combined_news_images.csv"
 OUT_JSON = ROOT / "docs" / "search-data.json"
+sys.path.insert(0, str(ROOT))
+from scripts.news_store import load_rows, open_store
+
 RAW_BASE = "https://raw.githubusercontent.com/PatLittle/GC-News-Nouvelles-GC/main/"
 
 EXCLUDED_IMAGE_FILENAMES = {
@@ -63,52 +66,83 @@ def parse_speaker_title_org(raw_speaker, raw_org, quote_text):
         return sp, org, ""
     return sp, org, ""
 
-news_rows, quote_rows, image_rows = rows(NEWS_CSV), rows(QUOTES_CSV), rows(IMAGES_CSV)
-articles={}
-for r in news_rows:
-    h=norm(r.get('hash') or r.get('HASH'))
-    if not h: continue
-    articles[h]={"hash":h,"title":norm(r.get('TITLE_TEXT_EN') or r.get('TITLE_EN')),"url":norm(r.get('TITLE_URL_EN') or r.get('URL')),
-                 "date":parse_date(r.get('PUBDATE') or r.get('DATE')),"dept_en":norm(r.get('DEPT_EN')),"type_en":norm(r.get('TYPE_EN')),
-                 "topic_en":split_list(r.get('TOPIC_EN')),"subject_en":split_list(r.get('SUBJECT_EN'))}
-
-quotes=[]; images=[]; qidx=defaultdict(list); iidx=defaultdict(list)
-for i,r in enumerate(quote_rows):
-    h=norm(r.get('hash') or r.get('HASH')); a=articles.get(h,{})
-    qt=norm(r.get('QUOTE_EN') or r.get('QUOTE_TEXT') or r.get('TEXT'))
-    sp,title,org=parse_speaker_title_org(r.get('SPEAKER_NAME_EN') or r.get('SPEAKER_EN'), r.get('SPEAKER_ORGANIZATION_EN') or r.get('ORG'), qt)
-    sp = strip_honorifics(sp)
-    raw_title = norm(r.get('SPEAKER_TITLE_EN'))
-    if raw_title:
-        title = raw_title
-    qid=norm(r.get('id')) or f"q{i}"
-    q={"id":qid,"hash":h,"quote_text":qt,"speaker":sp,"speaker_title":title,"org":org,
-       "date":a.get('date',parse_date(r.get('PUBDATE'))),"dept_en":a.get('dept_en',''),"type_en":a.get('type_en',''),
-       "topic_en":a.get('topic_en',[]),"subject_en":a.get('subject_en',[]),"article_title":a.get('title',''),"article_url":a.get('url','')}
-    quotes.append(q)
-    for t in tokenize(qt,sp,title,org,q['dept_en']," ".join(q['topic_en'])," ".join(q['subject_en'])): qidx[t].append(q['id'])
-
-for i,r in enumerate(image_rows):
-    h=norm(r.get('hash') or r.get('HASH')); a=articles.get(h,{})
-    fp=norm(r.get('FILE_PATH')); ext=fp.rsplit('.',1)[-1].lower() if '.' in fp else ''
-    if fp.rsplit('/',1)[-1] in EXCLUDED_IMAGE_FILENAMES:
-        continue
-    iid=norm(r.get('id')) or f"img{i}"
-    im={"id":iid,"hash":h,"alt_text":norm(r.get('ALT_TEXT_EN') or r.get('ALT_TEXT')),"file_type":ext,"file_path":fp,"url":f"{RAW_BASE}{fp}" if fp else "",
-        "date":a.get('date',parse_date(r.get('PUBDATE'))),"dept_en":a.get('dept_en',''),"type_en":a.get('type_en',''),
-        "topic_en":a.get('topic_en',[]),"subject_en":a.get('subject_en',[]),"article_title":a.get('title',''),"article_url":a.get('url','')}
-    images.append(im)
-    for t in tokenize(im['alt_text'],im['file_type'],im['dept_en']," ".join(im['topic_en'])," ".join(im['subject_en'])): iidx[t].append(im['id'])
-
-facets={
-"dept_en":sorted({x['dept_en'] for x in quotes+images if x.get('dept_en')}),
-"topic_en":sorted({t for x in quotes+images for t in x.get('topic_en',[])}),
-"subject_en":sorted({s for x in quotes+images for s in x.get('subject_en',[])}),
-"speaker":sorted({x['speaker'] for x in quotes if x.get('speaker')}),
-"org":sorted({x['org'] for x in quotes if x.get('org')}),
-"file_type":sorted({x['file_type'] for x in images if x.get('file_type')})
-}
-payload={"meta":{"generated_at_utc":datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00','Z'),"counts":{"articles":len(articles),"quotes":len(quotes),"images":len(images)}},"articles":list(articles.values()),"quotes":quotes,"images":images,"facets":facets,"indexes":{"quote_tokens":dict(qidx),"image_tokens":dict(iidx)}}
-OUT_JSON.parent.mkdir(parents=True,exist_ok=True)
-OUT_JSON.write_text(json.dumps(payload,ensure_ascii=False,separators=(',',':')),encoding='utf-8')
-print(f"Wrote {OUT_JSON} with {len(quotes)} quotes and {len(images)} images")
+def build_search_data(news_rows, quote_rows, image_rows):
+    articles={}
+    for r in news_rows:
+        h=norm(r.get('hash') or r.get('HASH'))
+        if not h: continue
+        articles[h]={"hash":h,"title":norm(r.get('TITLE_TEXT_EN') or r.get('TITLE_EN')),"url":norm(r.get('TITLE_URL_EN') or r.get('URL')),
+                     "date":parse_date(r.get('PUBDATE') or r.get('DATE')),"dept_en":norm(r.get('DEPT_EN')),"type_en":norm(r.get('TYPE_EN')),
+                     "topic_en":split_list(r.get('TOPIC_EN')),"subject_en":split_list(r.get('SUBJECT_EN'))}
+
+    quotes=[]; images=[]; qidx=defaultdict(list); iidx=defaultdict(list)
+    for i,r in enumerate(quote_rows):
+        h=norm(r.get('hash') or r.get('HASH')); a=articles.get(h,{})
+        qt=norm(r.get('QUOTE_EN') or r.get('QUOTE_TEXT') or r.get('TEXT'))
+        sp,title,org=parse_speaker_title_org(r.get('SPEAKER_NAME_EN') or r.get('SPEAKER_EN'), r.get('SPEAKER_ORGANIZATION_EN') or r.get('ORG'), qt)
+        sp = strip_honorifics(sp)
+        raw_title = norm(r.get('SPEAKER_TITLE_EN'))
+        if raw_title:
+            title = raw_title
+        qid=norm(r.get('id')) or f"q{i}"
+        q={"id":qid,"hash":h,"quote_text":qt,"speaker":sp,"speaker_title":title,"org":org,
+           "date":a.get('date',parse_date(r.get('PUBDATE'))),"dept_en":a.get('dept_en',''),"type_en":a.get('type_en',''),
+           "topic_en":a.get('topic_en',[]),"subject_en":a.get('subject_en',[]),"article_title":a.get('title',''),"article_url":a.get('url','')}
+        quotes.append(q)
+        for t in tokenize(qt,sp,title,org,q['dept_en']," ".join(q['topic_en'])," ".join(q['subject_en'])): qidx[t].append(q['id'])
+
+    for i,r in enumerate(image_rows):
+        h=norm(r.get('hash') or r.get('HASH')); a=articles.get(h,{})
+        fp=norm(r.get('FILE_PATH')); ext=fp.rsplit('.',1)[-1].lower() if '.' in fp else ''
+        if fp.rsplit('/',1)[-1] in EXCLUDED_IMAGE_FILENAMES:
+            continue
+        iid=norm(r.get('id')) or f"img{i}"
+        im={"id":iid,"hash":h,"alt_text":norm(r.get('ALT_TEXT_EN') or r.get('ALT_TEXT')),"file_type":ext,"file_path":fp,"url":f"{RAW_BASE}{fp}" if fp else "",
+            "date":a.get('date',parse_date(r.get('PUBDATE'))),"dept_en":a.get('dept_en',''),"type_en":a.get('type_en',''),
+            "topic_en":a.get('topic_en',[]),"subject_en":a.get('subject_en',[]),"article_title":a.get('title',''),"article_url":a.get('url','')}
+        images.append(im)
+        for t in tokenize(im['alt_text'],im['file_type'],im['dept_en']," ".join(im['topic_en'])," ".join(im['subject_en'])): iidx[t].append(im['id'])
+
+    facets={
+    "dept_en":sorted({x['dept_en'] for x in quotes+images if x.get('dept_en')}),
+    "topic_en":sorted({t for x in quotes+images for t in x.get('topic_en',[])}),
+    "subject_en":sorted({s for x in quotes+images for s in x.get('subject_en',[])}),
+    "speaker":sorted({x['speaker'] for x in quotes if x.get('speaker')}),
+    "org":sorted({x['org'] for x in quotes if x.get('org')}),
+    "file_type":sorted({x['file_type'] for x in images if x.get('file_type')})
+    }
+    return {"articles":articles,"quotes":quotes,"images":images,"facets":facets,"qidx":qidx,"iidx":iidx}
+
+def encode(data, generated_at):
+    payload={"meta":{"generated_at_utc":generated_at,"counts":{"articles":len(data['articles']),"quotes":len(data['quotes']),"images":len(data['images'])}},
+             "articles":list(data['articles'].values()),"quotes":data['quotes'],"images":data['images'],"facets":data['facets'],
+             "indexes":{"quote_tokens":dict(data['qidx']),"image_tokens":dict(data['iidx'])}}
+    return json.dumps(payload,ensure_ascii=False,separators=(',',':'))
+
+def updated_text(data, out=OUT_JSON):
+    # generated_at_utc only moves when the data does, so an unchanged index is not rewritten (None)
+    previous=out.read_text(encoding='utf-8') if out.exists() else ""
+    m=re.match(r'\{"meta":\{"generated_at_utc":"([^"]*)"',previous)
+    if m and encode(data,m.group(1))==previous: return None
+    return encode(data,datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00','Z'))
+
+def write_search_data(data, text, out=OUT_JSON):
+    if text is None:
+        print(f"{out} is up to date with {len(data['quotes'])} quotes and {len(data['images'])} images")
+        return
+    out.parent.mkdir(parents=True,exist_ok=True)
+    out.write_text(text,encoding='utf-8')
+    print(f"Wrote {out} with {len(data['quotes'])} quotes and {len(data['images'])} images")
+
+if __name__ == "__main__":
+    ap=argparse.ArgumentParser(description="Build docs/search-data.json from the news, quote and image data.")
+    ap.add_argument("--store", default="", help="read the tables from this SQLite store instead of the CSVs")
+    args=ap.parse_args()
+    if args.store:
+        conn=open_store(args.store)
+        news_rows, quote_rows, image_rows = (load_rows(conn,t) for t in ("news","quotes","images"))
+        conn.close()
+    else:
+        news_rows, quote_rows, image_rows = rows(NEWS_CSV), rows(QUOTES_CSV), rows(IMAGES_CSV)
+    data=build_search_data(news_rows, quote_rows, image_rows)
+    write_search_data(data, updated_text(data))
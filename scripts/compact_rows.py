@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory quote and image rows for the quote extractor.
+
+A row read back from combined_news_quotes.csv or combined_news_images.csv is
+kept as a record with __slots__ rather than a dict. Its article fields (hash,
+PUBDATE, TITLE_URL_EN, TITLE_URL_FR) live in one Article tuple that every row of
+the article points at, instead of in a copy per row. The short values repeated
+across thousands of rows (indexes, speakers and their titles and organizations,
+alt text, image sizes) are interned, so one minister's name is held once.
+Records read like the dicts they replace: row["QUOTE_EN"], row.get(...),
+dict(row) and csv.DictWriter all take them.
+
+Measure the saving on a synthetic dataset (the rows are loaded in a fresh
+process per layout, and the peak resident memory of the load is reported):
+
+    python -m scripts.compact_rows --quotes 1000000
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+
+ARTICLE_FIELDS = ("hash", "PUBDATE", "TITLE_URL_EN", "TITLE_URL_FR")
+ARTICLE_INDEX = {field: index for index, field in enumerate(ARTICLE_FIELDS)}
+# Fields whose values repeat across rows; each distinct value is held once.
+SHARED_FIELDS = frozenset(
+    [
+        "QUOTE_INDEX",
+        "SPEAKER_EN",
+        "SPEAKER_NAME_EN",
+        "SPEAKER_TITLE_EN",
+        "SPEAKER_ORGANIZATION_EN",
+        "SPEAKER_FR",
+        "SPEAKER_NAME_FR",
+        "SPEAKER_TITLE_FR",
+        "SPEAKER_ORGANIZATION_FR",
+        "IMAGE_INDEX",
+        "ALT_TEXT_EN",
+        "ALT_TEXT_FR",
+        "EXIF_JSON",
+        "WIDTH",
+        "HEIGHT",
+    ]
+)
+
+
+class Article(NamedTuple):
+    hash: str
+    PUBDATE: str
+    TITLE_URL_EN: str
+    TITLE_URL_FR: str
+
+
+class Record(MutableMapping):
+    # A row as a mapping over its article's fields and its own. Subclasses (see record_class)
+    # put their own fields in __slots__ and in fields; no field can be added or removed.
+    __slots__ = ("article",)
+    fields: Tuple[str, ...] = ()
+    field_set: frozenset = frozenset()
+    shared_indexes: Tuple[int, ...] = ()  # positions of the fields in SHARED_FIELDS
+
+    def __init__(self, article: Article, values: Sequence) -> None:
+        self.article = article
+        for field, value in zip(self.fields, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key: str):
+        index = ARTICLE_INDEX.get(key)
+        if index is not None:
+            return self.article[index]
+        if key not in self.field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in ARTICLE_INDEX:
+            self.article = self.article._replace(**{key: value})
+        elif key in self.field_set:
+            setattr(self, key, shared_value(key, value))
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"{type(self).__name__} fields cannot be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        yield from ARTICLE_FIELDS
+        yield from self.fields
+
+    def __len__(self) -> int:
+        return len(ARTICLE_FIELDS) + len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def __reduce__(self):
+        # Record classes are made at run time, so a record pickles (to a worker process) as a dict.
+        return dict, (dict(self),)
+
+
+@lru_cache(maxsize=None)
+def record_class(fields: Tuple[str, ...]) -> Type[Record]:
+    return type(
+        "Row",
+        (Record,),
+        {
+            "__slots__": fields,
+            "fields": fields,
+            "field_set": frozenset(fields),
+            "shared_indexes": tuple(index for index, field in enumerate(fields) if field in SHARED_FIELDS),
+        },
+    )
+
+
+def shared_value(field: str, value):
+    return sys.intern(value) if field in SHARED_FIELDS and isinstance(value, str) else value
+
+
+def article_of(row: Mapping) -> Article:
+    if isinstance(row, Record):
+        return row.article
+    return Article(*(row.get(field, "") for field in ARTICLE_FIELDS))
+
+
+def compact_row(row: Mapping, fields: Sequence[str], article: Optional[Article] = None) -> Record:
+    # article: the tuple the article's other rows already share, if any.
+    cls = record_class(tuple(fields))
+    if type(row) is cls and (article is None or row.article == article):
+        return row
+    values = [row.get(field, "") for field in cls.fields]
+    for index in cls.shared_indexes:
+        if type(values[index]) is str:
+            values[index] = sys.intern(values[index])
+    return cls(article or article_of(row), values)
+
+
+def compact_rows(rows: Iterable[Mapping], fields: Sequence[str]) -> List[Record]:
+    # The rows of one article, sharing one Article.
+    compacted: List[Record] = []
+    for row in rows:
+        compacted.append(compact_row(row, fields, compacted[0].article if compacted else None))
+    return compacted
+
+
+def synthetic_rows(count: int, quotes_per_article: int = 3) -> Iterator[Dict[str, str]]:
+    # Quote rows shaped like the extractor's: a few per article, speakers drawn from a few thousand.
+    for number in range(count):
+        article, index = divmod(number, quotes_per_article)
+        speaker = article * 7919 % 2500
+        name = f"Speaker Name {speaker}"
+        title = f"Minister of Portfolio {speaker % 40}"
+        organization = f"Department {speaker % 25}"
+        yield {
+            "hash": hashlib.sha256(f"article {article}".encode()).hexdigest()[:16],
+            "PUBDATE": f"20{article % 20 + 6:02d}-{article % 12 + 1:02d}-{article % 28 + 1:02d} 10:00:00",
+            "TITLE_URL_EN": f"https://www.canada.ca/en/department-{article % 25}/news/2025/01/article-{article}.html",
+            "TITLE_URL_FR": f"https://www.canada.ca/fr/ministere-{article % 25}/nouvelles/2025/01/article-{article}.html",
+            "QUOTE_INDEX": str(index + 1),
+            "QUOTE_EN": f"Quote {index + 1} of article {article}: " + "Canadians expect results. " * 8,
+            "SPEAKER_EN": f"The Honourable {name}, {title}",
+            "SPEAKER_NAME_EN": name,
+            "SPEAKER_TITLE_EN": title,
+            "SPEAKER_ORGANIZATION_EN": organization,
+            "QUOTE_FR": f"Citation {index + 1} de l'article {article} : " + "La population s'attend à des résultats. " * 6,
+            "SPEAKER_FR": f"L'honorable {name}, {title}",
+            "SPEAKER_NAME_FR": name,
+            "SPEAKER_TITLE_FR": title,
+            "SPEAKER_ORGANIZATION_FR": organization,
+        }
+
+
+def write_synthetic_quotes(path: str, count: int) -> None:
+    from scripts.extract_news_quotes import QUOTE_OUTPUT_FIELDS, with_stable_ids
+
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=QUOTE_OUTPUT_FIELDS)
+        writer.writeheader()
+        writer.writerows(with_stable_ids(synthetic_rows(count), "QUOTE_INDEX", "quote"))
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS. resource is Unix-only, and only the
+    # benchmark needs it, so the extractor still starts on Windows.
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(layout: str, path: str) -> Tuple[int, int, float]:
+    # Loads the quotes as the extractor does; returns (rows, peak RSS growth in bytes, seconds).
+    from scripts.extract_news_quotes import QUOTE_ROW_FIELDS, article_key, load_existing_rows
+
+    before = peak_rss_bytes()
+    started = time.perf_counter()
+    if layout == "compact":
+        grouped = load_existing_rows(path, QUOTE_ROW_FIELDS)
+    else:
+        # The dict per row that load_existing_rows used to build.
+        grouped = {}
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                grouped.setdefault(article_key(row), []).append(
+                    {
+                        **{field: row.get(field, "") for field in ARTICLE_FIELDS},
+                        **{field: row.get(field, "") for field in QUOTE_ROW_FIELDS},
+                    }
+                )
+    seconds = time.perf_counter() - started
+    return sum(len(rows) for rows in grouped.values()), peak_rss_bytes() - before, seconds
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the memory the extractor's dict and compact rows take.")
+    parser.add_argument("--quotes", type=int, default=1_000_000, help="Synthetic quote rows to load")
+    parser.add_argument("--layouts", nargs="+", choices=["dict", "compact"], default=["dict", "compact"])
+    parser.add_argument("--measure", choices=["dict", "compact"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.measure:
+        rows, grown, seconds = measure(args.measure, args.path)
+        print(rows, grown, f"{seconds:.3f}")
+        return 0
+    with tempfile.TemporaryDirectory() as work:
+        path = os.path.join(work, "quotes.csv")
+        write_synthetic_quotes(path, args.quotes)
+        print(f"{args.quotes} synthetic quotes, {os.path.getsize(path) / 2**20:.0f} MiB of CSV")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for layout in args.layouts:
+            # A fresh process per layout, so neither inherits the other's heap.
+            output = subprocess.run(
+                [sys.executable, "-m", "scripts.compact_rows", "--measure", layout, "--path", path],
+                cwd=root,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()
+            rows, grown, seconds = int(output[0]), int(output[1]), float(output[2])
+            print(
+                f"{layout:<8} {grown / 2**20:8.0f} MiB peak for {rows} rows "
+                f"({grown / max(rows, 1):.0f} bytes a row), loaded in {seconds:.1f}s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
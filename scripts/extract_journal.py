@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Append-only journal of the articles the quote extractor has finished.
+
+Each line is one article: its key, quote rows, image rows and state entry,
+flushed to disk as soon as the article is done. The extractor writes its CSVs
+and state at checkpoints and at the end of a run, and empties the journal each
+time. A journal that still has lines at startup belongs to a run that crashed or
+was killed; those articles are replayed into the outputs instead of being
+fetched again. A line cut short by the crash is ignored.
+
+The journal lives at .cache/extract_journal.jsonl (not committed).
+
+Show what an interrupted run left:  python -m scripts.extract_journal
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List
+
+EXTRACT_JOURNAL_PATH = os.path.join(".cache", "extract_journal.jsonl")
+
+
+class ExtractJournal:
+    def __init__(self, path: str = EXTRACT_JOURNAL_PATH) -> None:
+        self.path = path
+        self._fh = None
+
+    def records(self) -> List[Dict]:
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    def append(self, key: str, quote_rows: List[Dict], image_rows: List[Dict], state: Dict) -> None:
+        if self._fh is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        # Rows may be compact records (scripts/compact_rows.py); they go in as plain objects.
+        record = {
+            "key": key,
+            "quotes": [dict(row) for row in quote_rows],
+            "images": [dict(row) for row in image_rows],
+            "state": state,
+        }
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def clear(self) -> None:
+        # After a checkpoint: everything journaled so far is in the outputs.
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize the journal an interrupted extractor run left.")
+    parser.add_argument("--journal", default=EXTRACT_JOURNAL_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    records = ExtractJournal(parse_args().journal).records()
+    statuses: Dict[str, int] = {}
+    for record in records:
+        status = record["state"].get("status", "")
+        statuses[status] = statuses.get(status, 0) + 1
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+    print(f"{len(records)} finished articles waiting to be replayed" + (f" ({summary})" if summary else ""))
@@ -1,21 +1,57 @@
 import argparse
+import asyncio
 import csv
+import hashlib
 import json
 import logging
+import mimetypes
+import multiprocessing
 import os
 import re
 import shutil
+import sys
+import tempfile
+import threading
+import time
 from io import BytesIO
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
 from PIL import Image, ExifTags
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+# Allow running as `python scripts/extract_news_quotes.py` as well as with -m.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.adaptive_concurrency import CONCURRENCY, limited_adapter
+from scripts.article_counts import ARTICLE_COUNTS_PATH, ArticleCount, ArticleCounts
+from scripts.async_fetch import AsyncFetcher
+from scripts.compact_rows import Record, compact_row, compact_rows
+from scripts.http_pool import HTTP_STATS
+from scripts.extract_journal import EXTRACT_JOURNAL_PATH, ExtractJournal
+from scripts.fetch_queue import (
+    DEAD_LETTER,
+    FAILED,
+    describe_depth,
+    failure_entry,
+    newest_first,
+    queue_depth,
+    waiting_reason,
+)
+from scripts.image_blobs import IMAGE_BLOB_DIR, ImageBlobStore, file_sha256
+from scripts.page_archive import PAGE_ARCHIVE_DIR, PageArchive
+from scripts.partitioned_tables import concat_table, has_table, read_rows, split_table, write_table
+from scripts.news_store import (
+    NEWS_COLUMNS,
+    ensure_imported,
+    export_csv,
+    load_rows,
+    open_store,
+    replace_article_rows,
+)
 
 
 QUOTE_OUTPUT_FIELDS = [
@@ -49,10 +85,16 @@ IMAGE_OUTPUT_FIELDS = [
     "ALT_TEXT_FR",
     "FILE_PATH",
     "EXIF_JSON",
+    "WIDTH",
+    "HEIGHT",
+    "BYTES",
+    "SHA256",
 ]
 
 ARTICLE_KEY_FIELDS = ["hash", "PUBDATE", "TITLE_URL_EN", "TITLE_URL_FR"]
-COUNT_FIELDS = ["QUOTE_COUNT", "IMAGE_COUNT"]
+# The fields a quote or image row holds besides its article's.
+QUOTE_ROW_FIELDS = [field for field in QUOTE_OUTPUT_FIELDS if field not in ("id", *ARTICLE_KEY_FIELDS)]
+IMAGE_ROW_FIELDS = [field for field in IMAGE_OUTPUT_FIELDS if field not in ("id", *ARTICLE_KEY_FIELDS)]
 HEADING_TARGETS = {
     "en": {"quotes"},
     "fr": {"citations"},
@@ -68,8 +110,13 @@ QUOTE_MARKS = {
     "\u2018",
     "\u2019",
 }
+HTML_PARSERS = ["html.parser", "lxml"]
+HEADING_TAG = re.compile(r"h[1-6]")
+ARTICLE_CONTAINER = "news-release-container"
 SKIP_IMAGE_BASENAMES = {"wmms-blk.svg", "sig-blk-en.svg"}
 ARTICLE_IMAGE_DIR = os.path.join("data", "news_images")
+IMAGE_CHUNK_BYTES = 64 * 1024
+PROBE_BYTES = 256 * 1024
 STATE_VERSION = 6
 ORG_KEYWORDS = {
     "agency",
@@ -139,7 +186,7 @@ TITLE_OF_ORG_PREFIXES = {
 }
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Extract quote sections and article images from bilingual Canada.ca news articles."
     )
@@ -147,23 +194,144 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--quotes-output", default="combined_news_quotes.csv")
     parser.add_argument("--images-output", default="combined_news_images.csv")
     parser.add_argument("--state", default="data/news_quotes_state.json")
+    parser.add_argument(
+        "--counts", default=ARTICLE_COUNTS_PATH, help="Quote and image counts per article (scripts/article_counts.py)"
+    )
     parser.add_argument("--images-dir", default=ARTICLE_IMAGE_DIR)
     parser.add_argument("--full-rebuild", action="store_true")
+    parser.add_argument(
+        "--page-archive",
+        default=PAGE_ARCHIVE_DIR,
+        help="Keep every fetched page, compressed, in this directory; empty to disable",
+    )
+    parser.add_argument(
+        "--image-blobs",
+        default=IMAGE_BLOB_DIR,
+        help="Keep each distinct image once in this store and hard-link it into article directories; empty to disable",
+    )
+    parser.add_argument(
+        "--reparse",
+        action="store_true",
+        help="Extract every article again from the archived pages, fetching only pages the archive lacks",
+    )
     parser.add_argument("--limit", type=int, default=0)
-    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=6,
+        help="Failures after which an article becomes a dead letter and is no longer retried",
+    )
+    parser.add_argument(
+        "--retry-dead-letters", action="store_true", help="Try the dead-letter articles again this run"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=0,
+        help="Stop starting new articles after this many minutes, 0 for none; articles under way are finished, "
+        "the rest wait for the next run",
+    )
+    parser.add_argument(
+        "--journal",
+        default=EXTRACT_JOURNAL_PATH,
+        help="Record each finished article here and replay it after a crash; empty to disable",
+    )
+    parser.add_argument(
+        "--checkpoint-minutes",
+        type=float,
+        default=10,
+        help="Write the CSVs and state (and empty the journal) this often during a run",
+    )
+    parser.add_argument(
+        "--revalidate-days",
+        type=int,
+        default=0,
+        help="Also re-check cached articles published in the last N days, with conditional requests",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Requests in flight with --concurrency fixed; where the adaptive limit starts otherwise",
+    )
+    parser.add_argument(
+        "--concurrency",
+        choices=["adaptive", "fixed"],
+        default="adaptive",
+        help="adaptive: raise the limit while responses stay fast, halve it on 429/503 (scripts/adaptive_concurrency.py)",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=32, help="Ceiling of the adaptive limit")
+    parser.add_argument("--concurrency-trace", default="", help="Write the adaptive limit over time to this CSV")
     parser.add_argument("--timeout", type=int, default=30)
-    return parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "async"],
+        default="threads",
+        help="threads: one worker per article; async: every page and image request scheduled on its own",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Parse pages in this many worker processes, apart from the I/O threads (threads engine)",
+    )
+    parser.add_argument(
+        "--parse-queue", type=int, default=0, help="Articles fetched ahead of parsing, 0 for 4 per parse worker"
+    )
+    parser.add_argument(
+        "--max-per-host", type=int, default=0, help="Concurrent requests per host, 0 for --max-workers (async engine)"
+    )
+    parser.add_argument(
+        "--requests-per-second", type=float, default=0, help="Request rate cap, 0 for none (async engine)"
+    )
+    parser.add_argument(
+        "--html-parser",
+        choices=HTML_PARSERS,
+        default="html.parser",
+        help="BeautifulSoup backend; check lxml against a golden corpus (scripts/golden_pages.py) first",
+    )
+    parser.add_argument(
+        "--store",
+        default="",
+        help="Read and write the news, quote and image tables through this SQLite store",
+    )
+    parser.add_argument(
+        "--partitions",
+        default="",
+        help="Keep the quote and image tables as one CSV per PUBDATE month under this directory "
+        "(scripts/partitioned_tables.py)",
+    )
+    parser.add_argument(
+        "--concat-outputs",
+        action="store_true",
+        help="With --partitions, also regenerate the single-file CSVs from the partitions",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time both engines against a local stand-in server and compare their output",
+    )
+    parser.add_argument("--benchmark-articles", type=int, default=200)
+    parser.add_argument("--benchmark-latency", type=float, default=0.05, help="Stand-in server delay per response")
+    parser.add_argument(
+        "--benchmark-capacity",
+        type=int,
+        default=0,
+        help="Have the stand-in server throttle above this many requests in flight, and compare fixed and adaptive concurrency",
+    )
+    args = parser.parse_args(argv)
+    if builder_registry.lookup(args.html_parser) is None:
+        parser.error(f"--html-parser {args.html_parser} is not installed")
+    if args.reparse and not args.page_archive:
+        parser.error("--reparse needs --page-archive")
+    if args.store and args.partitions:
+        parser.error("--store and --partitions are alternative layouts; pick one")
+    return args
 
 
 def make_session() -> requests.Session:
     session = requests.Session()
-    retry = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-    )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = limited_adapter()
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     session.headers.update(
@@ -177,6 +345,18 @@ def make_session() -> requests.Session:
     return session
 
 
+_thread_sessions = threading.local()
+
+
+def thread_session() -> requests.Session:
+    # One long-lived session per worker thread, so its kept-alive connections are
+    # reused from one article (and image) to the next.
+    session = getattr(_thread_sessions, "session", None)
+    if session is None:
+        session = _thread_sessions.session = make_session()
+    return session
+
+
 def normalize_space(value: str) -> str:
     if value is None:
         return ""
@@ -207,7 +387,8 @@ def combine_text_values(*values: str) -> str:
 
 
 def article_key(row: Dict[str, str]) -> str:
-    return "|".join(normalize_space(row.get(field, "")) for field in ARTICLE_KEY_FIELDS)
+    # Interned, so the dicts keyed by article share one string per article.
+    return sys.intern("|".join(normalize_space(row.get(field, "")) for field in ARTICLE_KEY_FIELDS))
 
 
 def image_directory_for_hash(images_dir: str, article_hash: str) -> str:
@@ -229,45 +410,43 @@ def load_input_rows(path: str) -> Tuple[List[Dict[str, str]], List[str]]:
 
 
 def write_input_rows(path: str, fieldnames: List[str], rows: List[Dict[str, str]]) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as fh:
+    # Written aside and renamed, like every output, so a run killed mid-write leaves the old file.
+    with open(f"{path}.tmp", "w", newline="", encoding="utf-8") as fh:
         writer = csv.DictWriter(fh, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows)
+    os.replace(f"{path}.tmp", path)
+
+
+def group_existing_rows(rows, extra_fields: List[str]) -> Dict[str, List[Record]]:
+    # Compact records (scripts/compact_rows.py): the rows of an article share its fields.
+    grouped: Dict[str, List[Record]] = {}
+    for row in rows:
+        group = grouped.setdefault(article_key(row), [])
+        group.append(compact_row(row, extra_fields, group[0].article if group else None))
+    return grouped
 
 
-def load_existing_rows(path: str, extra_fields: List[str]) -> Dict[str, List[Dict[str, str]]]:
+def load_existing_rows(path: str, extra_fields: List[str]) -> Dict[str, List[Record]]:
     if not os.path.exists(path):
         return {}
 
-    grouped: Dict[str, List[Dict[str, str]]] = {}
     with open(path, newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            key = article_key(row)
-            grouped.setdefault(key, []).append(
-                {
-                    "hash": row.get("hash", ""),
-                    "PUBDATE": row.get("PUBDATE", ""),
-                    "TITLE_URL_EN": row.get("TITLE_URL_EN", ""),
-                    "TITLE_URL_FR": row.get("TITLE_URL_FR", ""),
-                    **{field: row.get(field, "") for field in extra_fields},
-                }
-            )
-
-    return grouped
+        return group_existing_rows(csv.DictReader(fh), extra_fields)
 
 
 def load_state(path: str) -> Dict[str, Dict[str, str]]:
     if not os.path.exists(path):
         return {}
     with open(path, encoding="utf-8") as fh:
-        return json.load(fh)
+        return {sys.intern(key): value for key, value in json.load(fh).items()}
 
 
 def write_state(path: str, state: Dict[str, Dict[str, str]]) -> None:
     ensure_parent_dir(path)
-    with open(path, "w", encoding="utf-8") as fh:
+    with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
         json.dump(state, fh, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
 
 
 def stable_row_id(row: Dict[str, str], index_field: str, prefix: str) -> str:
@@ -278,6 +457,14 @@ def stable_row_id(row: Dict[str, str], index_field: str, prefix: str) -> str:
     return normalize_space(row.get("id", ""))
 
 
+def with_stable_ids(rows: Iterable[Dict[str, str]], index_field: str, id_prefix: str) -> Iterator[Dict[str, str]]:
+    # One row at a time, so writing a million rows never holds a dict for each.
+    for row in rows:
+        row_out = dict(row)
+        row_out["id"] = stable_row_id(row_out, index_field, id_prefix)
+        yield row_out
+
+
 def write_rows(
     path: str,
     fieldnames: List[str],
@@ -285,13 +472,11 @@ def write_rows(
     index_field: str,
     id_prefix: str,
 ) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as fh:
+    with open(f"{path}.tmp", "w", newline="", encoding="utf-8") as fh:
         writer = csv.DictWriter(fh, fieldnames=fieldnames)
         writer.writeheader()
-        for row in rows:
-            row_out = dict(row)
-            row_out["id"] = stable_row_id(row_out, index_field, id_prefix)
-            writer.writerow(row_out)
+        writer.writerows(with_stable_ids(rows, index_field, id_prefix))
+    os.replace(f"{path}.tmp", path)
 
 
 def heading_matches(text: str, lang: str) -> bool:
@@ -420,23 +605,44 @@ def split_speaker_fields(speaker_text: str) -> Tuple[str, str, str]:
     return name, title, organization
 
 
-def extract_quotes_from_html(html: str, lang: str) -> List[Tuple[str, str]]:
-    soup = BeautifulSoup(html, "html.parser")
+def make_soup(html: str, parser: str = "html.parser") -> BeautifulSoup:
+    return BeautifulSoup(html, parser)
+
+
+def scan_page(soup: BeautifulSoup, lang: str) -> Tuple[Optional[Tag], Tag]:
+    # One walk over the document for both the quotes heading and the article container,
+    # stopping as soon as nothing found later could change either.
     heading = None
-    for candidate in soup.find_all(re.compile(r"^h[1-6]$")):
-        if heading_matches(candidate.get_text(" ", strip=True), lang):
-            heading = candidate
+    by_id = by_class = main = None
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        if heading is None and HEADING_TAG.fullmatch(element.name):
+            if heading_matches(element.get_text(" ", strip=True), lang):
+                heading = element
+        if by_id is None and element.get("id") == ARTICLE_CONTAINER:
+            by_id = element
+        if by_class is None and ARTICLE_CONTAINER in (element.get("class") or []):
+            by_class = element
+        if main is None and element.name == "main":
+            main = element
+        if heading is not None and by_id is not None:
             break
+    return heading, by_id or by_class or main or soup
 
+
+def quotes_after_heading(heading: Optional[Tag]) -> List[Tuple[str, str]]:
     if heading is None:
         return []
 
+    # The quotes section ends at the next heading.
     quote_blocks = []
-    for element in heading.find_all_next():
-        tag_name = getattr(element, "name", None)
-        if tag_name and re.fullmatch(r"h[1-6]", tag_name):
+    for element in heading.next_elements:
+        if not isinstance(element, Tag):
+            continue
+        if HEADING_TAG.fullmatch(element.name):
             break
-        if tag_name == "blockquote":
+        if element.name == "blockquote":
             quote_blocks.append(element)
 
     extracted: List[Tuple[str, str]] = []
@@ -470,13 +676,13 @@ def extract_quotes_from_html(html: str, lang: str) -> List[Tuple[str, str]]:
     return extracted
 
 
+def extract_quotes_from_html(html: str, lang: str) -> List[Tuple[str, str]]:
+    heading, _ = scan_page(make_soup(html), lang)
+    return quotes_after_heading(heading)
+
+
 def find_article_container(soup: BeautifulSoup):
-    return (
-        soup.find(id="news-release-container")
-        or soup.find(class_="news-release-container")
-        or soup.find("main")
-        or soup
-    )
+    return scan_page(soup, "en")[1]
 
 
 def is_skippable_image(src: str) -> bool:
@@ -515,7 +721,7 @@ def original_filename_from_url(image_url: str) -> str:
     return normalize_space(basename)
 
 
-def make_unique_filename(article_dir: str, filename: str, fallback_stem: str) -> str:
+def make_unique_filename(taken: set, filename: str, fallback_stem: str) -> str:
     candidate = filename or fallback_stem
     stem, ext = os.path.splitext(candidate)
     if not stem:
@@ -525,36 +731,52 @@ def make_unique_filename(article_dir: str, filename: str, fallback_stem: str) ->
 
     unique_name = f"{stem}{ext}"
     counter = 2
-    while os.path.exists(os.path.join(article_dir, unique_name)):
+    while unique_name in taken:
         unique_name = f"{stem}_{counter}{ext}"
         counter += 1
     return unique_name
 
 
-def extract_exif_json(content: bytes) -> str:
-    try:
-        with Image.open(BytesIO(content)) as image:
-            raw_exif = image.getexif()
-            if not raw_exif:
-                return "{}"
-
-            exif_map = {}
-            for tag_id, value in raw_exif.items():
-                tag_name = ExifTags.TAGS.get(tag_id, str(tag_id))
-                if isinstance(value, bytes):
-                    value = value.decode("utf-8", errors="replace")
-                elif isinstance(value, tuple):
-                    value = list(value)
-                exif_map[tag_name] = value
-
-            return json.dumps(exif_map, ensure_ascii=False, sort_keys=True)
-    except Exception:
-        return "{}"
+class ImageProbe(NamedTuple):
+    width: str
+    height: str
+    exif_json: str
 
 
-def extract_images_from_html(page_url: str, html: str) -> List[Dict[str, str]]:
-    soup = BeautifulSoup(html, "html.parser")
-    container = find_article_container(soup)
+def exif_json(raw_exif) -> str:
+    if not raw_exif:
+        return "{}"
+
+    exif_map = {}
+    for tag_id, value in raw_exif.items():
+        tag_name = ExifTags.TAGS.get(tag_id, str(tag_id))
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", errors="replace")
+        elif isinstance(value, tuple):
+            value = list(value)
+        exif_map[tag_name] = value
+
+    return json.dumps(exif_map, ensure_ascii=False, sort_keys=True)
+
+
+def probe_image(path: str) -> ImageProbe:
+    # Size and EXIF from the start of the file; the pixel data is never decoded. The file is
+    # opened whole only when its header runs past PROBE_BYTES.
+    with open(path, "rb") as fh:
+        head = fh.read(PROBE_BYTES)
+    for source in (BytesIO(head), path):
+        try:
+            with Image.open(source) as image:
+                # Image.getexif reads what the header already holds; PngImageFile.getexif would load the image.
+                width, height = image.size
+                return ImageProbe(str(width), str(height), exif_json(Image.Image.getexif(image)))
+        except Exception:
+            if len(head) < PROBE_BYTES:
+                break
+    return ImageProbe("", "", "{}")
+
+
+def images_in_container(page_url: str, container: Tag) -> List[Dict[str, str]]:
     images: List[Dict[str, str]] = []
 
     for img in container.find_all("img"):
@@ -580,16 +802,152 @@ def extract_images_from_html(page_url: str, html: str) -> List[Dict[str, str]]:
     return images
 
 
-def fetch_article_assets(
-    session: requests.Session, url: str, lang: str, timeout: int
+def extract_images_from_html(page_url: str, html: str) -> List[Dict[str, str]]:
+    return images_in_container(page_url, find_article_container(make_soup(html)))
+
+
+def parse_article_html(
+    url: str, html: str, lang: str, parser: str = "html.parser"
 ) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]:
-    if not normalize_space(url):
-        return [], []
+    # Quotes and images from a single parse of the page.
+    heading, container = scan_page(make_soup(html, parser), lang)
+    return quotes_after_heading(heading), images_in_container(url, container)
+
+
+class Page(NamedTuple):
+    html: Optional[str]  # None after a 304, until the body turns out to be needed
+    entry: Dict[str, str]  # url, sha256 and the ETag/Last-Modified validators, as kept in the state
+    unchanged: bool  # the server or the body digest says it is the page the state describes
+
+
+class PriorArticle(NamedTuple):
+    # What earlier runs kept for an article: its state (with the page and image validators) and rows.
+    state: Dict
+    quote_rows: List[Dict[str, str]]
+    image_rows: List[Dict[str, str]]
+    trust_files: bool = False  # reuse saved image files without asking the server (--reparse)
+    trust_blobs: bool = True  # start from the blob an image URL gave before (not under --full-rebuild)
+
+
+def body_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def validator_entry(response: requests.Response, **fields: str) -> Dict[str, str]:
+    entry = {
+        **fields,
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+    }
+    return {name: value for name, value in entry.items() if value}
+
+
+def conditional_headers(entry: Optional[Dict[str, str]]) -> Dict[str, str]:
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def prior_page_entry(prior: Optional[PriorArticle], lang: str, url: str) -> Optional[Dict[str, str]]:
+    entry = (prior.state.get("pages") or {}).get(lang) if prior is not None else None
+    return entry if entry and entry.get("url") == url else None
+
+
+def archived_page(archive: Optional[PageArchive], url: str, prior_entry: Optional[Dict[str, str]]) -> Optional[Page]:
+    # The archived copy, for --reparse.
+    html = archive.get(url)
+    if html is None:
+        return None
+    digest = body_digest(html.encode("utf-8"))
+    entry = prior_entry if prior_entry and prior_entry.get("sha256") == digest else {"url": url, "sha256": digest}
+    return Page(html, entry, False)
+
+
+def page_from_response(
+    url: str,
+    response: requests.Response,
+    prior_entry: Optional[Dict[str, str]],
+    archive: Optional[PageArchive] = None,
+) -> Page:
+    if response.status_code == 304 and prior_entry:
+        return Page(None, {**prior_entry, **validator_entry(response)}, True)
 
-    response = session.get(url, timeout=timeout)
     response.raise_for_status()
     html = response.text
-    return extract_quotes_from_html(html, lang), extract_images_from_html(url, html)
+    digest = archive.put(url, html) if archive is not None else body_digest(html.encode("utf-8"))
+    entry = validator_entry(response, url=url, sha256=digest)
+    return Page(html, entry, bool(prior_entry) and prior_entry.get("sha256") == digest)
+
+
+def fetch_page(
+    session: requests.Session,
+    url: str,
+    timeout: int,
+    archive: Optional[PageArchive] = None,
+    prior_entry: Optional[Dict[str, str]] = None,
+) -> Optional[Page]:
+    # None when the article has no page in that language.
+    if not normalize_space(url):
+        return None
+
+    if archive is not None and archive.serve_pages:
+        # --reparse needs the body either way, so nothing is requested conditionally.
+        page = archived_page(archive, url, prior_entry)
+        if page is not None:
+            return page
+        return page_from_response(url, session.get(url, timeout=timeout), prior_entry, archive)
+    response = session.get(url, timeout=timeout, headers=conditional_headers(prior_entry))
+    return page_from_response(url, response, prior_entry, archive)
+
+
+def unchanged_article(prior: Optional[PriorArticle], pages: Sequence[Optional[Page]]) -> bool:
+    # Both pages are the ones the article's current quote and image rows were read from.
+    if prior is None or prior.trust_files or not valid_cached_state(prior.state) or prior.state.get("status") != "ok":
+        return False
+    return all(page is None or page.unchanged for page in pages)
+
+
+def page_body(archive: Optional[PageArchive], page: Page) -> Optional[str]:
+    # The body of a page the server answered with 304, when the archive has it.
+    html = archive.get(page.entry["url"]) if archive is not None else None
+    if html is None or body_digest(html.encode("utf-8")) != page.entry.get("sha256"):
+        return None
+    return html
+
+
+def fetch_pages(
+    row: Dict[str, str],
+    timeout: int,
+    archive: Optional[PageArchive] = None,
+    prior: Optional[PriorArticle] = None,
+) -> Tuple[Optional[Page], Optional[Page]]:
+    session = thread_session()
+    url_en, url_fr = row.get("TITLE_URL_EN", ""), row.get("TITLE_URL_FR", "")
+    pages = (
+        fetch_page(session, url_en, timeout, archive, prior_page_entry(prior, "en", url_en)),
+        fetch_page(session, url_fr, timeout, archive, prior_page_entry(prior, "fr", url_fr)),
+    )
+    if unchanged_article(prior, pages):
+        return pages
+    # The other page changed, so a page answered with 304 is parsed too: from the archive,
+    # or else requested again without validators.
+    filled = []
+    for page in pages:
+        if page is not None and page.html is None:
+            html = page_body(archive, page)
+            if html is None:
+                page = fetch_page(session, page.entry["url"], timeout, archive)
+            else:
+                page = page._replace(html=html)
+        filled.append(page)
+    return filled[0], filled[1]
+
+
+def page_states(pages: Sequence[Optional[Page]]) -> Dict[str, Dict[str, str]]:
+    return {lang: page.entry for lang, page in zip(("en", "fr"), pages) if page is not None}
 
 
 def build_quote_rows(
@@ -628,44 +986,113 @@ def build_quote_rows(
     return output_rows
 
 
-def build_image_rows(
+def image_sources(
+    images_en: List[Dict[str, str]], images_fr: List[Dict[str, str]]
+) -> List[Tuple[int, Dict[str, str], Dict[str, str], str]]:
+    # (index, EN image, FR image, URL) for every image position that has a source to download.
+    sources = []
+    for image_index in range(max(len(images_en), len(images_fr))):
+        image_en = images_en[image_index] if image_index < len(images_en) else {}
+        image_fr = images_fr[image_index] if image_index < len(images_fr) else {}
+        source_url = image_en.get("source_url") or image_fr.get("source_url")
+        if source_url:
+            sources.append((image_index, image_en, image_fr, source_url))
+    return sources
+
+
+class ImageFile(NamedTuple):
+    # An image on disk, standing in for its download response: a download streamed to a
+    # temporary file, a temporary link to the file saved on an earlier run, or a blob.
+    path: str
+    headers: Dict[str, str]
+    sha256: str
+    size: int
+    temporary: bool  # in the article directory, to be renamed into place by save_image_rows()
+
+
+def temporary_path(directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".part", dir=directory)
+    os.close(fd)
+    return path
+
+
+def download_image(
     session: requests.Session,
+    url: str,
+    timeout: int,
+    headers: Dict[str, str],
+    directory: str,
+    stored: Optional[ImageFile] = None,
+) -> ImageFile:
+    # Streams the body to a temporary file in directory, hashing it chunk by chunk, so no
+    # image is ever held in memory whole. A 304 gives back the stored file.
+    with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+        if response.status_code == 304 and stored is not None:
+            refreshed = {name: response.headers[name] for name in ("ETag", "Last-Modified") if response.headers.get(name)}
+            return stored._replace(headers={**stored.headers, **refreshed})
+        response.raise_for_status()
+        path = temporary_path(directory)
+        sha = hashlib.sha256()
+        size = 0
+        try:
+            with open(path, "wb") as fh:
+                for chunk in response.iter_content(IMAGE_CHUNK_BYTES):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    fh.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return ImageFile(path, response.headers, sha.hexdigest(), size, True)
+
+
+def install_image(image: ImageFile, destination: str, url: str, blobs: Optional[ImageBlobStore] = None) -> None:
+    if blobs is not None:
+        if image.temporary:
+            blobs.adopt(image.path, image.sha256, url, image.headers.get("Content-Type", ""))
+        else:
+            blobs.count_reuse()
+        blobs.place(image.sha256, destination)
+    elif os.path.exists(destination) and os.path.samefile(image.path, destination):
+        # The saved file, unchanged: left as it is.
+        os.remove(image.path)
+    else:
+        # A rename rather than a write in place, which would change every hard link to the file (see --image-blobs).
+        os.replace(image.path, destination)
+
+
+def save_image_rows(
     row: Dict[str, str],
-    images_en: List[Dict[str, str]],
-    images_fr: List[Dict[str, str]],
+    sources: List[Tuple[int, Dict[str, str], Dict[str, str], str]],
+    files: List[ImageFile],
     images_dir: str,
-    timeout: int,
-) -> List[Dict[str, str]]:
+    blobs: Optional[ImageBlobStore] = None,
+) -> Tuple[List[Dict[str, str]], Dict[str, Dict[str, str]]]:
+    # The image rows, and the state entry (file name, digest, validators) of each image URL.
+    # Files that are already in place are left alone; files no image needs any more, and
+    # leftover temporary files, are removed.
     article_hash = row.get("hash", "")
     article_dir = image_directory_for_hash(images_dir, article_hash)
-    if os.path.isdir(article_dir):
-        shutil.rmtree(article_dir)
     os.makedirs(article_dir, exist_ok=True)
 
-    count = max(len(images_en), len(images_fr))
     output_rows: List[Dict[str, str]] = []
-
-    for image_index in range(count):
-        image_en = images_en[image_index] if image_index < len(images_en) else {}
-        image_fr = images_fr[image_index] if image_index < len(images_fr) else {}
-        source_url = image_en.get("source_url") or image_fr.get("source_url")
-        if not source_url:
-            continue
-
-        response = session.get(source_url, timeout=timeout)
-        response.raise_for_status()
-        extension = infer_extension(source_url, response.headers.get("Content-Type", ""))
+    entries: Dict[str, Dict[str, str]] = {}
+    taken: set = set()
+    for (image_index, image_en, image_fr, source_url), image in zip(sources, files):
+        extension = infer_extension(source_url, image.headers.get("Content-Type", ""))
         original_filename = original_filename_from_url(source_url)
         if original_filename and not os.path.splitext(original_filename)[1]:
             original_filename = f"{original_filename}{extension}"
         filename = make_unique_filename(
-            article_dir,
+            taken,
             original_filename,
             f"{article_hash}_{image_index + 1:03d}",
         )
+        taken.add(filename)
         destination_path = os.path.join(article_dir, filename)
-        with open(destination_path, "wb") as fh:
-            fh.write(response.content)
+        install_image(image, destination_path, source_url, blobs)
+        probe = probe_image(destination_path)
 
         output_rows.append(
             {
@@ -678,14 +1105,126 @@ def build_image_rows(
                 "ALT_TEXT_EN": image_en.get("alt_text", ""),
                 "ALT_TEXT_FR": image_fr.get("alt_text", ""),
                 "FILE_PATH": destination_path.replace("\\", "/"),
-                "EXIF_JSON": extract_exif_json(response.content),
+                "EXIF_JSON": probe.exif_json,
+                "WIDTH": probe.width,
+                "HEIGHT": probe.height,
+                "BYTES": image.size,
+                "SHA256": image.sha256,
             }
         )
+        entries[source_url] = validator_entry(image, filename=filename, sha256=image.sha256)
 
+    for entry in os.listdir(article_dir):
+        if entry not in taken:
+            path = os.path.join(article_dir, entry)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
     if not output_rows:
         shutil.rmtree(article_dir, ignore_errors=True)
 
-    return output_rows
+    return output_rows, entries
+
+
+def stored_image(
+    prior: Optional[PriorArticle], row: Dict[str, str], image_index: int, source_url: str, images_dir: str
+) -> Optional[ImageFile]:
+    # The file saved for this image URL on an earlier run. Rows from before the state kept image
+    # entries match at the same position, when the file name still derives from the same URL.
+    # It comes back as a temporary link, so the file saved for another image can take its name.
+    if prior is None:
+        return None
+    article_dir = image_directory_for_hash(images_dir, row.get("hash", ""))
+    entry = (prior.state.get("images") or {}).get(source_url, {})
+    if entry:
+        filename = entry["filename"]
+        path = os.path.join(article_dir, filename)
+    else:
+        stem = os.path.splitext(original_filename_from_url(source_url))[0] or f"{row.get('hash', '')}_{image_index + 1:03d}"
+        matches = [
+            image_row
+            for image_row in prior.image_rows
+            if int(image_row["IMAGE_INDEX"]) == image_index + 1
+            and re.fullmatch(rf"{re.escape(stem)}(_\d+)?\.\w+", image_row.get("FILENAME", ""))
+        ]
+        if not matches:
+            return None
+        filename, path = matches[0]["FILENAME"], matches[0]["FILE_PATH"]
+    if not os.path.isfile(path):
+        return None
+    link = temporary_path(article_dir)
+    os.remove(link)
+    try:
+        os.link(path, link)
+    except OSError:
+        shutil.copyfile(path, link)
+    headers = {
+        "Content-Type": mimetypes.guess_type(filename)[0] or "",
+        "ETag": entry.get("etag", ""),
+        "Last-Modified": entry.get("last_modified", ""),
+    }
+    return ImageFile(link, headers, entry.get("sha256") or file_sha256(link), os.path.getsize(link), True)
+
+
+def image_request(
+    prior: Optional[PriorArticle],
+    row: Dict[str, str],
+    image_index: int,
+    source_url: str,
+    images_dir: str,
+    blobs: Optional[ImageBlobStore] = None,
+) -> Tuple[Optional[ImageFile], Optional[Dict[str, str]]]:
+    # (saved file, request headers): headers of None mean the saved file is used without asking the
+    # server; otherwise the request is conditional whenever the saved file has validators. An image
+    # URL whose blob is already in the store is not downloaded again unless the server says it changed.
+    entry = (prior.state.get("images") or {}).get(source_url, {}) if prior is not None else {}
+    trust_blobs = prior is None or prior.trust_blobs
+    known = blobs.known(source_url) if blobs is not None and trust_blobs else None
+    if known is not None:
+        digest, content_type = known
+        headers = {
+            "Content-Type": content_type,
+            "ETag": entry.get("etag", ""),
+            "Last-Modified": entry.get("last_modified", ""),
+        }
+        blob = blobs.blob_path(digest)
+        stored = ImageFile(blob, headers, digest, os.path.getsize(blob), False)
+        validators = conditional_headers(entry)
+        if validators and not (prior is not None and prior.trust_files):
+            return stored, validators
+        return stored, None
+    if prior is None:
+        return None, {}
+    headers = conditional_headers(entry)
+    if not headers and not prior.trust_files:
+        return None, {}
+    stored = stored_image(prior, row, image_index, source_url, images_dir)
+    if stored is None:
+        return None, {}
+    return (stored, None) if prior.trust_files else (stored, headers)
+
+
+def build_image_rows(
+    session: requests.Session,
+    row: Dict[str, str],
+    images_en: List[Dict[str, str]],
+    images_fr: List[Dict[str, str]],
+    images_dir: str,
+    timeout: int,
+    prior: Optional[PriorArticle] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> Tuple[List[Dict[str, str]], Dict[str, Dict[str, str]]]:
+    sources = image_sources(images_en, images_fr)
+    article_dir = image_directory_for_hash(images_dir, row.get("hash", ""))
+    files = []
+    for image_index, _, _, source_url in sources:
+        stored, headers = image_request(prior, row, image_index, source_url, images_dir, blobs)
+        if headers is None:
+            files.append(stored)
+        else:
+            files.append(download_image(session, source_url, timeout, headers, article_dir, stored))
+    return save_image_rows(row, sources, files, images_dir, blobs)
 
 
 def valid_cached_state(cached_state: Dict[str, str]) -> bool:
@@ -698,50 +1237,381 @@ def valid_cached_state(cached_state: Dict[str, str]) -> bool:
     return "quote_count" in cached_state and "image_count" in cached_state
 
 
-def process_article(
-    row: Dict[str, str], images_dir: str, timeout: int
-) -> Tuple[str, List[Dict[str, str]], List[Dict[str, str]], Dict[str, str]]:
-    key = article_key(row)
-    session = make_session()
+ArticleResult = Tuple[str, List[Dict[str, str]], List[Dict[str, str]], Dict[str, str]]
+ParsedArticle = Tuple[List[Dict[str, str]], List[Dict[str, str]], List[Dict[str, str]], Dict[str, Dict[str, str]]]
 
-    try:
-        quotes_en, images_en = fetch_article_assets(session, row.get("TITLE_URL_EN", ""), "en", timeout)
-        quotes_fr, images_fr = fetch_article_assets(session, row.get("TITLE_URL_FR", ""), "fr", timeout)
-    except requests.HTTPError as exc:
-        status_code = getattr(exc.response, "status_code", None)
-        if status_code == 404:
-            shutil.rmtree(
-                image_directory_for_hash(images_dir, row.get("hash", "")),
-                ignore_errors=True,
-            )
-            state_row = {
-                "version": STATE_VERSION,
-                "hash": row.get("hash", ""),
-                "PUBDATE": row.get("PUBDATE", ""),
-                "TITLE_URL_EN": row.get("TITLE_URL_EN", ""),
-                "TITLE_URL_FR": row.get("TITLE_URL_FR", ""),
-                "quote_count": -1,
-                "image_count": -1,
-                "status": "not_found",
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            }
-            return key, [], [], state_row
-        raise
 
-    quote_rows = build_quote_rows(row, quotes_en, quotes_fr)
-    image_rows = build_image_rows(session, row, images_en, images_fr, images_dir, timeout)
-    state_row = {
+def article_state(
+    row: Dict[str, str],
+    status: str,
+    quote_count: int,
+    image_count: int,
+    pages: Optional[Dict[str, Dict[str, str]]] = None,
+    images: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Dict[str, str]:
+    state = {
         "version": STATE_VERSION,
         "hash": row.get("hash", ""),
         "PUBDATE": row.get("PUBDATE", ""),
         "TITLE_URL_EN": row.get("TITLE_URL_EN", ""),
         "TITLE_URL_FR": row.get("TITLE_URL_FR", ""),
-        "quote_count": len(quote_rows),
-        "image_count": len(image_rows),
-        "status": "ok",
+        "quote_count": quote_count,
+        "image_count": image_count,
+        "status": status,
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
-    return key, quote_rows, image_rows, state_row
+    # Per page and per image URL: the body digest and the ETag/Last-Modified validators.
+    if pages is not None:
+        state["pages"] = pages
+    if images is not None:
+        state["images"] = images
+    return state
+
+
+def is_not_found(exc: BaseException) -> bool:
+    return isinstance(exc, requests.HTTPError) and getattr(exc.response, "status_code", None) == 404
+
+
+def not_found_result(row: Dict[str, str], images_dir: str) -> ArticleResult:
+    shutil.rmtree(
+        image_directory_for_hash(images_dir, row.get("hash", "")),
+        ignore_errors=True,
+    )
+    return article_key(row), [], [], article_state(row, "not_found", -1, -1)
+
+
+def unchanged_result(row: Dict[str, str], prior: PriorArticle, pages: Sequence[Optional[Page]]) -> ArticleResult:
+    # Neither page changed: the article keeps its rows, image files and updated_at, with
+    # refreshed validators and the time of the check.
+    state = article_state(
+        row, "ok", len(prior.quote_rows), len(prior.image_rows), page_states(pages), prior.state.get("images", {})
+    )
+    state["checked_at"] = state["updated_at"]
+    state["updated_at"] = prior.state.get("updated_at", state["updated_at"])
+    return article_key(row), prior.quote_rows, prior.image_rows, state
+
+
+def parse_pages(
+    row: Dict[str, str], pages: Sequence[Optional[Page]], parser: str = "html.parser"
+) -> ParsedArticle:
+    # The CPU-bound part of an article: quote rows (with the speaker fields), the images to
+    # download and the page entries for the state.
+    html_en, html_fr = (None if page is None else page.html for page in pages)
+    quotes_en, images_en = ([], []) if html_en is None else parse_article_html(row["TITLE_URL_EN"], html_en, "en", parser)
+    quotes_fr, images_fr = ([], []) if html_fr is None else parse_article_html(row["TITLE_URL_FR"], html_fr, "fr", parser)
+    return build_quote_rows(row, quotes_en, quotes_fr), images_en, images_fr, page_states(pages)
+
+
+def save_article(
+    row: Dict[str, str],
+    parsed: ParsedArticle,
+    images_dir: str,
+    timeout: int,
+    prior: Optional[PriorArticle] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> ArticleResult:
+    quote_rows, images_en, images_fr, pages = parsed
+    image_rows, images = build_image_rows(
+        thread_session(), row, images_en, images_fr, images_dir, timeout, prior, blobs
+    )
+    return (
+        article_key(row),
+        quote_rows,
+        image_rows,
+        article_state(row, "ok", len(quote_rows), len(image_rows), pages, images),
+    )
+
+
+def process_article(
+    row: Dict[str, str],
+    images_dir: str,
+    timeout: int,
+    parser: str = "html.parser",
+    archive: Optional[PageArchive] = None,
+    prior: Optional[PriorArticle] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> ArticleResult:
+    try:
+        pages = fetch_pages(row, timeout, archive, prior)
+    except requests.HTTPError as exc:
+        if is_not_found(exc):
+            return not_found_result(row, images_dir)
+        raise
+    if unchanged_article(prior, pages):
+        return unchanged_result(row, prior, pages)
+    return save_article(row, parse_pages(row, pages, parser), images_dir, timeout, prior, blobs)
+
+
+async def fetch_page_async(
+    fetcher: AsyncFetcher,
+    url: str,
+    archive: Optional[PageArchive] = None,
+    prior_entry: Optional[Dict[str, str]] = None,
+) -> Optional[Page]:
+    if not normalize_space(url):
+        return None
+
+    if archive is not None and archive.serve_pages:
+        page = archived_page(archive, url, prior_entry)
+        if page is not None:
+            return page
+        return page_from_response(url, await fetcher.get(url), prior_entry, archive)
+    response = await fetcher.get(url, headers=conditional_headers(prior_entry))
+    return page_from_response(url, response, prior_entry, archive)
+
+
+async def fetch_image_async(
+    fetcher: AsyncFetcher,
+    url: str,
+    stored: Optional[ImageFile],
+    headers: Optional[Dict[str, str]],
+    directory: str,
+    timeout: int,
+) -> ImageFile:
+    if headers is None:
+        return stored
+    return await fetcher.run(url, lambda: download_image(thread_session(), url, timeout, headers, directory, stored))
+
+
+async def process_article_async(
+    fetcher: AsyncFetcher,
+    row: Dict[str, str],
+    images_dir: str,
+    timeout: int,
+    parser: str = "html.parser",
+    archive: Optional[PageArchive] = None,
+    prior: Optional[PriorArticle] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> ArticleResult:
+    # Same result as process_article(), with the EN page, the FR page and then every
+    # image of the article requested at the same time.
+    url_en, url_fr = row.get("TITLE_URL_EN", ""), row.get("TITLE_URL_FR", "")
+    pages = await asyncio.gather(
+        fetch_page_async(fetcher, url_en, archive, prior_page_entry(prior, "en", url_en)),
+        fetch_page_async(fetcher, url_fr, archive, prior_page_entry(prior, "fr", url_fr)),
+        return_exceptions=True,
+    )
+    # The EN page's error wins, as it does when the pages are fetched in turn.
+    for page in pages:
+        if isinstance(page, BaseException):
+            if is_not_found(page):
+                return not_found_result(row, images_dir)
+            raise page
+    if unchanged_article(prior, pages):
+        return unchanged_result(row, prior, pages)
+    for index, page in enumerate(pages):
+        if page is not None and page.html is None:
+            html = page_body(archive, page)
+            if html is None:
+                pages[index] = await fetch_page_async(fetcher, page.entry["url"], archive)
+            else:
+                pages[index] = page._replace(html=html)
+
+    quote_rows, images_en, images_fr, page_entries = parse_pages(row, pages, parser)
+    sources = image_sources(images_en, images_fr)
+    image_requests = [
+        image_request(prior, row, image_index, url, images_dir, blobs) for image_index, _, _, url in sources
+    ]
+    article_dir = image_directory_for_hash(images_dir, row.get("hash", ""))
+    files = await asyncio.gather(
+        *(
+            fetch_image_async(fetcher, source[3], stored, headers, article_dir, timeout)
+            for source, (stored, headers) in zip(sources, image_requests)
+        )
+    )
+    image_rows, images = save_image_rows(row, sources, list(files), images_dir, blobs)
+    return (
+        article_key(row),
+        quote_rows,
+        image_rows,
+        article_state(row, "ok", len(quote_rows), len(image_rows), page_entries, images),
+    )
+
+
+def worker_count(args: argparse.Namespace) -> int:
+    # Enough workers for the adaptive limit to reach its ceiling; the limiter holds them back below it.
+    return max(args.max_concurrency if args.concurrency == "adaptive" else args.max_workers, 1)
+
+
+def fetch_with_threads(
+    rows: Iterable[Dict[str, str]],
+    args: argparse.Namespace,
+    archive: Optional[PageArchive] = None,
+    priors: Optional[Dict[str, PriorArticle]] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> Iterator[Tuple[str, Union[ArticleResult, BaseException]]]:
+    priors = priors or {}
+    pending = iter(rows)
+    running: Dict[Future, str] = {}
+    executor = ThreadPoolExecutor(max_workers=worker_count(args))
+    try:
+        while True:
+            # Twice as many articles under way as the concurrency limit lets requests through: enough
+            # to keep the limit in use, while articles still finish one by one when it is low.
+            while len(running) < 2 * CONCURRENCY.slots():
+                row = next(pending, None)
+                if row is None:
+                    break
+                future = executor.submit(
+                    process_article,
+                    row,
+                    args.images_dir,
+                    args.timeout,
+                    args.html_parser,
+                    archive,
+                    priors.get(article_key(row)),
+                    blobs,
+                )
+                running[future] = article_key(row)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                try:
+                    yield key, future.result()
+                except Exception as exc:
+                    yield key, exc
+    finally:
+        # When the caller stops early, articles not started yet are dropped.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def fetch_with_parse_processes(
+    rows: Iterable[Dict[str, str]],
+    args: argparse.Namespace,
+    archive: Optional[PageArchive] = None,
+    priors: Optional[Dict[str, PriorArticle]] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> Iterator[Tuple[str, Union[ArticleResult, BaseException]]]:
+    # Page fetches and image downloads run on the I/O threads, parsing in worker processes,
+    # so parsing is not held to one core by the GIL. At most --parse-queue articles have
+    # pages fetched or being fetched but not yet parsed, which bounds the raw HTML in memory.
+    queue_size = max(args.parse_queue or 4 * args.parse_workers, 1)
+    priors = priors or {}
+    pending = iter(rows)
+    fetching: Dict[Future, Dict[str, str]] = {}
+    parsing: Dict[Future, Dict[str, str]] = {}
+    saving: Dict[Future, Dict[str, str]] = {}
+    with ThreadPoolExecutor(max_workers=worker_count(args)) as io_pool, ProcessPoolExecutor(
+        max_workers=args.parse_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as parse_pool:
+        while True:
+            while len(fetching) + len(parsing) < queue_size:
+                row = next(pending, None)
+                if row is None:
+                    break
+                fetching[io_pool.submit(fetch_pages, row, args.timeout, archive, priors.get(article_key(row)))] = row
+            if not (fetching or parsing or saving):
+                break
+
+            done, _ = wait([*fetching, *parsing, *saving], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    row = fetching.pop(future)
+                    error = future.exception()
+                    prior = priors.get(article_key(row))
+                    if error is None and unchanged_article(prior, future.result()):
+                        yield article_key(row), unchanged_result(row, prior, future.result())
+                    elif error is None:
+                        parsing[parse_pool.submit(parse_pages, row, future.result(), args.html_parser)] = row
+                    elif is_not_found(error):
+                        yield article_key(row), not_found_result(row, args.images_dir)
+                    else:
+                        yield article_key(row), error
+                elif future in parsing:
+                    row = parsing.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        saving[
+                            io_pool.submit(
+                                save_article,
+                                row,
+                                future.result(),
+                                args.images_dir,
+                                args.timeout,
+                                priors.get(article_key(row)),
+                                blobs,
+                            )
+                        ] = row
+                    else:
+                        yield article_key(row), error
+                else:
+                    row = saving.pop(future)
+                    yield article_key(row), future.exception() or future.result()
+
+
+def fetch_with_asyncio(
+    rows: Iterable[Dict[str, str]],
+    args: argparse.Namespace,
+    archive: Optional[PageArchive] = None,
+    priors: Optional[Dict[str, PriorArticle]] = None,
+    blobs: Optional[ImageBlobStore] = None,
+) -> Iterator[Tuple[str, Union[ArticleResult, BaseException]]]:
+    # The event loop runs between results, so each article is handed over (and journaled) as
+    # it finishes. Articles are started a window at a time, twice as many as requests may now be in
+    # flight, so they finish one by one instead of all together at the end; when the caller
+    # stops early, the articles still pending are cancelled.
+    priors = priors or {}
+    loop = asyncio.new_event_loop()
+    fetcher = AsyncFetcher(
+        lambda url, **kwargs: thread_session().get(url, timeout=args.timeout, **kwargs),
+        max_concurrency=worker_count(args),
+        per_host=args.max_per_host or worker_count(args),
+        requests_per_second=args.requests_per_second,
+    )
+    waiting = iter(rows)
+    tasks: Dict[asyncio.Task, str] = {}
+    pending: set = set()
+    try:
+        while True:
+            while len(pending) < 2 * CONCURRENCY.slots():
+                row = next(waiting, None)
+                if row is None:
+                    break
+                task = loop.create_task(
+                    process_article_async(
+                        fetcher,
+                        row,
+                        args.images_dir,
+                        args.timeout,
+                        args.html_parser,
+                        archive,
+                        priors.get(article_key(row)),
+                        blobs,
+                    )
+                )
+                tasks[task] = article_key(row)
+                pending.add(task)
+            if not pending:
+                break
+            done, pending = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                yield tasks.pop(task), task.exception() or task.result()
+    finally:
+        if pending:
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.wait(pending))
+        fetcher.close()
+        loop.close()
+
+
+def rows_until(rows: List[Dict[str, str]], deadline: Optional[float]) -> Iterator[Dict[str, str]]:
+    # The engines take rows as they have room for them; past the deadline none are left, so
+    # they finish the articles already under way and stop.
+    for row in rows:
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        yield row
+
+
+def published_within(row: Dict[str, str], days: int, today: date) -> bool:
+    try:
+        published = date.fromisoformat(normalize_space(row.get("PUBDATE", ""))[:10])
+    except ValueError:
+        return False
+    return (today - published).days < days
 
 
 def prune_to_current_keys(
@@ -756,6 +1626,44 @@ def prune_to_current_keys(
     return kept_quotes, kept_images, kept_state
 
 
+def log_queue_depth(input_rows: List[Dict[str, str]], state: Dict[str, Dict[str, str]], now: datetime) -> None:
+    # What the next run starts from.
+    queue: List[Dict[str, str]] = []
+    sitting_out = {"retry": 0, DEAD_LETTER: 0}
+    for row in input_rows:
+        entry = state.get(article_key(row))
+        if valid_cached_state(entry):
+            continue
+        reason = waiting_reason(entry, now)
+        if reason:
+            sitting_out[reason] += 1
+        else:
+            queue.append(row)
+    logging.info(
+        "Queue: %s articles still to fetch (%s); %s failed ones waiting to retry, %s dead letters.",
+        len(queue),
+        describe_depth(queue_depth(queue, now.date())),
+        sitting_out["retry"],
+        sitting_out[DEAD_LETTER],
+    )
+
+
+def fill_image_file_fields(existing_images: Dict[str, List[Dict[str, str]]]) -> List[str]:
+    # Rows saved before the WIDTH, HEIGHT, BYTES and SHA256 columns get them from their files.
+    # Returns the keys of the articles that had such rows.
+    filled = []
+    for key, image_rows in existing_images.items():
+        for image_row in image_rows:
+            path = image_row.get("FILE_PATH", "")
+            if image_row.get("SHA256") or not os.path.isfile(path):
+                continue
+            probe = probe_image(path)
+            image_row.update(WIDTH=probe.width, HEIGHT=probe.height, BYTES=os.path.getsize(path), SHA256=file_sha256(path))
+            if key not in filled:
+                filled.append(key)
+    return filled
+
+
 def cleanup_removed_article_dirs(images_dir: str, current_hashes: set) -> None:
     if not os.path.isdir(images_dir):
         return
@@ -765,110 +1673,245 @@ def cleanup_removed_article_dirs(images_dir: str, current_hashes: set) -> None:
             shutil.rmtree(full_path, ignore_errors=True)
 
 
-def apply_counts_to_input_rows(
+def article_counts(
     input_rows: List[Dict[str, str]],
     state: Dict[str, Dict[str, str]],
-) -> None:
+) -> Dict[str, ArticleCount]:
+    # The quote and image counts of every extracted article, by hash. Articles without a valid
+    # state entry are left out, so the count table keeps what it had for them.
+    counts = {}
     for row in input_rows:
-        key = article_key(row)
-        cached_state = state.get(key)
+        cached_state = state.get(article_key(row))
         if valid_cached_state(cached_state):
-            row["QUOTE_COUNT"] = str(cached_state.get("quote_count", ""))
-            row["IMAGE_COUNT"] = str(cached_state.get("image_count", ""))
-        else:
-            row.setdefault("QUOTE_COUNT", "")
-            row.setdefault("IMAGE_COUNT", "")
-
-
-def ensure_count_fields(fieldnames: List[str]) -> List[str]:
-    updated = list(fieldnames)
-    for field in COUNT_FIELDS:
-        if field not in updated:
-            updated.append(field)
-    return updated
-
+            counts[normalize_space(row.get("hash", ""))] = ArticleCount(
+                int(cached_state["quote_count"]), int(cached_state["image_count"])
+            )
+    return counts
 
-def main() -> int:
-    args = parse_args()
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
-    input_rows, input_fieldnames = load_input_rows(args.input)
+def write_store(
+    conn,
+    args: argparse.Namespace,
+    fetched: Dict[str, Tuple[str, List[Dict[str, str]], List[Dict[str, str]]]],
+) -> None:
+    # Only re-fetched (or filled-in) articles are rewritten; everything else stays where it is.
+    for article_hash, quote_rows, image_rows in fetched.values():
+        replace_article_rows(conn, "quotes", article_hash, with_stable_ids(quote_rows, "QUOTE_INDEX", "quote"))
+        replace_article_rows(conn, "images", article_hash, with_stable_ids(image_rows, "IMAGE_INDEX", "image"))
+    with conn:
+        for table in ("quotes", "images"):
+            conn.execute(f"DELETE FROM {table} WHERE hash NOT IN (SELECT hash FROM news)")
+    # The counts go to their own table (write_counts), like in the other layouts.
+    export_csv(conn, "quotes", args.quotes_output)
+    export_csv(conn, "images", args.images_output)
+
+
+class Extraction(NamedTuple):
+    input_rows: List[Dict[str, str]]  # as read; the counts are in counts
+    input_fieldnames: List[str]
+    quote_rows: List[Dict[str, str]]  # in article order, before stable ids are assigned
+    image_rows: List[Dict[str, str]]
+    state: Dict[str, Dict[str, str]]
+    fetched: Dict[str, Tuple[str, List[Dict[str, str]], List[Dict[str, str]]]]
+    counts: Dict[str, ArticleCount]
+
+
+def extract(
+    args: argparse.Namespace,
+    input_rows: List[Dict[str, str]],
+    input_fieldnames: List[str],
+    existing_quotes: Dict[str, List[Dict[str, str]]],
+    existing_images: Dict[str, List[Dict[str, str]]],
+    state: Dict[str, Dict[str, str]],
+    journal: Optional[ExtractJournal] = None,
+    checkpoint: Optional[Callable[[Extraction], None]] = None,
+) -> Extraction:
+    # Fetches what is missing and downloads article images. The CSVs and state are left to the
+    # caller: checkpoint() writes them every --checkpoint-minutes, and the final write is the
+    # caller's. Each finished article goes to the journal in between.
     current_keys = {article_key(row) for row in input_rows}
     current_hashes = {normalize_space(row.get("hash", "")) for row in input_rows}
-
-    existing_quotes = {} if args.full_rebuild else load_existing_rows(
-        args.quotes_output,
-        [
-            "QUOTE_INDEX",
-            "QUOTE_EN",
-            "SPEAKER_EN",
-            "SPEAKER_NAME_EN",
-            "SPEAKER_TITLE_EN",
-            "SPEAKER_ORGANIZATION_EN",
-            "QUOTE_FR",
-            "SPEAKER_FR",
-            "SPEAKER_NAME_FR",
-            "SPEAKER_TITLE_FR",
-            "SPEAKER_ORGANIZATION_FR",
-        ],
-    )
-    existing_images = {} if args.full_rebuild else load_existing_rows(
-        args.images_output,
-        ["IMAGE_INDEX", "FILENAME", "ALT_TEXT_EN", "ALT_TEXT_FR", "FILE_PATH", "EXIF_JSON"],
-    )
-    state = {} if args.full_rebuild else load_state(args.state)
     existing_quotes, existing_images, state = prune_to_current_keys(
         current_keys, existing_quotes, existing_images, state
     )
 
+    filled_keys = fill_image_file_fields(existing_images)
+
+    # Articles an interrupted run finished come from its journal instead of being fetched again.
+    resumed = set()
+    for record in journal.records() if journal is not None else []:
+        key = record["key"]
+        if key in current_keys:
+            existing_quotes[key] = compact_rows(record["quotes"], QUOTE_ROW_FIELDS)
+            existing_images[key] = compact_rows(record["images"], IMAGE_ROW_FIELDS)
+            state[key] = record["state"]
+            resumed.add(key)
+    if resumed:
+        logging.info("Resumed %s articles finished by an interrupted run, from %s.", len(resumed), journal.path)
+
     rows_by_key_quotes: Dict[str, List[Dict[str, str]]] = {}
     rows_by_key_images: Dict[str, List[Dict[str, str]]] = {}
     rows_needing_fetch: List[Dict[str, str]] = []
+    rows_to_revalidate: List[Dict[str, str]] = []
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    sitting_out = {"retry": 0, DEAD_LETTER: 0}
 
     for row in input_rows:
         key = article_key(row)
         cached_state = state.get(key)
-        if valid_cached_state(cached_state):
+        # --reparse redoes every article that had pages, from the archive; not-found ones stay as they are.
+        reparse = args.reparse and key not in resumed and (cached_state or {}).get("status") == "ok"
+        if valid_cached_state(cached_state) and not reparse:
             rows_by_key_quotes[key] = existing_quotes.get(key, [])
             rows_by_key_images[key] = existing_images.get(key, [])
+            # Recent articles are re-checked for edits made after publication.
+            revalidate = args.revalidate_days > 0 and key not in resumed
+            if revalidate and published_within(row, args.revalidate_days, today):
+                rows_to_revalidate.append(row)
         else:
             rows_by_key_quotes[key] = existing_quotes.get(key, [])
             rows_by_key_images[key] = existing_images.get(key, [])
-            rows_needing_fetch.append(row)
+            # Articles that failed before wait out their backoff; dead letters wait for --retry-dead-letters.
+            reason = waiting_reason(cached_state, now, args.retry_dead_letters)
+            if reason:
+                sitting_out[reason] += 1
+            else:
+                rows_needing_fetch.append(row)
 
+    # Newest first, so the latest releases are extracted in this run however long the backlog is.
+    rows_needing_fetch = newest_first(rows_needing_fetch)
     if args.limit > 0:
         rows_to_fetch = rows_needing_fetch[: args.limit]
     else:
         rows_to_fetch = rows_needing_fetch
 
     logging.info(
-        "Preparing quote and image extraction for %s articles (%s cached, %s to fetch this run, %s still pending).",
+        "Preparing quote and image extraction for %s articles (%s cached, %s to fetch this run, %s still pending, "
+        "%s recent ones to revalidate, %s failed ones waiting to retry, %s dead letters).",
         len(input_rows),
-        len(input_rows) - len(rows_needing_fetch),
+        len(input_rows) - len(rows_needing_fetch) - sum(sitting_out.values()),
         len(rows_to_fetch),
         max(len(rows_needing_fetch) - len(rows_to_fetch), 0),
+        len(rows_to_revalidate),
+        sitting_out["retry"],
+        sitting_out[DEAD_LETTER],
     )
+    rows_to_fetch = newest_first(rows_to_fetch + rows_to_revalidate)
+    rows_by_key = {article_key(row): row for row in rows_to_fetch}
 
     os.makedirs(args.images_dir, exist_ok=True)
     cleanup_removed_article_dirs(args.images_dir, current_hashes)
 
-    with ThreadPoolExecutor(max_workers=max(args.max_workers, 1)) as executor:
-        future_to_key = {
-            executor.submit(process_article, row, args.images_dir, args.timeout): article_key(row)
-            for row in rows_to_fetch
-        }
-        for future in as_completed(future_to_key):
-            key = future_to_key[future]
-            try:
-                article_key_value, quote_rows, image_rows, state_row = future.result()
-            except Exception as exc:
-                logging.warning("Failed to process %s: %s", key, exc)
-                continue
-
+    fetched: Dict[str, Tuple[str, List[Dict[str, str]], List[Dict[str, str]]]] = {
+        key: (state[key]["hash"], existing_quotes[key], existing_images[key]) for key in resumed
+    }
+    archive = PageArchive(args.page_archive, serve_pages=args.reparse) if args.page_archive else None
+    blobs = ImageBlobStore(args.image_blobs) if args.image_blobs else None
+    # Validators and rows from earlier runs: pages and images are requested conditionally, and
+    # reparsed articles keep the image files already saved for them.
+    priors = {
+        article_key(row): PriorArticle(
+            state.get(article_key(row), {}),
+            existing_quotes.get(article_key(row), []),
+            existing_images.get(article_key(row), []),
+            args.reparse,
+            not args.full_rebuild,
+        )
+        for row in rows_to_fetch
+    }
+    CONCURRENCY.configure(args.max_workers, worker_count(args), adaptive=args.concurrency == "adaptive")
+    http_before = HTTP_STATS.snapshot()
+    if args.engine == "async":
+        fetch_articles = fetch_with_asyncio
+    elif args.parse_workers > 0:
+        fetch_articles = fetch_with_parse_processes
+    else:
+        fetch_articles = fetch_with_threads
+    started = time.monotonic()
+    deadline = started + args.time_budget * 60 if args.time_budget > 0 else None
+    next_checkpoint = started + args.checkpoint_minutes * 60
+    unchanged = finished = 0
+    for key, result in fetch_articles(rows_until(rows_to_fetch, deadline), args, archive, priors, blobs):
+        finished += 1
+        if isinstance(result, BaseException):
+            logging.warning("Failed to process %s: %s", key, result)
+            # A failed revalidation leaves the article as it was; otherwise the failure is counted
+            # and the next attempt put off.
+            previous = state.get(key)
+            if not valid_cached_state(previous):
+                state[key] = {
+                    **article_state(rows_by_key[key], FAILED, -1, -1),
+                    **failure_entry(previous, result, datetime.now(timezone.utc), args.max_attempts),
+                }
+        else:
+            article_key_value, quote_rows, image_rows, state_row = result
+            if "checked_at" in state_row:
+                unchanged += 1
+            if journal is not None:
+                journal.append(article_key_value, quote_rows, image_rows, state_row)
+
+            quote_rows = compact_rows(quote_rows, QUOTE_ROW_FIELDS)
+            image_rows = compact_rows(image_rows, IMAGE_ROW_FIELDS)
             rows_by_key_quotes[article_key_value] = quote_rows
             rows_by_key_images[article_key_value] = image_rows
             state[article_key_value] = state_row
+            fetched[article_key_value] = (state_row["hash"], quote_rows, image_rows)
+
+        if checkpoint is not None and time.monotonic() >= next_checkpoint:
+            checkpoint(assemble_extraction(input_rows, input_fieldnames, rows_by_key_quotes, rows_by_key_images, state, fetched))
+            if journal is not None:
+                journal.clear()
+            logging.info("Checkpoint: outputs written after %s of %s articles.", finished, len(rows_to_fetch))
+            next_checkpoint = time.monotonic() + args.checkpoint_minutes * 60
+    if finished < len(rows_to_fetch):
+        logging.info(
+            "Time budget of %s minutes used up after %s of %s articles; the rest wait for the next run.",
+            args.time_budget,
+            finished,
+            len(rows_to_fetch),
+        )
+    if rows_to_fetch:
+        logging.info(
+            "Fetched %s articles (%s unchanged since the last run): %s.",
+            finished,
+            unchanged,
+            HTTP_STATS.summary(http_before),
+        )
+        logging.info("Concurrency: %s.", CONCURRENCY.summary())
+        if CONCURRENCY.adaptive:
+            logging.info("Concurrency trace (seconds:limit): %s", CONCURRENCY.trace_text())
+        if args.concurrency_trace:
+            CONCURRENCY.write_trace(args.concurrency_trace)
+    log_queue_depth(input_rows, state, datetime.now(timezone.utc))
+    # Cached articles whose image rows were filled in are written again too.
+    for key in filled_keys:
+        if key not in fetched:
+            image_rows = rows_by_key_images[key]
+            fetched[key] = (image_rows[0]["hash"], rows_by_key_quotes[key], image_rows)
+    if filled_keys:
+        logging.info("Filled in the size and digest of the saved images of %s articles.", len(filled_keys))
+    if archive is not None and (archive.served or archive.stored):
+        logging.info(
+            "Page archive: %s pages read from %s, %s new or changed pages stored.",
+            archive.served,
+            args.page_archive,
+            archive.stored,
+        )
+    if blobs is not None and blobs.reused:
+        logging.info("Image store: %s images linked from blobs already downloaded.", blobs.reused)
 
+    return assemble_extraction(input_rows, input_fieldnames, rows_by_key_quotes, rows_by_key_images, state, fetched)
+
+
+def assemble_extraction(
+    input_rows: List[Dict[str, str]],
+    input_fieldnames: List[str],
+    rows_by_key_quotes: Dict[str, List[Dict[str, str]]],
+    rows_by_key_images: Dict[str, List[Dict[str, str]]],
+    state: Dict[str, Dict[str, str]],
+    fetched: Dict[str, Tuple[str, List[Dict[str, str]], List[Dict[str, str]]]],
+) -> Extraction:
     ordered_quote_rows: List[Dict[str, str]] = []
     ordered_image_rows: List[Dict[str, str]] = []
     for row in input_rows:
@@ -880,19 +1923,204 @@ def main() -> int:
         ordered_quote_rows.extend(quote_rows)
         ordered_image_rows.extend(image_rows)
 
-    apply_counts_to_input_rows(input_rows, state)
-    write_rows(args.quotes_output, QUOTE_OUTPUT_FIELDS, ordered_quote_rows, "QUOTE_INDEX", "quote")
-    write_rows(args.images_output, IMAGE_OUTPUT_FIELDS, ordered_image_rows, "IMAGE_INDEX", "image")
-    write_state(args.state, state)
-    write_input_rows(args.input, ensure_count_fields(input_fieldnames), input_rows)
+    return Extraction(
+        input_rows,
+        input_fieldnames,
+        ordered_quote_rows,
+        ordered_image_rows,
+        state,
+        dict(fetched),
+        article_counts(input_rows, state),
+    )
 
-    logging.info(
-        "Wrote %s quote rows to %s and %s image rows to %s.",
-        len(ordered_quote_rows),
-        args.quotes_output,
-        len(ordered_image_rows),
-        args.images_output,
+
+def write_counts(args: argparse.Namespace, extraction: Extraction) -> None:
+    table = ArticleCounts(args.counts)
+    changed = table.update(extraction.counts, [normalize_space(row.get("hash", "")) for row in extraction.input_rows])
+    if changed:
+        logging.info("Counts of %s articles updated in %s.", changed, args.counts)
+
+
+def write_outputs(args: argparse.Namespace, extraction: Extraction) -> None:
+    # The state goes last: it must never list an article whose rows are not written yet. The
+    # news CSV is ingestion's; the counts go to their own table.
+    write_rows(args.quotes_output, QUOTE_OUTPUT_FIELDS, extraction.quote_rows, "QUOTE_INDEX", "quote")
+    write_rows(args.images_output, IMAGE_OUTPUT_FIELDS, extraction.image_rows, "IMAGE_INDEX", "image")
+    write_counts(args, extraction)
+    write_state(args.state, extraction.state)
+
+
+def write_partitions(args: argparse.Namespace, extraction: Extraction) -> None:
+    # Only the months whose rows changed are rewritten; the state goes last here too.
+    tables = [
+        ("quotes", QUOTE_OUTPUT_FIELDS, with_stable_ids(extraction.quote_rows, "QUOTE_INDEX", "quote"), args.quotes_output),
+        ("images", IMAGE_OUTPUT_FIELDS, with_stable_ids(extraction.image_rows, "IMAGE_INDEX", "image"), args.images_output),
+    ]
+    written = []
+    for table, fieldnames, rows, path in tables:
+        rewritten, total = write_table(args.partitions, table, fieldnames, rows)
+        written.append(f"{rewritten} of {total} {table}")
+        if args.concat_outputs and rewritten:
+            concat_table(args.partitions, table, path)
+    logging.info("Partitions rewritten under %s: %s.", args.partitions, ", ".join(written))
+    write_counts(args, extraction)
+    write_state(args.state, extraction.state)
+
+
+def save_extraction(args: argparse.Namespace, extraction: Extraction, conn=None) -> None:
+    if conn is not None:
+        write_store(conn, args, extraction.fetched)
+        write_counts(args, extraction)
+        write_state(args.state, extraction.state)
+    elif args.partitions:
+        write_partitions(args, extraction)
+    else:
+        write_outputs(args, extraction)
+
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    from scripts.stand_in_server import start_server, synthetic_news_rows
+
+    server = start_server(args.benchmark_latency, capacity=args.benchmark_capacity)
+    rows = synthetic_news_rows(server.base_url, args.benchmark_articles)
+    outputs = {}
+    throttling = f", throttled above {args.benchmark_capacity} in flight" if args.benchmark_capacity else ""
+    print(
+        f"{len(rows)} articles, {args.benchmark_latency * 1000:.0f} ms per response{throttling}, "
+        f"{args.concurrency} concurrency from {args.max_workers} (ceiling {args.max_concurrency})"
     )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            parse_workers = args.parse_workers or os.cpu_count() or 1
+            if args.benchmark_capacity:
+                variants = [
+                    (f"{engine}/{mode}", {"engine": engine, "parse_workers": 0, "concurrency": mode})
+                    for engine in ("threads", "async")
+                    for mode in ("fixed", "adaptive")
+                ]
+            else:
+                variants = [
+                    ("threads", {"engine": "threads", "parse_workers": 0}),
+                    (f"threads+{parse_workers}p", {"engine": "threads", "parse_workers": parse_workers}),
+                    ("async", {"engine": "async"}),
+                ]
+            for name, options in variants:
+                work = os.path.join(tmp, name.replace("+", "_"))
+                os.makedirs(work)
+                paths = {name: os.path.join(work, name) for name in ("news.csv", "quotes.csv", "images.csv")}
+                write_input_rows(paths["news.csv"], list(rows[0]), [dict(row) for row in rows])
+                run_args = argparse.Namespace(**{
+                    **vars(args),
+                    **options,
+                    "input": paths["news.csv"],
+                    "quotes_output": paths["quotes.csv"],
+                    "images_output": paths["images.csv"],
+                    "state": os.path.join(work, "state.json"),
+                    "counts": os.path.join(work, "counts.csv"),
+                    "images_dir": os.path.join(work, "images"),
+                    "page_archive": os.path.join(work, "pages"),
+                    "image_blobs": os.path.join(work, "blobs"),
+                    "reparse": False,
+                    "revalidate_days": 0,
+                    "limit": 0,
+                    "concurrency_trace": "",
+                })
+                server.requests = server.peak_in_flight = server.throttled = 0
+                started = time.perf_counter()
+                input_rows, input_fieldnames = load_input_rows(run_args.input)
+                write_outputs(run_args, extract(run_args, input_rows, input_fieldnames, {}, {}, {}))
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{name:<16} {elapsed:7.2f}s  {len(rows) / elapsed:7.1f} articles/s  "
+                    f"{server.requests} requests ({server.throttled} throttled), at most {server.peak_in_flight} at once"
+                )
+                if run_args.concurrency == "adaptive":
+                    print(f"{'':<16} limit {CONCURRENCY.summary()}")
+                with open(paths["quotes.csv"], encoding="utf-8") as fh:
+                    quotes = fh.read()
+                with open(paths["images.csv"], encoding="utf-8") as fh:
+                    images = fh.read().replace(run_args.images_dir.replace("\\", "/"), "IMAGES")
+                outputs[name] = (quotes, images)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    identical = len(set(outputs.values())) == 1
+    print("Quote and image CSVs identical:", "yes" if identical else "NO")
+    return 0 if identical else 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    if args.benchmark:
+        logging.getLogger().setLevel(logging.WARNING)
+        return run_benchmark(args)
+
+    conn = None
+    if args.store:
+        conn = open_store(args.store)
+        ensure_imported(conn, "news", args.input)
+        ensure_imported(conn, "quotes", args.quotes_output)
+        ensure_imported(conn, "images", args.images_output)
+        input_rows, input_fieldnames = load_rows(conn, "news"), list(NEWS_COLUMNS)
+    else:
+        input_rows, input_fieldnames = load_input_rows(args.input)
+    if args.partitions:
+        # The first partitioned run splits the single files it would otherwise read.
+        for table, path in (("quotes", args.quotes_output), ("images", args.images_output)):
+            if not has_table(args.partitions, table) and os.path.exists(path):
+                split_table(args.partitions, table, path)
+
+    if args.full_rebuild:
+        existing_quotes, existing_images = {}, {}
+    elif conn is not None:
+        existing_quotes = group_existing_rows(load_rows(conn, "quotes"), QUOTE_ROW_FIELDS)
+        existing_images = group_existing_rows(load_rows(conn, "images"), IMAGE_ROW_FIELDS)
+    elif args.partitions:
+        existing_quotes = group_existing_rows(
+            read_rows(args.partitions, "quotes") if has_table(args.partitions, "quotes") else [], QUOTE_ROW_FIELDS
+        )
+        existing_images = group_existing_rows(
+            read_rows(args.partitions, "images") if has_table(args.partitions, "images") else [], IMAGE_ROW_FIELDS
+        )
+    else:
+        existing_quotes = load_existing_rows(args.quotes_output, QUOTE_ROW_FIELDS)
+        existing_images = load_existing_rows(args.images_output, IMAGE_ROW_FIELDS)
+    state = {} if args.full_rebuild else load_state(args.state)
+
+    journal = ExtractJournal(args.journal) if args.journal else None
+    extraction = extract(
+        args,
+        input_rows,
+        input_fieldnames,
+        existing_quotes,
+        existing_images,
+        state,
+        journal,
+        lambda checkpoint: save_extraction(args, checkpoint, conn),
+    )
+    save_extraction(args, extraction, conn)
+    if conn is not None:
+        conn.close()
+    if journal is not None:
+        journal.clear()
+
+    if args.partitions and not args.concat_outputs:
+        logging.info(
+            "Kept %s quote rows and %s image rows in %s.",
+            len(extraction.quote_rows),
+            len(extraction.image_rows),
+            args.partitions,
+        )
+    else:
+        logging.info(
+            "Wrote %s quote rows to %s and %s image rows to %s.",
+            len(extraction.quote_rows),
+            args.quotes_output,
+            len(extraction.image_rows),
+            args.images_output,
+        )
     return 0
 
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Conditional, cache-aware fetching of the canada.ca news datatable feeds.
+
+Each feed's ETag, Last-Modified and SHA-256 digest are kept in a small JSON state
+file, and the last body is cached on disk so a 304 response can be served
+locally. Both feeds are fetched concurrently through one pooled session.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+FEED_URLS = {
+    "en": "https://www.canada.ca/en/news.datatable.json",
+    "fr": "https://www.canada.ca/fr/nouvelles.datatable.json",
+}
+FEED_STATE_PATH = os.path.join("data", "news_feed_state.json")
+FEED_CACHE_DIR = os.path.join(".cache", "news_feeds")
+
+
+class FeedResult(NamedTuple):
+    lang: str
+    data: dict
+    changed: bool
+    state: Dict[str, str]
+
+
+def make_session(pool_size: int = len(FEED_URLS)) -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": (
+                "GC-News-Nouvelles-GC news feed updater "
+                "(https://github.com/PatLittle/GC-News-Nouvelles-GC)"
+            )
+        }
+    )
+    return session
+
+
+def load_feed_state(path: str = FEED_STATE_PATH) -> Dict[str, Dict[str, str]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def write_feed_state(state: Dict[str, Dict[str, str]], path: str = FEED_STATE_PATH) -> None:
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def cached_body_path(cache_dir: str, lang: str) -> str:
+    return os.path.join(cache_dir, f"{lang}.json")
+
+
+def fetch_feed(
+    session: requests.Session,
+    lang: str,
+    url: str,
+    cached_state: Dict[str, str],
+    cache_dir: str,
+    timeout: int,
+) -> Optional[FeedResult]:
+    body_path = cached_body_path(cache_dir, lang)
+    headers = {}
+    # Validators are only useful if we still have the body they describe.
+    if cached_state and os.path.exists(body_path):
+        if cached_state.get("etag"):
+            headers["If-None-Match"] = cached_state["etag"]
+        if cached_state.get("last_modified"):
+            headers["If-Modified-Since"] = cached_state["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        with open(body_path, "rb") as fh:
+            content = fh.read()
+        return FeedResult(lang, json.loads(content), False, dict(cached_state))
+    if response.status_code != 200:
+        return None
+
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(body_path, "wb") as fh:
+        fh.write(content)
+
+    state = {
+        "url": url,
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+        "sha256": digest,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # A server that ignores the validators still gets caught by the digest.
+    changed = digest != (cached_state or {}).get("sha256")
+    return FeedResult(lang, json.loads(content), changed, state)
+
+
+def fetch_feeds(
+    feed_state: Dict[str, Dict[str, str]],
+    cache_dir: str = FEED_CACHE_DIR,
+    timeout: int = 60,
+    session: Optional[requests.Session] = None,
+) -> Optional[Dict[str, FeedResult]]:
+    session = session or make_session()
+    with ThreadPoolExecutor(max_workers=len(FEED_URLS)) as executor:
+        futures = {
+            lang: executor.submit(
+                fetch_feed, session, lang, url, feed_state.get(lang, {}), cache_dir, timeout
+            )
+            for lang, url in FEED_URLS.items()
+        }
+        try:
+            results = {lang: future.result() for lang, future in futures.items()}
+        except requests.RequestException as exc:
+            print(f"Error fetching news feeds: {exc}")
+            return None
+
+    if any(result is None for result in results.values()):
+        return None
+    return results
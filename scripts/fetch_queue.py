@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Order and retry policy for the articles the quote extractor still has to fetch.
+
+Pending articles go newest PUBDATE first, so the day's releases are extracted in
+the run that first sees them even while an old backlog is waiting. An article
+that fails is recorded in the extractor state with its attempt count, its last
+error and the time of its next retry, which doubles with every failure (1 hour,
+2, 4, ...). Until then runs pass over it. After --max-attempts failures it
+becomes a dead letter and is left out of every run until the extractor is given
+--retry-dead-letters.
+
+List the failing and dead-letter articles:
+    python -m scripts.fetch_queue --state data/news_quotes_state.json
+"""
+
+import argparse
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+RETRY_BASE_MINUTES = 60
+FAILED = "failed"
+DEAD_LETTER = "dead_letter"
+# (label, newest age in days the bucket takes); the last bucket takes the rest
+AGE_BUCKETS = [("last day", 1), ("last week", 7), ("last month", 30), ("last year", 365), ("older", None)]
+
+
+def pubdate_of(row: Dict[str, str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(" ".join(str(row.get("PUBDATE", "")).split())[:10])
+    except ValueError:
+        return None
+
+
+def newest_first(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    # Stable, so articles of the same day keep their input order; undated ones go last.
+    return sorted(rows, key=lambda row: pubdate_of(row) or date.min, reverse=True)
+
+
+def failure_entry(previous: Optional[Dict], error: BaseException, now: datetime, max_attempts: int) -> Dict:
+    # The failure fields of an article's state entry, counting on from the previous entry's.
+    attempts = int((previous or {}).get("attempts", 0)) + 1
+    entry = {
+        "status": DEAD_LETTER if attempts >= max_attempts else FAILED,
+        "attempts": attempts,
+        "last_error": f"{type(error).__name__}: {error}"[:500],
+        "failed_at": now.isoformat(),
+    }
+    if entry["status"] == FAILED:
+        entry["next_retry_at"] = (now + timedelta(minutes=RETRY_BASE_MINUTES * 2 ** (attempts - 1))).isoformat()
+    return entry
+
+
+def waiting_reason(entry: Optional[Dict], now: datetime, retry_dead_letters: bool = False) -> str:
+    # "retry" or "dead_letter" when the article sits this run out, "" when it is due.
+    status = (entry or {}).get("status")
+    if status == DEAD_LETTER and not retry_dead_letters:
+        return DEAD_LETTER
+    if status == FAILED and entry.get("next_retry_at", "") > now.isoformat():
+        return "retry"
+    return ""
+
+
+def age_bucket(row: Dict[str, str], today: date) -> str:
+    published = pubdate_of(row)
+    if published is None:
+        return "undated"
+    age = (today - published).days
+    for label, newest in AGE_BUCKETS:
+        if newest is None or age < newest:
+            return label
+    return AGE_BUCKETS[-1][0]
+
+
+def queue_depth(rows: List[Dict[str, str]], today: date) -> Dict[str, int]:
+    depth = {label: 0 for label, _ in AGE_BUCKETS}
+    for row in rows:
+        bucket = age_bucket(row, today)
+        depth[bucket] = depth.get(bucket, 0) + 1
+    return depth
+
+
+def describe_depth(depth: Dict[str, int]) -> str:
+    return ", ".join(f"{count} from the {label}" if label.startswith("last") else f"{count} {label}" for label, count in depth.items())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="List the articles the quote extractor failed to fetch.")
+    parser.add_argument("--state", default=os.path.join("data", "news_quotes_state.json"))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    with open(parse_args().state, encoding="utf-8") as fh:
+        state = json.load(fh)
+    failing = sorted(
+        (entry for entry in state.values() if entry.get("status") in (FAILED, DEAD_LETTER)),
+        key=lambda entry: (entry["status"], entry.get("PUBDATE", "")),
+        reverse=True,
+    )
+    for entry in failing:
+        retry = f", next retry {entry['next_retry_at'][:16]}" if entry.get("next_retry_at") else ""
+        print(f"{entry['status']:<11} {entry.get('PUBDATE', '')[:10]}  {entry.get('attempts')} attempts{retry}")
+        print(f"    {entry.get('TITLE_URL_EN') or entry.get('TITLE_URL_FR')}")
+        print(f"    {entry.get('last_error', '')}")
+    dead = sum(1 for entry in failing if entry["status"] == DEAD_LETTER)
+    print(f"{len(failing) - dead} articles waiting to retry, {dead} dead letters")
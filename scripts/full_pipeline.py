@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+The stages after news ingestion, run in one process on data loaded once.
+
+combined_news.csv, the quote and image CSVs and the extractor state are read a
+single time. The rows the extractor ends with are handed, in memory, to the search
+index builder, the count cube behind the charts and (with --readme) the README
+generator, and every output file is written together at the end. Only the article
+images are saved while the extractor runs, as each one is downloaded.
+
+The per-stage scripts (extract_news_quotes.py, build_search_index.py,
+news_charts.py, gen_readme.py) still run on their own and give the same files.
+
+Run it:                         python -m scripts.full_pipeline
+Extractor options pass through: python -m scripts.full_pipeline --limit 50 --max-workers 4
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+import gen_readme
+from scripts import build_search_index, extract_news_quotes
+from scripts.extract_news_quotes import (
+    IMAGE_OUTPUT_FIELDS,
+    IMAGE_ROW_FIELDS,
+    QUOTE_OUTPUT_FIELDS,
+    QUOTE_ROW_FIELDS,
+    Extraction,
+    extract,
+    load_existing_rows,
+    load_input_rows,
+    load_state,
+    with_stable_ids,
+)
+from scripts.news_charts import CHART_NAMES, missing_column, render_charts, save_charts
+from scripts.news_cube import CUBE_DIR, cube_for_rows
+
+README_CHARTS = ["type_en_pie_chart.mmd", "dept_releases_line_chart.mmd", "topic_en_line_chart.mmd"]
+
+
+class NewsData(NamedTuple):
+    news_rows: List[Dict[str, str]]
+    news_fields: List[str]
+    quotes: Dict[str, List[Dict[str, str]]]  # existing rows grouped by article, as the extractor keeps them
+    images: Dict[str, List[Dict[str, str]]]
+    state: Dict[str, Dict[str, str]]
+
+
+def load_data(args: argparse.Namespace) -> NewsData:
+    news_rows, news_fields = load_input_rows(args.input)
+    if args.full_rebuild:
+        return NewsData(news_rows, news_fields, {}, {}, {})
+    return NewsData(
+        news_rows,
+        news_fields,
+        load_existing_rows(args.quotes_output, QUOTE_ROW_FIELDS),
+        load_existing_rows(args.images_output, IMAGE_ROW_FIELDS),
+        load_state(args.state),
+    )
+
+
+def as_written(rows: List[Dict[str, str]], fieldnames: List[str]) -> List[Dict[str, str]]:
+    # The rows as csv.DictReader would give them back after the extractor writes them.
+    return [{field: "" if row.get(field) is None else str(row[field]) for field in fieldnames} for row in rows]
+
+
+def run(args: argparse.Namespace, extract_args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    data = load_data(extract_args)
+    loaded = time.perf_counter()
+    column = missing_column(args.charts, data.news_fields)
+    if column:
+        print(f"Error: '{column}' column not found in {extract_args.input}")
+        return 1
+
+    extraction: Extraction = extract(
+        extract_args, data.news_rows, data.news_fields, data.quotes, data.images, data.state
+    )
+    extracted = time.perf_counter()
+
+    news_rows = as_written(extraction.input_rows, extraction.input_fieldnames)
+    quote_rows = as_written(with_stable_ids(extraction.quote_rows, "QUOTE_INDEX", "quote"), QUOTE_OUTPUT_FIELDS)
+    image_rows = as_written(with_stable_ids(extraction.image_rows, "IMAGE_INDEX", "image"), IMAGE_OUTPUT_FIELDS)
+    search_data = build_search_index.build_search_data(news_rows, quote_rows, image_rows)
+    search_text = build_search_index.updated_text(search_data)
+
+    cube = cube_for_rows(extraction.input_fieldnames, news_rows, extract_args.input, args.cube_dir)
+    charts = render_charts(args.charts, cube)
+    readme: Optional[str] = None
+    if args.readme:
+        rendered = {path: content for path, content, _ in charts}
+        missing = [path for path in README_CHARTS if path not in rendered]
+        rendered.update({path: gen_readme.read_mermaid_file(path) for path in missing})
+        readme = gen_readme.readme_content(*(rendered[path] for path in README_CHARTS))
+    built = time.perf_counter()
+
+    extract_news_quotes.write_outputs(extract_args, extraction)
+    logging.info("Wrote %s quote rows and %s image rows.", len(quote_rows), len(image_rows))
+    build_search_index.write_search_data(search_data, search_text)
+    save_charts(charts)
+    if readme is not None:
+        gen_readme.write_readme(readme)
+    print(
+        f"Loaded in {loaded - started:.2f}s, extracted in {extracted - loaded:.2f}s, "
+        f"built outputs in {built - extracted:.2f}s, wrote them in {time.perf_counter() - built:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run extraction, the search index and the charts in one process.",
+        epilog="Other options are passed to the extractor (see scripts/extract_news_quotes.py --help).",
+    )
+    parser.add_argument("--charts", nargs="+", choices=CHART_NAMES, default=CHART_NAMES)
+    parser.add_argument("--cube-dir", default=CUBE_DIR)
+    parser.add_argument("--readme", action="store_true", help="Also regenerate README.md from the charts")
+    args, extractor_argv = parser.parse_known_args(argv)
+    args.extractor_argv = extractor_argv
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    extract_args = extract_news_quotes.parse_args(args.extractor_argv)
+    if extract_args.store:
+        sys.exit("--store is not supported here; run the per-stage scripts against the store instead.")
+    if extract_args.partitions:
+        sys.exit("--partitions is not supported here; run the per-stage scripts against the partitions instead.")
+    sys.exit(run(args, extract_args))
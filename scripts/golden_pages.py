@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Golden corpus of saved article pages for the extractor's HTML parsing.
+
+A corpus is a directory of raw canada.ca pages (<hash>.<lang>.html) and
+expected.json, the quotes, speaker fields and images read from each page by the
+reference parse below: the extractor as it was before the single-pass parser,
+a separate BeautifulSoup parse for the quotes and for the images. --check parses
+every page again with the extractor and lists any difference, before a parser
+change or a switch of --html-parser ships. --benchmark reports pages per second
+for the single-pass parser against the reference parses, on the corpus or on
+stand-in pages. data/golden_pages is the corpus kept in the repo; see its README.
+
+Add pages:      python -m scripts.golden_pages --save data/golden_pages --limit 40
+Check it:       python -m scripts.golden_pages --check data/golden_pages --html-parser lxml
+Benchmark:      python -m scripts.golden_pages --benchmark --corpus data/golden_pages
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.extract_news_quotes import (
+    HTML_PARSERS,
+    clean_speaker,
+    combine_text_values,
+    heading_matches,
+    is_skippable_image,
+    load_input_rows,
+    make_session,
+    normalize_image_src,
+    normalize_space,
+    parse_article_html,
+    split_speaker_fields,
+    strip_outer_quotes,
+)
+from scripts.stand_in_server import article_html
+
+EXPECTED_FILE = "expected.json"
+PAGE_URL = "https://www.canada.ca/{lang}/news/stand-in.html"
+
+
+def reference_quotes(html: str, lang: str) -> List[Tuple[str, str]]:
+    # The extractor's quote parse before the single-pass parser, kept as it was.
+    soup = BeautifulSoup(html, "html.parser")
+    heading = None
+    for candidate in soup.find_all(re.compile(r"^h[1-6]$")):
+        if heading_matches(candidate.get_text(" ", strip=True), lang):
+            heading = candidate
+            break
+
+    if heading is None:
+        return []
+
+    quote_blocks = []
+    for element in heading.find_all_next():
+        tag_name = getattr(element, "name", None)
+        if tag_name and re.fullmatch(r"h[1-6]", tag_name):
+            break
+        if tag_name == "blockquote":
+            quote_blocks.append(element)
+
+    extracted: List[Tuple[str, str]] = []
+    for block in quote_blocks:
+        chunks = [normalize_space(text) for text in block.stripped_strings if normalize_space(text)]
+        if not chunks:
+            continue
+
+        quote_parts: List[str] = []
+        speaker_parts: List[str] = []
+        quote_closed = False
+
+        for chunk in chunks:
+            if not quote_closed:
+                quote_parts.append(chunk)
+                if re.search(r'[”"»]\s*$', chunk):
+                    quote_closed = True
+            else:
+                speaker_parts.append(chunk)
+
+        if not speaker_parts and len(chunks) >= 2:
+            quote_parts = [chunks[0]]
+            speaker_parts = chunks[1:]
+
+        quote_text = strip_outer_quotes(" ".join(quote_parts))
+        speaker_text = clean_speaker(" | ".join(speaker_parts))
+
+        if quote_text:
+            extracted.append((quote_text, speaker_text))
+
+    return extracted
+
+
+def reference_images(page_url: str, html: str) -> List[Dict[str, str]]:
+    # The extractor's image parse before the single-pass parser, kept as it was.
+    soup = BeautifulSoup(html, "html.parser")
+    container = (
+        soup.find(id="news-release-container")
+        or soup.find(class_="news-release-container")
+        or soup.find("main")
+        or soup
+    )
+    images: List[Dict[str, str]] = []
+
+    for img in container.find_all("img"):
+        src = normalize_space(img.get("src"))
+        if not src:
+            continue
+        src = normalize_image_src(page_url, src)
+        if is_skippable_image(src):
+            continue
+        figure = img.find_parent("figure")
+        caption_text = ""
+        if figure:
+            figcaption = figure.find("figcaption")
+            if figcaption:
+                caption_text = figcaption.get_text(" ", strip=True)
+        images.append(
+            {
+                "source_url": src,
+                "alt_text": combine_text_values(img.get("alt", ""), caption_text),
+            }
+        )
+
+    return images
+
+
+def summary(quotes: List[Tuple[str, str]], images: List[Dict[str, str]]) -> Dict:
+    return {
+        "quotes": [list(quote) for quote in quotes],
+        "speakers": [list(split_speaker_fields(speaker)) for _, speaker in quotes],
+        "images": images,
+    }
+
+
+def page_summary(url: str, html: str, lang: str, parser: str = "html.parser") -> Dict:
+    return summary(*parse_article_html(url, html, lang, parser))
+
+
+def reference_summary(url: str, html: str, lang: str) -> Dict:
+    return summary(reference_quotes(html, lang), reference_images(url, html))
+
+
+def load_corpus(corpus: str) -> List[Tuple[str, str, str, Dict]]:
+    # (url, lang, html, expected) per saved page
+    with open(os.path.join(corpus, EXPECTED_FILE), encoding="utf-8") as fh:
+        expected = json.load(fh)
+    pages = []
+    for filename, entry in sorted(expected.items()):
+        with open(os.path.join(corpus, filename), encoding="utf-8") as fh:
+            pages.append((entry["url"], entry["lang"], fh.read(), entry))
+    return pages
+
+
+def save_corpus(corpus: str, news_csv: str, limit: int, timeout: int) -> int:
+    rows, _ = load_input_rows(news_csv)
+    session = make_session()
+    os.makedirs(corpus, exist_ok=True)
+    expected_path = os.path.join(corpus, EXPECTED_FILE)
+    expected = {}
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding="utf-8") as fh:
+            expected = json.load(fh)
+
+    # The newest articles, which the current parser rules were written against.
+    for row in rows[-limit:]:
+        for lang in ("en", "fr"):
+            url = normalize_space(row.get(f"TITLE_URL_{lang.upper()}", ""))
+            if not url:
+                continue
+            response = session.get(url, timeout=timeout)
+            if response.status_code != 200:
+                print(f"Skipped {url}: HTTP {response.status_code}")
+                continue
+            filename = f"{row.get('hash', '')}.{lang}.html"
+            with open(os.path.join(corpus, filename), "w", encoding="utf-8") as fh:
+                fh.write(response.text)
+            expected[filename] = {"url": url, "lang": lang, **reference_summary(url, response.text, lang)}
+
+    with open(expected_path, "w", encoding="utf-8") as fh:
+        json.dump(expected, fh, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"{len(expected)} pages in {corpus}")
+    return 0
+
+
+def check_corpus(corpus: str, parser: str) -> int:
+    pages = load_corpus(corpus)
+    failures = 0
+    for url, lang, html, entry in pages:
+        actual = page_summary(url, html, lang, parser)
+        for field in ("quotes", "speakers", "images"):
+            if actual[field] != entry[field]:
+                failures += 1
+                print(f"{url} ({lang}) {field} differ:\n  expected {entry[field]}\n  actual   {actual[field]}")
+    print(f"{len(pages)} pages checked with {parser}: {'all match' if not failures else f'{failures} differences'}")
+    return 1 if failures else 0
+
+
+def run_benchmark(corpus: str, pages: int, repeats: int) -> int:
+    if corpus:
+        sample = [(url, lang, html) for url, lang, html, _ in load_corpus(corpus)]
+    else:
+        sample = [
+            (PAGE_URL.format(lang=lang), lang, article_html(number, lang))
+            for number in range(1, pages // 2 + 1)
+            for lang in ("en", "fr")
+        ]
+    print(f"{len(sample)} pages, {sum(len(html) for _, _, html in sample) / len(sample) / 1024:.0f} KiB on average")
+    methods = [
+        ("separate quote and image parses", lambda url, lang, html: (
+            reference_quotes(html, lang), reference_images(url, html)
+        )),
+    ]
+    for parser in HTML_PARSERS:
+        if builder_registry.lookup(parser) is None:
+            print(f"{'single pass, ' + parser:<34} unavailable (not installed)")
+            continue
+        methods.append((f"single pass, {parser}", lambda url, lang, html, parser=parser: (
+            parse_article_html(url, html, lang, parser)
+        )))
+
+    for name, method in methods:
+        best = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for url, lang, html in sample:
+                method(url, lang, html)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:<34} {len(sample) / best:8.1f} pages/s")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Save, check and benchmark a golden corpus of article pages.")
+    parser.add_argument("--save", metavar="DIR", help="Fetch the newest articles into DIR and record their output")
+    parser.add_argument("--check", metavar="DIR", help="Parse the pages in DIR again and compare")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--corpus", default="", help="Pages to benchmark on (default: stand-in pages)")
+    parser.add_argument("--input", default="combined_news.csv")
+    parser.add_argument("--limit", type=int, default=40, help="Articles to save")
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--html-parser", choices=HTML_PARSERS, default="html.parser")
+    parser.add_argument("--pages", type=int, default=200, help="Stand-in pages to benchmark on")
+    parser.add_argument("--repeats", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.save:
+        sys.exit(save_corpus(args.save, args.input, args.limit, args.timeout))
+    if args.check:
+        if builder_registry.lookup(args.html_parser) is None:
+            sys.exit(f"--html-parser {args.html_parser} is not installed")
+        sys.exit(check_corpus(args.check, args.html_parser))
+    if args.benchmark:
+        sys.exit(run_benchmark(args.corpus, args.pages, args.repeats))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Connection accounting for the requests sessions the scrapers keep open.
+
+CountingAdapter is a drop-in HTTPAdapter whose urllib3 pools count every request
+sent and every connection opened (each one a TCP, and for https a TLS, handshake),
+with the time spent connecting. Requests beyond the connections opened went out on
+a kept-alive connection; HTTP_STATS.summary() turns that into the handshake time
+saved, for the run log.
+"""
+
+import threading
+import time
+from typing import NamedTuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class StatsSnapshot(NamedTuple):
+    requests: int
+    connections: int
+    connect_seconds: float
+
+
+class ConnectionStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.connect_seconds = 0.0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self, seconds: float) -> None:
+        with self._lock:
+            self.connections += 1
+            self.connect_seconds += seconds
+
+    def snapshot(self) -> StatsSnapshot:
+        with self._lock:
+            return StatsSnapshot(self.requests, self.connections, self.connect_seconds)
+
+    def summary(self, since: StatsSnapshot = StatsSnapshot(0, 0, 0.0)) -> str:
+        now = self.snapshot()
+        requests = now.requests - since.requests
+        connections = now.connections - since.connections
+        seconds = now.connect_seconds - since.connect_seconds
+        reused = max(requests - connections, 0)
+        average = seconds / connections if connections else 0.0
+        return (
+            f"{requests} HTTP requests over {connections} connections ({reused} reused); "
+            f"{seconds:.2f}s in handshakes, about {reused * average:.2f}s saved by keep-alive"
+        )
+
+
+HTTP_STATS = ConnectionStats()
+
+
+class CountingHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        super().connect()
+        HTTP_STATS.record_connection(time.perf_counter() - started)
+
+
+class CountingHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        super().connect()
+        HTTP_STATS.record_connection(time.perf_counter() - started)
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        HTTP_STATS.record_request()
+        return super().send(request, *args, **kwargs)
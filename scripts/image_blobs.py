@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for the article images under data/news_images.
+
+Each distinct image is kept once, as objects/<aa>/<sha256> under data/image_blobs,
+and every article file that has those bytes is a hard link to the blob (a copy
+where the filesystem has no hard links). urls.jsonl records the blob each image
+URL gave, so an image the extractor has already downloaded for one article, such
+as a recurring banner or logo, is linked into the next article without another
+download.
+
+The store is not committed; the extraction workflow keeps it in the Actions
+cache. Git already stores identical files once, so the saving is on disk, in
+checkouts and wherever the extractor runs.
+
+Move an existing tree into the store:  python -m scripts.image_blobs migrate
+Summarize the store:                   python -m scripts.image_blobs stats
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import threading
+from typing import Dict, Optional, Tuple
+
+IMAGE_BLOB_DIR = os.path.join("data", "image_blobs")
+URL_INDEX_FILE = "urls.jsonl"
+
+
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ImageBlobStore:
+    def __init__(self, root: str = IMAGE_BLOB_DIR) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self.urls: Dict[str, Tuple[str, str]] = {}  # image URL -> (sha256, Content-Type)
+        self.reused = 0
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        index_path = os.path.join(root, URL_INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.urls[entry["url"]] = (entry["sha256"], entry.get("content_type", ""))
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def known(self, url: str) -> Optional[Tuple[str, str]]:
+        # (sha256, Content-Type) of the blob this URL gave before, if the blob is still there.
+        with self._lock:
+            known = self.urls.get(url)
+        if known is None or not os.path.isfile(self.blob_path(known[0])):
+            return None
+        return known
+
+    def count_reuse(self) -> None:
+        # A blob placed for an image without downloading it (again).
+        with self._lock:
+            self.reused += 1
+
+    def adopt(self, source: str, digest: str, url: str = "", content_type: str = "") -> str:
+        # Takes over a downloaded file whose digest the caller computed while writing it.
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            os.remove(source)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.move(source, path)
+        if url:
+            self.record_url(url, digest, content_type)
+        return digest
+
+    def add_file(self, source: str) -> str:
+        # Moves an existing file's bytes into the store without reading it all into memory.
+        digest = file_sha256(source)
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source, partial)
+            os.replace(partial, path)
+        return digest
+
+    def record_url(self, url: str, digest: str, content_type: str = "") -> None:
+        with self._lock:
+            if self.urls.get(url) == (digest, content_type):
+                return
+            self.urls[url] = (digest, content_type)
+            entry = {"url": url, "sha256": digest, "content_type": content_type}
+            with open(os.path.join(self.root, URL_INDEX_FILE), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def place(self, digest: str, destination: str) -> None:
+        # Makes destination the blob: a hard link, or a copy where links are not possible.
+        blob = self.blob_path(digest)
+        if os.path.exists(destination):
+            if os.path.samefile(blob, destination):
+                return
+            os.remove(destination)
+        try:
+            os.link(blob, destination)
+        except OSError:
+            shutil.copyfile(blob, destination)
+
+
+def tree_bytes(*roots: str) -> int:
+    # Bytes on disk under the roots, counting each hard-linked inode once.
+    seen = set()
+    total = 0
+    for root in roots:
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                stat = os.stat(os.path.join(directory, filename))
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+    return total
+
+
+def migrate(images_dir: str, store: ImageBlobStore, state_path: str) -> str:
+    before = tree_bytes(images_dir, store.root)
+    files = 0
+    digests: Dict[str, str] = {}
+    for directory, _, filenames in os.walk(images_dir):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            digests[path] = store.add_file(path)
+            store.place(digests[path], path)
+            files += 1
+
+    # The image URLs the extractor state knows, so those images are not downloaded again.
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as fh:
+            state = json.load(fh)
+    for article in state.values():
+        for url, entry in (article.get("images") or {}).items():
+            path = os.path.join(images_dir, article.get("hash", ""), entry.get("filename", ""))
+            if digests.get(path) == entry.get("sha256"):
+                store.record_url(url, entry["sha256"], mimetypes.guess_type(path)[0] or "")
+    after = tree_bytes(images_dir, store.root)
+    blobs = sum(len(names) for _, _, names in os.walk(os.path.join(store.root, "objects")))
+    return (
+        f"{files} image files in {images_dir} now link to {blobs} blobs in {store.root}: "
+        f"{before / 1048576:.1f} MiB before, {after / 1048576:.1f} MiB after, "
+        f"{(before - after) / 1048576:.1f} MiB saved"
+    )
+
+
+def stats(images_dir: str, store: ImageBlobStore) -> str:
+    linked = unlinked = 0
+    for directory, _, filenames in os.walk(images_dir):
+        for filename in filenames:
+            if os.stat(os.path.join(directory, filename)).st_nlink > 1:
+                linked += 1
+            else:
+                unlinked += 1
+    return (
+        f"{len(store.urls)} image URLs, {tree_bytes(store.root) / 1048576:.1f} MiB in {store.root}; "
+        f"{linked} files in {images_dir} linked to blobs, {unlinked} not"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deduplicate the article images into a content-addressed store.")
+    parser.add_argument("command", choices=["migrate", "stats"])
+    parser.add_argument("--images-dir", default=os.path.join("data", "news_images"))
+    parser.add_argument("--store", default=IMAGE_BLOB_DIR)
+    parser.add_argument("--state", default=os.path.join("data", "news_quotes_state.json"))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = ImageBlobStore(args.store)
+    if args.command == "migrate":
+        print(migrate(args.images_dir, store, args.state))
+    else:
+        print(stats(args.images_dir, store))
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Mermaid charts built from the per-day count cube of combined_news.csv.
+
+Every chart is a handful of window queries against scripts/news_cube.py: the
+day x category counts for DEPT_EN, TYPE_EN, LOCATION_EN and TOPIC_EN, the
+projections of the date x dept x type x topic x location cube the charts read.
+The cube keeps the position of the first row behind every count, so "top N"
+rankings break ties exactly like Series.value_counts() did in the per-chart
+scripts, and the outputs stay byte-identical.
+
+Write every chart:       python -m scripts.news_charts
+Write a few of them:     python -m scripts.news_charts --charts type_pie dept_30d
+Rebuild the saved cube:  python -m scripts.news_charts --rebuild-cube
+Benchmark vs. size:      python -m scripts.news_charts --benchmark
+"""
+
+import argparse
+import datetime
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.news_cube import (
+    CUBE_DIR,
+    DAY_SPAN,
+    UNDATED,
+    Dimension,
+    NewsCube,
+    append_rows,
+    build_cube,
+    day_series,
+    open_cube,
+    read_cube,
+    save_cube,
+    window_counts,
+    window_totals,
+)
+from scripts.news_index import read_header
+from scripts.news_loader import NEWS_CSV
+from scripts.svg_charts import render_heatmap
+
+
+def day_number(value) -> int:
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def day_matrix(dim: Dimension, labels: Sequence[str], start_day: int, end_day: int, cutoff=None) -> np.ndarray:
+    # (days, labels) counts for the few categories a chart draws.
+    codes = code_of(dim)
+    matrix = np.zeros((max(end_day - start_day, 0), len(labels)), dtype=np.int64)
+    for column, label in enumerate(labels):
+        matrix[:, column] = day_series(dim, codes[label], start_day, end_day, cutoff)
+    return matrix
+
+
+def ranked(dim: Dimension, totals: np.ndarray, first: np.ndarray) -> pd.Series:
+    # Series.value_counts(): categories in order of first appearance, then a stable
+    # descending sort on the counts.
+    present = np.flatnonzero(totals > 0)
+    present = present[np.argsort(first[present], kind="stable")]
+    labels = [dim.labels[code] for code in present]
+    return pd.Series(totals[present], index=pd.Index(labels, dtype=object), name="count").sort_values(
+        ascending=False, kind="stable"
+    )
+
+
+def code_of(dim: Dimension) -> Dict[str, int]:
+    return {label: code for code, label in enumerate(dim.labels)}
+
+
+def pie_chart(cube: NewsCube, column: str) -> str:
+    dim = cube.dims[column]
+    counts = ranked(dim, *window_totals(dim, 0, DAY_SPAN))
+    chart = f"pie showData title Breakdown of {column}\n\n"
+    for label, count in counts.items():
+        escaped = label.replace('"', '\\"')
+        chart += f'    "{escaped}" : {count}\n'
+    return chart
+
+
+def dept_30d_chart(cube: NewsCube, now: datetime.datetime) -> str:
+    dim = cube.dims["DEPT_EN"]
+    thirty_days_ago = now - datetime.timedelta(days=30)
+    start_day, today = day_number(thirty_days_ago), day_number(now)
+    # The ranking covers every row from the cutoff on, including future-dated ones.
+    top = ranked(dim, *window_counts(dim, start_day, UNDATED, thirty_days_ago)).head(5).index.tolist()
+    date_range = pd.date_range(start=thirty_days_ago.date(), end=now.date())
+    block = day_matrix(dim, top, start_day, today + 1, thirty_days_ago)
+
+    chart = "xychart-beta\n"
+    chart += '    title "Number of Releases by Department Over the Last 30 Days"\n'
+    chart += f'    x-axis [{", ".join(date.strftime("%Y-%m-%d") for date in date_range)}]\n'
+    for column, dept in enumerate(top):
+        counts = block[:, column].tolist()
+        dept_escaped = dept.replace('"', '\\"')
+        chart += f'    line "{dept_escaped}" [{", ".join(map(str, counts))}]\n'
+    return chart
+
+
+def topic_12m_chart(cube: NewsCube, now: datetime.datetime, top_n: int = 5) -> str:
+    dim = cube.dims["TOPIC_EN"]
+    twelve_months_ago = now - datetime.timedelta(days=365)
+    start_day = day_number(twelve_months_ago)
+    top = ranked(dim, *window_counts(dim, start_day, UNDATED, twelve_months_ago)).head(top_n).index.tolist()
+
+    month_range = pd.period_range(
+        start=pd.Timestamp(twelve_months_ago).to_period("M"), end=pd.Timestamp(now).to_period("M"), freq="M"
+    )
+    end_day = day_number((month_range[-1] + 1).start_time)
+    block = day_matrix(dim, top, start_day, end_day, twelve_months_ago)
+    day_months = np.arange(start_day, end_day).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    first_month = int(np.datetime64(month_range[0].start_time.date(), "M").astype(np.int64))
+    monthly = np.zeros((len(month_range), len(top)), dtype=np.int64)
+    np.add.at(monthly, day_months - first_month, block)
+
+    chart = "xychart-beta\n"
+    chart += '    title "Number of Releases by Topic Over the Last 12 Months"\n'
+    chart += f'    x-axis [{", ".join(str(month) for month in month_range)}]\n'
+    for column, topic in enumerate(top):
+        counts = monthly[:, column].tolist()
+        topic_escaped = topic.replace('"', '\\"')
+        chart += f'    line "{topic_escaped}" [{", ".join(map(str, counts))}]\n'
+    return chart
+
+
+def radar_esc(value: str) -> str:
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def nice_max(n: int) -> int:
+    if n <= 1:
+        return 1
+    k = 10 ** int(math.floor(math.log10(n)))
+    for m in (1, 2, 5, 10):
+        if m * k >= n:
+            return m * k
+    return 10 * k
+
+
+def type_radar_markdown(cube: NewsCube, top_types: int = 10) -> str:
+    dim = cube.dims["TYPE_LABEL"]
+    last_complete_month = cube.max_pubdate.to_period("M") - 1
+    window_end = (last_complete_month + 1).start_time
+    window_start = (last_complete_month - 11).start_time
+    start_day, end_day = day_number(window_start), day_number(window_end)
+
+    # Last 4 quarters that have any rows at all, typed or not
+    spans = []
+    for quarter in pd.period_range(window_start, window_end - pd.Timedelta(days=1), freq="Q"):
+        low = max(day_number(quarter.start_time), start_day)
+        high = min(day_number((quarter + 1).start_time), end_day)
+        if window_totals(cube.dims["ROWS"], low, high)[0].sum() > 0:
+            spans.append((str(quarter), low, high))
+    spans = spans[-4:]
+    quarters = [quarter for quarter, _, _ in spans]
+    if spans:
+        top = ranked(dim, *window_totals(dim, spans[0][1], end_day)).head(top_types).index.tolist()
+    else:
+        top = []
+
+    codes = [code_of(dim)[label] for label in top]
+    pivot = np.zeros((len(quarters), len(top)), dtype=np.int64)
+    for row, (_, low, high) in enumerate(spans):
+        pivot[row] = window_totals(dim, low, high)[0][codes]
+    vmax = nice_max(int(pivot.max()) if pivot.size else 1)
+
+    lines = []
+    lines.append("## TYPE_EN by Quarter (last 12 complete months)")
+    lines.append("")
+    lines.append("```mermaid")
+    lines.append("radar-beta")
+    lines.append('  title "GC News — TYPE_EN by quarter (last 12 complete months)"')
+    lines.append("  axis " + ", ".join(f"t{i+1}[{radar_esc(t)}]" for i, t in enumerate(top)))
+    lines.append("")
+    for i, q in enumerate(quarters, start=1):
+        lines.append(f"  curve q{i}[{radar_esc(q)}]" + "{" + ", ".join(map(str, pivot[i - 1].tolist())) + "}")
+    lines.append("")
+    lines.append("  graticule polygon")
+    lines.append(f"  max {vmax}")
+    lines.append("```")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def type_heatmap_frame(cube: NewsCube, days: int = 180, top_types: int = 12) -> pd.DataFrame:
+    # Rows = TYPE_EN by total volume, columns = every date of the window ending on the newest record.
+    dim = cube.dims["TYPE_LABEL"]
+    max_date = cube.max_pubdate.date()
+    start_date = max_date - datetime.timedelta(days=days - 1)
+    start_day, end_day = day_number(start_date), day_number(max_date) + 1
+    top = ranked(dim, *window_totals(dim, start_day, end_day)).head(top_types).index.tolist()
+
+    labels = sorted(top)
+    all_dates = pd.date_range(start=start_date, end=max_date, freq="D")
+    pivot = pd.DataFrame(
+        day_matrix(dim, labels, start_day, end_day).T, index=pd.Index(labels, dtype=object), columns=all_dates.date
+    )
+    return pivot.loc[pivot.sum(axis=1).sort_values(ascending=False).index]
+
+
+def workflow_esc(s) -> str:
+    s = str(s).replace('"', '\\"')
+    if any(c.isspace() for c in s) or any(c in s for c in [",", "[", "]"]):
+        return f'"{s}"'
+    return s
+
+
+def type_30d_markdown(cube: NewsCube, days: int = 30, top_n: int = 10) -> str:
+    dim = cube.dims["TYPE_LABEL"]
+    max_date = cube.max_pubdate.date()
+    start_date = max_date - datetime.timedelta(days=days - 1)
+    start_day, end_day = day_number(start_date), day_number(max_date) + 1
+    window, _ = window_totals(dim, start_day, end_day)
+
+    # Top types by total, ranked over the alphabetical groupby order
+    codes = code_of(dim)
+    labels = sorted(dim.labels[code] for code in np.flatnonzero(window > 0))
+    totals = pd.Series([int(window[codes[label]]) for label in labels], index=pd.Index(labels, dtype=object))
+    top_types = sorted(totals.sort_values(ascending=False).head(top_n).index)
+
+    x_labels = [date.strftime("%Y-%m-%d") for date in pd.date_range(start=start_date, end=max_date, freq="D").date]
+    columns = day_matrix(dim, top_types, start_day, end_day)
+    ymax = max(1, int(columns.sum(axis=1).max())) if columns.size else 1
+
+    lines = []
+    lines.append("```mermaid")
+    lines.append("xychart-beta")
+    lines.append('  title "GC News — TYPE_EN per day (last 30 days)"')
+    lines.append("  x-axis [" + ", ".join(workflow_esc(x) for x in x_labels) + "]")
+    lines.append(f'  y-axis "Count" 0 --> {ymax}')
+    running = np.zeros(len(x_labels), dtype=np.int64)
+    for column, label in enumerate(top_types):
+        running = running + columns[:, column]
+        lines.append(f"  bar {workflow_esc(label)} [{', '.join(str(int(v)) for v in running)}]")
+    lines.append("```")
+    return "\n".join(lines)
+
+
+def type_heatmap_svg(cube: NewsCube, days: int = 180) -> str:
+    pivot = type_heatmap_frame(cube, days)
+    max_date = cube.max_pubdate.date()
+    return render_heatmap(
+        pivot.to_numpy(),
+        pivot.index.tolist(),
+        list(pivot.columns),
+        f"GC News — TYPE_EN counts per day (last {days} days ending {max_date})",
+        x_title="Date",
+        y_title="TYPE_EN",
+    )
+
+
+class Chart(NamedTuple):
+    path: str
+    columns: Sequence[str]
+    render: Callable[[NewsCube, datetime.datetime], str]
+    message: str
+
+
+CHARTS: Dict[str, Chart] = {
+    "type_pie": Chart(
+        "type_en_pie_chart.mmd", ["TYPE_EN"], lambda cube, now: pie_chart(cube, "TYPE_EN"),
+        "Mermaid.js pie chart code generated and saved to 'type_en_pie_chart.mmd'",
+    ),
+    "location_pie": Chart(
+        "loc_en_pie_chart.mmd", ["LOCATION_EN"], lambda cube, now: pie_chart(cube, "LOCATION_EN"),
+        "Mermaid.js pie chart code generated and saved to 'loc_en_pie_chart.mmd'",
+    ),
+    "dept_30d": Chart(
+        "dept_releases_line_chart.mmd", ["PUBDATE", "DEPT_EN"], dept_30d_chart,
+        "Mermaid.js line chart code generated and saved to 'dept_releases_line_chart.mmd'",
+    ),
+    "topic_12m": Chart(
+        "topic_en_line_chart.mmd", ["PUBDATE", "TOPIC_EN"], topic_12m_chart,
+        "Mermaid.js line chart code generated and saved to 'topic_en_line_chart.mmd'",
+    ),
+    "type_radar": Chart(
+        "docs/type_axes_quarter_curves.md", ["PUBDATE", "TYPE_EN"], lambda cube, now: type_radar_markdown(cube),
+        "Wrote docs/type_axes_quarter_curves.md",
+    ),
+    "type_30d": Chart(
+        "docs/news_type_30d.mmd", ["PUBDATE", "TYPE_EN"], lambda cube, now: type_30d_markdown(cube),
+        "Generated: docs/news_type_30d.mmd",
+    ),
+}
+HEATMAP_CHART = "type_heatmap"
+HEATMAP_PATH = "docs/type_heatmap_180d.svg"
+CHART_NAMES = list(CHARTS) + [HEATMAP_CHART]
+
+
+def missing_column(names: Sequence[str], header: Sequence[str]) -> Optional[str]:
+    for name in names:
+        columns = CHARTS[name].columns if name in CHARTS else ["PUBDATE", "TYPE_EN"]
+        for column in columns:
+            if column not in header:
+                return column
+    return None
+
+
+def render_charts(
+    names: Sequence[str], cube: NewsCube, now: Optional[datetime.datetime] = None
+) -> List[Tuple[str, str, str]]:
+    # (path, text, message) per chart, so callers decide when the files are written.
+    now = now or datetime.datetime.now()
+    outputs = []
+    for name in names:
+        if name == HEATMAP_CHART:
+            outputs.append((HEATMAP_PATH, type_heatmap_svg(cube), f"Saved: {HEATMAP_PATH}"))
+        else:
+            chart = CHARTS[name]
+            outputs.append((chart.path, chart.render(cube, now), chart.message))
+    return outputs
+
+
+def save_charts(outputs: Sequence[Tuple[str, str, str]]) -> None:
+    for path, content, message in outputs:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(content, encoding="utf-8")
+        print(message)
+
+
+def write_charts(
+    names: Sequence[str] = CHART_NAMES,
+    csv_path: str = NEWS_CSV,
+    now: Optional[datetime.datetime] = None,
+    cube: Optional[NewsCube] = None,
+    cube_dir: str = CUBE_DIR,
+    rebuild_cube: bool = False,
+) -> int:
+    column = missing_column(names, read_header(csv_path))
+    if column:
+        print(f"Error: '{column}' column not found in {csv_path}")
+        return 1
+    cube = cube or open_cube(csv_path, cube_dir, rebuild_cube)
+    save_charts(render_charts(names, cube, now))
+    return 0
+
+
+def synthetic_news(size: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.integers(0, 10 * 365 * 86400, size))
+    topics = np.array([f"Topic {index}" for index in range(40)], dtype=object)
+    return pd.DataFrame({
+        "PUBDATE": pd.Timestamp("2015-01-01") + pd.to_timedelta(seconds, unit="s"),
+        "DEPT_EN": pd.Categorical.from_codes(rng.integers(0, 150, size), [f"Department {i}" for i in range(150)]),
+        "TYPE_EN": pd.Categorical.from_codes(rng.integers(0, 15, size), [f"Type {i}" for i in range(15)]),
+        "LOCATION_EN": pd.Categorical.from_codes(rng.integers(0, 800, size), [f"Place {i}" for i in range(800)]),
+        "TOPIC_EN": pd.Series(topics[rng.integers(0, 40, size)]) + ";" + pd.Series(topics[rng.integers(0, 40, size)]),
+    })
+
+
+def run_benchmark(sizes: List[int], appended: int) -> int:
+    print(f"{'rows':>9} {'build s':>8} {'charts ms':>10} {'append ms':>10}")
+    for size in sizes:
+        frame = synthetic_news(size + appended)
+        with tempfile.TemporaryDirectory() as tmp:
+            cube_dir = os.path.join(tmp, "cube")
+            started = time.perf_counter()
+            save_cube(build_cube(frame.iloc[:size]), cube_dir)
+            build_seconds = time.perf_counter() - started
+
+            # A chart run: open the saved cube and answer every chart's queries.
+            started = time.perf_counter()
+            cube = read_cube(cube_dir)
+            now = cube.max_pubdate.to_pydatetime()
+            for chart in CHARTS.values():
+                chart.render(cube, now)
+            type_heatmap_frame(cube)
+            chart_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            save_cube(append_rows(cube, frame.iloc[size:], {}), cube_dir)
+            append_seconds = time.perf_counter() - started
+        print(f"{size:>9} {build_seconds:>8.2f} {chart_seconds * 1000:>10.1f} {append_seconds * 1000:>10.1f}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write the Mermaid charts from the combined_news.csv count cube.")
+    parser.add_argument("--charts", nargs="+", choices=CHART_NAMES, default=list(CHARTS))
+    parser.add_argument("--csv", default=NEWS_CSV)
+    parser.add_argument("--cube-dir", default=CUBE_DIR)
+    parser.add_argument("--rebuild-cube", action="store_true", help="Ignore the saved cube and rebuild it from the CSV.")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--appended", type=int, default=500, help="Rows appended per benchmark run.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        sys.exit(run_benchmark(args.sizes, args.appended))
+    started = time.perf_counter()
+    status = write_charts(args.charts, args.csv, cube_dir=args.cube_dir, rebuild_cube=args.rebuild_cube)
+    print(f"Built {len(args.charts)} charts in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    sys.exit(status)
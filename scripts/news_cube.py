@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Persistent per-day count cube behind the Mermaid charts.
+
+For DEPT_EN, TYPE_EN, LOCATION_EN and TOPIC_EN the cube keeps one cell per
+(category, day) that has rows: the row count and the position of the first row
+behind it, so rankings break ties like Series.value_counts(). Cells are sorted by
+category then day and carry a running count, so the total of any category over any
+day window is the difference of two prefix sums, whatever the size of the archive.
+Per-row timestamps are kept as well, for windows that start part-way through a day.
+
+The cube is saved under .cache/news_cube as memory-mapped .npy arrays and is tied
+to the size and SHA-256 digest of the CSV it was built from. After an append-only
+merge, update_news_data.py adds just the appended rows, once the old file is still
+the start of the new one; any other rewrite of the CSV discards it, and the next
+chart run rebuilds it from the CSV.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.news_index import INDEX_FIELDS, INDEX_PATH, load_index, read_header, read_last_row, row_key, serialize_rows
+from scripts.news_loader import NEWS_CSV, file_digest, frame_from_rows, load_news, parse_columns
+
+CUBE_DIR = os.path.join(".cache", "news_cube")
+CUBE_VERSION = 2
+NO_ROW = np.iinfo(np.int64).max
+DAY_SPAN = 1 << 32
+UNDATED = DAY_SPAN - 1  # day number of rows without a usable PUBDATE; no window reaches it
+LOAD_COLUMNS = ["PUBDATE", "DEPT_EN", "TYPE_EN", "LOCATION_EN", "TOPIC_EN"]
+CUBE_ARRAYS = [
+    "cell_key", "cell_count", "cell_first", "cell_prefix",
+    "occ_day", "occ_code", "occ_order", "occ_pubdate_ns",
+]
+
+
+class Dimension(NamedTuple):
+    labels: List[str]
+    cell_key: np.ndarray  # category * DAY_SPAN + day (days since 1970-01-01), ascending
+    cell_count: np.ndarray
+    cell_first: np.ndarray  # first position behind each cell, then a trailing NO_ROW
+    cell_prefix: np.ndarray  # rows before each cell, then the grand total
+    occ_day: np.ndarray  # per occurrence, sorted by day then position
+    occ_code: np.ndarray
+    occ_order: np.ndarray  # position in the column, exploded topics included
+    occ_pubdate_ns: np.ndarray
+    positions: int  # positions used so far; appended rows continue from here
+
+
+class NewsCube(NamedTuple):
+    rows: int
+    columns: List[str]  # the LOAD_COLUMNS the CSV had when the cube was built
+    max_pubdate: Optional[pd.Timestamp]
+    last_row: Dict[str, str]  # INDEX_FIELDS of the last row covered, as written in the CSV
+    dims: Dict[str, Dimension]
+    csv_size: int = 0  # size and SHA-256 of the CSV the cube covers
+    csv_sha256: str = ""
+
+
+def dimension_labels(frame: pd.DataFrame) -> Dict[str, pd.Series]:
+    # Every row, typed or not; the radar picks its quarters from these.
+    labels = {"ROWS": pd.Series("", index=frame.index)}
+    for column in ["DEPT_EN", "TYPE_EN", "LOCATION_EN"]:
+        if column in frame.columns:
+            labels[column] = frame[column]
+    if "TYPE_EN" in frame.columns:
+        # TYPE_EN as the radar, heatmap and 30-day type charts label it.
+        labels["TYPE_LABEL"] = frame["TYPE_EN"].astype(str).str.strip()
+    if "TOPIC_EN" in frame.columns:
+        # Topics as 12m.py splits them: missing -> "Unknown", ";"-separated, stripped.
+        labels["TOPIC_EN"] = frame["TOPIC_EN"].fillna("Unknown").str.split(";").explode().str.strip()
+    return labels
+
+
+def merge_cells(keys: np.ndarray, counts: np.ndarray, firsts: np.ndarray) -> Tuple[np.ndarray, ...]:
+    if not len(keys):
+        return keys, counts, firsts
+    by_key = np.argsort(keys, kind="stable")
+    keys, counts, firsts = keys[by_key], counts[by_key], firsts[by_key]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(counts, starts), np.minimum.reduceat(firsts, starts)
+
+
+def extend_dimension(
+    dim: Optional[Dimension], labels: pd.Series, day: np.ndarray, pubdate_ns: np.ndarray
+) -> Dimension:
+    known = list(dim.labels) if dim else []
+    start = dim.positions if dim else 0
+    lookup = {label: code for code, label in enumerate(known)}
+    codes, uniques = pd.factorize(labels)
+    for label in map(str, uniques):
+        if label not in lookup:
+            lookup[label] = len(known)
+            known.append(label)
+    mapping = np.array([lookup[label] for label in map(str, uniques)], dtype=np.int64)
+
+    valid = codes >= 0
+    rows = labels.index.to_numpy()[valid]
+    code = mapping[codes[valid]]
+    order = (start + np.arange(len(codes), dtype=np.int64))[valid]
+    occ_day, occ_pubdate_ns = day[rows], pubdate_ns[rows]
+
+    cell_key, cell_count, cell_first = merge_cells(
+        code * DAY_SPAN + occ_day, np.ones(len(code), dtype=np.int64), order
+    )
+    by_day = np.lexsort((order, occ_day))
+    occ_day, code, order, occ_pubdate_ns = occ_day[by_day], code[by_day], order[by_day], occ_pubdate_ns[by_day]
+    if dim:
+        # Merge into the sorted cells instead of re-sorting the archive: existing cells
+        # gain counts, new ones are inserted in place.
+        position = np.searchsorted(dim.cell_key, cell_key)
+        hit = position < len(dim.cell_key)
+        hit[hit] = dim.cell_key[position[hit]] == cell_key[hit]
+        counts = np.array(dim.cell_count)
+        firsts = np.array(dim.cell_first[:-1])
+        counts[position[hit]] += cell_count[hit]
+        firsts[position[hit]] = np.minimum(firsts[position[hit]], cell_first[hit])
+        cell_key = np.insert(dim.cell_key, position[~hit], cell_key[~hit])
+        cell_count = np.insert(counts, position[~hit], cell_count[~hit])
+        cell_first = np.insert(firsts, position[~hit], cell_first[~hit])
+
+        # Appended rows come after every existing position, so rows dated on or after the
+        # newest existing day extend the day-sorted occurrences as they are.
+        tail = len(occ_day) == 0 or not len(dim.occ_day) or occ_day[0] >= dim.occ_day[-1]
+        occ_day = np.concatenate([dim.occ_day, occ_day])
+        code = np.concatenate([dim.occ_code, code])
+        order = np.concatenate([dim.occ_order, order])
+        occ_pubdate_ns = np.concatenate([dim.occ_pubdate_ns, occ_pubdate_ns])
+        if not tail:
+            by_day = np.lexsort((order, occ_day))
+            occ_day, code, order, occ_pubdate_ns = occ_day[by_day], code[by_day], order[by_day], occ_pubdate_ns[by_day]
+    return Dimension(
+        known,
+        cell_key,
+        cell_count,
+        np.append(cell_first, NO_ROW),
+        np.concatenate([[0], np.cumsum(cell_count)]).astype(np.int64),
+        occ_day,
+        code,
+        order,
+        occ_pubdate_ns,
+        start + len(codes),
+    )
+
+
+def append_rows(cube: Optional[NewsCube], frame: pd.DataFrame, last_row: Dict[str, str]) -> NewsCube:
+    frame = frame.reset_index(drop=True)
+    pubdate = frame["PUBDATE"] if "PUBDATE" in frame.columns else pd.Series(pd.NaT, index=frame.index)
+    dated = pubdate.notna().to_numpy()
+    pubdate_ns = pubdate.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    day = np.where(dated, pubdate.to_numpy(dtype="datetime64[D]").astype(np.int64), UNDATED)
+
+    candidates = [value for value in [cube.max_pubdate if cube else None, pubdate.max()] if not pd.isna(value)]
+    dims = {
+        name: extend_dimension(cube.dims.get(name) if cube else None, labels, day, pubdate_ns)
+        for name, labels in dimension_labels(frame).items()
+    }
+    columns = cube.columns if cube else [column for column in LOAD_COLUMNS if column in frame.columns]
+    rows = (cube.rows if cube else 0) + len(frame)
+    return NewsCube(rows, columns, max(candidates) if candidates else None, dict(last_row), dims)
+
+
+def build_cube(frame: pd.DataFrame, last_row: Optional[Dict[str, str]] = None) -> NewsCube:
+    return append_rows(None, frame, last_row or {})
+
+
+def window_totals(dim: Dimension, start_day: int, end_day: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Rows per category over days [start_day, end_day), and the first position among them.
+    categories = len(dim.labels)
+    base = np.arange(categories, dtype=np.int64) * DAY_SPAN
+    low = np.searchsorted(dim.cell_key, base + start_day)
+    high = np.searchsorted(dim.cell_key, base + max(end_day, start_day))
+    totals = dim.cell_prefix[high] - dim.cell_prefix[low]
+    first = np.full(categories, NO_ROW, dtype=np.int64)
+    present = high > low
+    if present.any():
+        # One reduceat over the [low, high) pairs; the even slots are the windows.
+        bounds = np.column_stack([low[present], high[present]]).ravel()
+        first[present] = np.minimum.reduceat(dim.cell_first, bounds)[::2]
+    return np.asarray(totals), first
+
+
+def cutoff_counts(dim: Dimension, day: int, cutoff) -> Tuple[np.ndarray, np.ndarray]:
+    # Rows per category on one day from the cutoff time on, from the per-row timestamps.
+    categories = len(dim.labels)
+    low, high = np.searchsorted(dim.occ_day, [day, day + 1])
+    keep = dim.occ_pubdate_ns[low:high] >= pd.Timestamp(cutoff).as_unit("ns").value
+    codes, order = dim.occ_code[low:high][keep], dim.occ_order[low:high][keep]
+    first = np.full(categories, NO_ROW, dtype=np.int64)
+    present, first_index = np.unique(codes, return_index=True)
+    first[present] = order[first_index]
+    return np.bincount(codes, minlength=categories), first
+
+
+def window_counts(dim: Dimension, start_day: int, end_day: int, cutoff=None) -> Tuple[np.ndarray, np.ndarray]:
+    # With a cutoff, rows on start_day before the cutoff time are left out.
+    if cutoff is None or start_day >= end_day:
+        return window_totals(dim, start_day, end_day)
+    totals, first = window_totals(dim, start_day + 1, end_day)
+    partial, partial_first = cutoff_counts(dim, start_day, cutoff)
+    return totals + partial, np.minimum(first, partial_first)
+
+
+def day_series(dim: Dimension, code: int, start_day: int, end_day: int, cutoff=None) -> np.ndarray:
+    counts = np.zeros(max(end_day - start_day, 0), dtype=np.int64)
+    low, high = np.searchsorted(dim.cell_key, [code * DAY_SPAN + start_day, code * DAY_SPAN + max(end_day, start_day)])
+    counts[dim.cell_key[low:high] - code * DAY_SPAN - start_day] = dim.cell_count[low:high]
+    if cutoff is not None and len(counts):
+        counts[0] = cutoff_counts(dim, start_day, cutoff)[0][code]
+    return counts
+
+
+def row_identity(header: List[str], values: List[str]) -> Dict[str, str]:
+    row = dict(zip(header, values))
+    return {field: row.get(field, "") for field in INDEX_FIELDS}
+
+
+def save_cube(cube: NewsCube, cube_dir: str = CUBE_DIR) -> None:
+    tmp_dir = f"{cube_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    meta = {
+        "version": CUBE_VERSION,
+        "rows": cube.rows,
+        "columns": cube.columns,
+        "max_pubdate_ns": None if cube.max_pubdate is None else pd.Timestamp(cube.max_pubdate).as_unit("ns").value,
+        "last_row": cube.last_row,
+        "csv_size": cube.csv_size,
+        "csv_sha256": cube.csv_sha256,
+        "dims": {name: {"labels": dim.labels, "positions": dim.positions} for name, dim in cube.dims.items()},
+    }
+    for name, dim in cube.dims.items():
+        for field in CUBE_ARRAYS:
+            np.save(os.path.join(tmp_dir, f"{name}.{field}.npy"), np.asarray(getattr(dim, field)))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False)
+
+    # Arrays already mapped from the old directory stay readable after the swap.
+    old_dir = f"{cube_dir}.{os.getpid()}.old"
+    if os.path.exists(cube_dir):
+        os.replace(cube_dir, old_dir)
+    os.replace(tmp_dir, cube_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def read_cube(cube_dir: str = CUBE_DIR) -> Optional[NewsCube]:
+    meta_path = os.path.join(cube_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != CUBE_VERSION:
+            return None
+        dims = {
+            name: Dimension(
+                labels=info["labels"],
+                positions=info["positions"],
+                **{
+                    field: np.load(os.path.join(cube_dir, f"{name}.{field}.npy"), mmap_mode="r")
+                    for field in CUBE_ARRAYS
+                },
+            )
+            for name, info in meta["dims"].items()
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    max_pubdate = None if meta["max_pubdate_ns"] is None else pd.Timestamp(meta["max_pubdate_ns"])
+    return NewsCube(
+        meta["rows"], meta["columns"], max_pubdate, meta["last_row"], dims, meta["csv_size"], meta["csv_sha256"]
+    )
+
+
+def discard_cube(cube_dir: str = CUBE_DIR) -> None:
+    shutil.rmtree(cube_dir, ignore_errors=True)
+
+
+def csv_columns(csv_path: str) -> List[str]:
+    header = read_header(csv_path)
+    return [column for column in LOAD_COLUMNS if column in header]
+
+
+def with_csv_digest(cube: NewsCube, csv_path: str) -> NewsCube:
+    return cube._replace(csv_size=os.path.getsize(csv_path), csv_sha256=file_digest(csv_path))
+
+
+def cube_matches_csv(cube: NewsCube, csv_path: str) -> bool:
+    # Only ingestion writes combined_news.csv, so its bytes change exactly when its rows do.
+    # A row inserted mid-file under an unchanged last row changes the digest as well.
+    return (
+        cube.rows > 0
+        and cube.columns == csv_columns(csv_path)
+        and cube.csv_size == os.path.getsize(csv_path)
+        and cube.csv_sha256 == file_digest(csv_path)
+    )
+
+
+def open_cube(csv_path: str = NEWS_CSV, cube_dir: str = CUBE_DIR, rebuild: bool = False) -> NewsCube:
+    cube = None if rebuild else read_cube(cube_dir)
+    if cube is not None and cube_matches_csv(cube, csv_path):
+        return cube
+    header = read_header(csv_path)
+    frame = load_news(csv_path, usecols=LOAD_COLUMNS)
+    cube = with_csv_digest(build_cube(frame, row_identity(header, read_last_row(csv_path))), csv_path)
+    save_cube(cube, cube_dir)
+    return cube
+
+
+def cube_for_rows(
+    header: List[str], rows: List[Dict[str, str]], csv_path: str = NEWS_CSV, cube_dir: str = CUBE_DIR
+) -> NewsCube:
+    # For rows already in memory (the in-process pipeline), read from csv_path: reuse the
+    # saved cube when it covers that file, otherwise build it from the rows and save it.
+    columns = [column for column in LOAD_COLUMNS if column in header]
+    cube = read_cube(cube_dir)
+    if cube is not None and cube.rows == len(rows) and cube_matches_csv(cube, csv_path):
+        return cube
+    last_row = {field: (rows[-1].get(field) or "") for field in INDEX_FIELDS} if rows else {}
+    cube = with_csv_digest(build_cube(frame_from_rows(rows, columns), last_row), csv_path)
+    save_cube(cube, cube_dir)
+    return cube
+
+
+def update_cube(
+    csv_path: str, new_data: pd.DataFrame, index_path: str = INDEX_PATH, cube_dir: str = CUBE_DIR
+) -> str:
+    # After an append-only merge: the CSV the cube covers must still be the start of the
+    # file, the index lists the rows the cube has not seen yet, and new_data holds their
+    # values. Returns what happened to the saved cube.
+    cube = read_cube(cube_dir)
+    if cube is None:
+        return "missing"
+    if not cube.csv_sha256 or file_digest(csv_path, cube.csv_size) != cube.csv_sha256:
+        discard_cube(cube_dir)
+        return "discarded"
+    _, entries = load_index(index_path)
+    if not 0 < cube.rows <= len(entries) or entries[cube.rows - 1] != cube.last_row:
+        discard_cube(cube_dir)
+        return "discarded"
+    appended = entries[cube.rows:]
+    if not appended:
+        if cube.csv_size != os.path.getsize(csv_path):
+            save_cube(with_csv_digest(cube, csv_path), cube_dir)
+        return "current"
+
+    header = read_header(csv_path)
+    if cube.columns != csv_columns(csv_path):
+        discard_cube(cube_dir)
+        return "discarded"
+    # Round-trip the rows through the CSV text so they parse exactly as a full load would.
+    lines = {
+        row_key(dict(zip(header, next(csv.reader([line]))))): line
+        for line in serialize_rows(new_data, header, "\n")
+    }
+    if any(row_key(entry) not in lines for entry in appended):
+        discard_cube(cube_dir)
+        return "discarded"
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(header)
+    buffer.writelines(lines[row_key(entry)] for entry in appended)
+    buffer.seek(0)
+    frame = parse_columns(buffer, cube.columns)
+    save_cube(with_csv_digest(append_rows(cube, frame, appended[-1]), csv_path), cube_dir)
+    return "appended"
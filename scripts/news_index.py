@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Append-only incremental merge for combined_news.csv.
+
+A sidecar index (data/combined_news_index.csv) lists the identity key and row hash
+of every row in combined_news.csv, in file order. With it, a daily run only has to
+look at the feed rows: unseen keys newer than the last PUBDATE are appended to the
+end of the file, and rows whose hash changed are replaced in place. Anything that
+would need a re-sort (a new row older than the newest archived row) is left to the
+full pandas merge in update_news_data.py, which then rebuilds the index.
+"""
+
+import csv
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+ID_COLUMNS = ["PUBDATE", "TITLE_TEXT_EN", "TITLE_URL_EN"]
+INDEX_FIELDS = ["hash"] + ID_COLUMNS
+INDEX_PATH = os.path.join("data", "combined_news_index.csv")
+TAIL_BYTES = 64 * 1024
+
+Key = Tuple[str, str, str]
+
+
+def detect_line_terminator(path: str) -> str:
+    with open(path, "rb") as fh:
+        first_line = fh.readline()
+    return "\r\n" if first_line.endswith(b"\r\n") else "\n"
+
+
+def read_header(path: str) -> List[str]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        return next(csv.reader(fh), [])
+
+
+def read_last_row(path: str) -> List[str]:
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        size = fh.tell()
+        fh.seek(max(size - TAIL_BYTES, 0))
+        tail = fh.read()
+    lines = [line for line in tail.splitlines() if line.strip()]
+    if not lines:
+        return []
+    return next(csv.reader([lines[-1].decode("utf-8")]), [])
+
+
+def row_key(row: Dict[str, str]) -> Key:
+    return tuple(row.get(column, "") for column in ID_COLUMNS)
+
+
+def build_index(csv_path: str, index_path: str = INDEX_PATH) -> None:
+    parent = os.path.dirname(index_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(csv_path, newline="", encoding="utf-8") as src, open(
+        index_path, "w", newline="", encoding="utf-8"
+    ) as dst:
+        writer = csv.DictWriter(dst, fieldnames=INDEX_FIELDS, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(csv.DictReader(src))
+
+
+def load_index(index_path: str) -> Tuple[Dict[Key, str], List[Dict[str, str]]]:
+    with open(index_path, newline="", encoding="utf-8") as fh:
+        entries = list(csv.DictReader(fh))
+    return {row_key(entry): entry["hash"] for entry in entries}, entries
+
+
+def index_matches_csv(csv_path: str, entries: List[Dict[str, str]]) -> bool:
+    # combined_news.csv can be rewritten behind the index (a full merge, or the count
+    # columns moved out of it), so the file size is not stable; the identity and hash
+    # of the last row are.
+    header = read_header(csv_path)
+    if not entries or any(field not in header for field in INDEX_FIELDS):
+        return False
+    last_row = dict(zip(header, read_last_row(csv_path)))
+    last_entry = entries[-1]
+    return all(last_row.get(field, "") == last_entry[field] for field in INDEX_FIELDS)
+
+
+def serialize_rows(frame: pd.DataFrame, header: List[str], line_terminator: str) -> List[str]:
+    # Let pandas format the values so appended rows look exactly like a full rewrite. Each row
+    # is written on its own: a quoted field can hold U+2028, NEL or a newline, so the text of
+    # several rows cannot be split back into rows on line breaks.
+    frame = frame.reindex(columns=header)
+    return [
+        frame.iloc[position : position + 1].to_csv(header=False, index=False, lineterminator=line_terminator)
+        for position in range(len(frame))
+    ]
+
+
+def replace_rows_in_place(csv_path: str, header: List[str], replacements: Dict[Key, str]) -> None:
+    key_positions = [header.index(column) for column in ID_COLUMNS]
+    tmp_path = f"{csv_path}.tmp"
+    with open(csv_path, newline="", encoding="utf-8") as src, open(
+        tmp_path, "w", newline="", encoding="utf-8"
+    ) as dst:
+        dst.write(src.readline())
+        for line in src:
+            fields = next(csv.reader([line]), [])
+            key = tuple(fields[position] if position < len(fields) else "" for position in key_positions)
+            dst.write(replacements.get(key, line))
+    os.replace(tmp_path, csv_path)
+
+
+def write_index(index_path: str, entries: List[Dict[str, str]]) -> None:
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=INDEX_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(entries)
+    os.replace(tmp_path, index_path)
+
+
+def append_index(index_path: str, entries: List[Dict[str, str]]) -> None:
+    with open(index_path, "a", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=INDEX_FIELDS, lineterminator="\n")
+        writer.writerows(entries)
+
+
+def incremental_merge(csv_path: str, new_data: pd.DataFrame, index_path: str = INDEX_PATH) -> Optional[str]:
+    # Returns "unchanged", "appended" or "replaced", or None when the caller has to
+    # fall back to a full merge.
+    if not os.path.exists(csv_path):
+        return None
+    if not os.path.exists(index_path):
+        print(f"Building {index_path} from {csv_path}.")
+        build_index(csv_path, index_path)
+
+    known, entries = load_index(index_path)
+    if not index_matches_csv(csv_path, entries):
+        print(f"{index_path} is out of date; rebuilding it from {csv_path}.")
+        build_index(csv_path, index_path)
+        known, entries = load_index(index_path)
+        if not entries:
+            return None
+
+    header = read_header(csv_path)
+    line_terminator = detect_line_terminator(csv_path)
+    new_lines = serialize_rows(new_data, header, line_terminator)
+    last_pubdate = entries[-1]["PUBDATE"]
+
+    appended_lines: List[str] = []
+    appended_entries: List[Dict[str, str]] = []
+    replacements: Dict[Key, str] = {}
+    replaced_hashes: Dict[Key, str] = {}
+    seen_keys = set()
+    for line in new_lines:
+        row = dict(zip(header, next(csv.reader([line]))))
+        key = row_key(row)
+        if key in seen_keys:
+            # Duplicate keys inside one feed; leave the keep-last rule to the full merge.
+            return None
+        seen_keys.add(key)
+        if key in known:
+            if known[key] != row["hash"]:
+                replacements[key] = line
+                replaced_hashes[key] = row["hash"]
+            continue
+        if row["PUBDATE"] <= last_pubdate:
+            return None
+        appended_lines.append(line)
+        appended_entries.append({field: row[field] for field in INDEX_FIELDS})
+
+    if replacements:
+        replace_rows_in_place(csv_path, header, replacements)
+        for entry in entries:
+            key = row_key(entry)
+            if key in replaced_hashes:
+                entry["hash"] = replaced_hashes[key]
+        write_index(index_path, entries)
+
+    if appended_lines:
+        with open(csv_path, "rb+") as fh:
+            fh.seek(0, os.SEEK_END)
+            if fh.tell() > 0:
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    fh.write(line_terminator.encode())
+            fh.write("".join(appended_lines).encode("utf-8"))
+        append_index(index_path, appended_entries)
+
+    print(
+        f"Incremental merge: {len(appended_lines)} new rows appended, "
+        f"{len(replacements)} changed rows replaced in place."
+    )
+    if replacements:
+        return "replaced"
+    return "appended" if appended_lines else "unchanged"
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Typed, cached loader for combined_news.csv shared by the chart scripts.
+
+PUBDATE is parsed with a fixed format, DEPT_EN/TYPE_EN/LOCATION_EN become
+categoricals, and callers only parse the columns they ask for. Each parsed column
+is pickled under .cache/news_frames, keyed on the CSV's size, mtime and SHA-256
+digest, so later loads in the same pipeline run skip the CSV parse entirely.
+
+Benchmark a cold parse against a cached load:  python -m scripts.news_loader --benchmark
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+from typing import IO, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from scripts.news_index import read_header
+
+NEWS_CSV = "combined_news.csv"
+CACHE_DIR = os.path.join(".cache", "news_frames")
+PUBDATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+CATEGORY_COLUMNS = ["DEPT_EN", "TYPE_EN", "LOCATION_EN"]
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str, size: Optional[int] = None) -> str:
+    # SHA-256 of the whole file, or of its first size bytes.
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        remaining = os.fstat(fh.fileno()).st_size if size is None else size
+        while remaining > 0:
+            chunk = fh.read(min(remaining, DIGEST_CHUNK_SIZE))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir_for(csv_path: str, cache_root: str) -> str:
+    path_key = hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_root, path_key)
+
+
+def read_meta(cache_dir: str) -> Dict:
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return {}
+    try:
+        with open(meta_path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except ValueError:
+        return {}
+
+
+def write_meta(cache_dir: str, meta: Dict) -> None:
+    meta_path = os.path.join(cache_dir, "meta.json")
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, meta_path)
+
+
+def current_meta(csv_path: str, cache_dir: str) -> Dict:
+    stat = os.stat(csv_path)
+    meta = read_meta(cache_dir)
+    if meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+        return meta
+
+    # A fresh checkout touches the mtime without changing the content; the digest decides.
+    digest = file_digest(csv_path)
+    if meta.get("size") == stat.st_size and meta.get("sha256") == digest:
+        meta["mtime_ns"] = stat.st_mtime_ns
+    else:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest, "columns": {}}
+    os.makedirs(cache_dir, exist_ok=True)
+    write_meta(cache_dir, meta)
+    return meta
+
+
+def parse_pubdate(values: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(values, format=PUBDATE_FORMAT, errors="coerce")
+    # Rows written with another layout (sub-second digits, ISO "T") still parse, just slower.
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(values[failed], format="mixed", errors="coerce")
+    return parsed
+
+
+def to_category(values: pd.Series) -> pd.Series:
+    # Categories in first-appearance order keep value_counts() tie order identical to
+    # what the same column gives as plain strings.
+    categories = pd.unique(values.dropna())
+    return pd.Series(pd.Categorical(values, categories=categories), index=values.index, name=values.name)
+
+
+def parse_columns(csv_path: Union[str, IO[str]], columns: Sequence[str]) -> pd.DataFrame:
+    typed = {column: str for column in columns if column == "PUBDATE" or column in CATEGORY_COLUMNS}
+    frame = pd.read_csv(csv_path, usecols=list(columns), dtype=typed)
+    if "PUBDATE" in frame.columns:
+        frame["PUBDATE"] = parse_pubdate(frame["PUBDATE"])
+    for column in CATEGORY_COLUMNS:
+        if column in frame.columns:
+            frame[column] = to_category(frame[column])
+    return frame[list(columns)]
+
+
+def frame_from_rows(rows: Sequence[Dict[str, str]], columns: Sequence[str]) -> pd.DataFrame:
+    # Rows already in memory (csv.DictReader dicts) parse exactly as the CSV they came from.
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    buffer.seek(0)
+    return parse_columns(buffer, columns)
+
+
+def load_news(
+    csv_path: str = NEWS_CSV,
+    usecols: Optional[Sequence[str]] = None,
+    cache_dir: str = CACHE_DIR,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    # Requested columns that the CSV lacks are left out, so callers can still check for them.
+    header = read_header(csv_path)
+    columns = header if usecols is None else [column for column in header if column in set(usecols)]
+    if not use_cache:
+        return parse_columns(csv_path, columns)
+
+    column_cache = cache_dir_for(csv_path, cache_dir)
+    meta = current_meta(csv_path, column_cache)
+    cached: Dict[str, str] = meta.setdefault("columns", {})
+    missing = [column for column in columns if column not in cached]
+    if missing:
+        parsed = parse_columns(csv_path, missing)
+        for column in missing:
+            filename = f"{hashlib.sha256(column.encode()).hexdigest()[:16]}.pkl"
+            tmp_path = os.path.join(column_cache, f"{filename}.{os.getpid()}.tmp")
+            parsed[column].to_pickle(tmp_path)
+            os.replace(tmp_path, os.path.join(column_cache, filename))
+            cached[column] = filename
+        # Another process may have cached other columns meanwhile; keep both.
+        cached.update({**read_meta(column_cache).get("columns", {}), **cached})
+        write_meta(column_cache, meta)
+
+    return pd.DataFrame(
+        {column: pd.read_pickle(os.path.join(column_cache, cached[column])) for column in columns}
+    )
+
+
+def value_counts(column: pd.Series) -> pd.Series:
+    # Series.value_counts() on a filtered categorical also lists unobserved categories and
+    # breaks ties by category order; count like the plain-string column would instead.
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.value_counts()
+    codes = column.cat.codes.to_numpy()
+    observed = column.cat.categories.take(pd.unique(codes[codes >= 0]))
+    return column.cat.set_categories(observed).value_counts()
+
+
+def run_benchmark(csv_path: str, usecols: List[str], repeats: int) -> int:
+    cache_root = os.path.join(CACHE_DIR, "benchmark")
+    shutil.rmtree(cache_root, ignore_errors=True)
+
+    started = time.perf_counter()
+    default = pd.read_csv(csv_path)
+    default["PUBDATE"] = pd.to_datetime(default["PUBDATE"])
+    default_seconds = time.perf_counter() - started
+    default_bytes = default[usecols].memory_usage(deep=True).sum()
+
+    started = time.perf_counter()
+    typed = load_news(csv_path, usecols, cache_dir=cache_root)
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        load_news(csv_path, usecols, cache_dir=cache_root)
+    warm_seconds = (time.perf_counter() - started) / repeats
+    typed_bytes = typed.memory_usage(deep=True).sum()
+    shutil.rmtree(cache_root, ignore_errors=True)
+
+    print(f"{len(default)} rows, columns: {', '.join(usecols)}")
+    print(f"{'read_csv + to_datetime':<24} {default_seconds * 1000:>9.1f} ms {default_bytes / 2**20:>8.2f} MiB")
+    print(f"{'typed load, cold':<24} {cold_seconds * 1000:>9.1f} ms {typed_bytes / 2**20:>8.2f} MiB")
+    print(f"{'typed load, cached':<24} {warm_seconds * 1000:>9.1f} ms")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the typed, cached combined_news.csv loader.")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--csv", default=NEWS_CSV)
+    parser.add_argument("--usecols", nargs="+", default=["PUBDATE", "DEPT_EN", "TYPE_EN", "LOCATION_EN", "TOPIC_EN"])
+    parser.add_argument("--repeats", type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        raise SystemExit(run_benchmark(args.csv, args.usecols, args.repeats))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Pair English and French canada.ca news datatable entries into bilingual records.
+
+Entries are indexed once on (PUBDATE, normalized minister). Keys shared by several
+entries, and entries whose key has no counterpart, fall back to comparing the
+article URL paths. Anything still unpaired is reported instead of dropped.
+
+Benchmark on synthetic feeds with: python -m scripts.news_pairing --benchmark
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+TITLE_HREF_RE = re.compile(r"<a href='(.*?)'>")
+DATE_SEGMENT_RE = re.compile(r"^(?:19|20)\d{2}$")
+MONTH_SEGMENT_RE = re.compile(r"^(?:0[1-9]|1[0-2])$")
+# URL slugs are translated, so only tokens that survive translation (names,
+# acronyms, numbers) are useful for telling two same-timestamp releases apart.
+MIN_SLUG_TOKEN_LENGTH = 3
+# Tokens most releases share whatever their subject, so they tell nothing apart.
+COMMON_SLUG_TOKENS = frozenset(
+    ["canada", "canadas", "government", "gouvernement", "federal", "federale", "minister", "ministre", "news", "nouvelles"]
+)
+# Fallback pairs (no shared key) need the same year/month path plus at least
+# two shared slug tokens before they are trusted; anything weaker stays unmatched.
+MIN_FALLBACK_SCORE = 4
+BENCHMARK_SIZES = [1_000, 10_000, 100_000, 500_000]
+NESTED_BENCHMARK_LIMIT = 5_000
+
+Pair = Tuple[Dict[str, str], Dict[str, str]]
+
+
+def normalize_minister_name(name):
+    if name.startswith("Hon. "):
+        return name.replace("Hon. ", "")
+    elif name.startswith("L'hon. "):
+        return name.replace("L'hon. ", "")
+    return name
+
+
+def pairing_key(entry: Dict[str, str]) -> Tuple[str, str]:
+    return entry.get("PUBDATE") or "", normalize_minister_name(entry.get("MINISTER") or "")
+
+
+def entry_url(entry: Dict[str, str]) -> str:
+    match = TITLE_HREF_RE.search(entry.get("TITLE") or "")
+    return match.group(1) if match else ""
+
+
+def url_features(entry: Dict[str, str]) -> Tuple[Tuple[str, ...], frozenset]:
+    segments = [segment for segment in urlparse(entry_url(entry)).path.split("/") if segment]
+    date_part: Tuple[str, ...] = ()
+    for index, segment in enumerate(segments[:-1]):
+        if DATE_SEGMENT_RE.match(segment) and MONTH_SEGMENT_RE.match(segments[index + 1]):
+            date_part = (segment, segments[index + 1])
+            break
+    slug = segments[-1].rsplit(".", 1)[0] if segments else ""
+    tokens = frozenset(
+        token
+        for token in slug.lower().split("-")
+        if (len(token) >= MIN_SLUG_TOKEN_LENGTH or token.isdigit()) and token not in COMMON_SLUG_TOKENS
+    )
+    return date_part, tokens
+
+
+def url_score(en_features, fr_features) -> int:
+    en_date, en_tokens = en_features
+    fr_date, fr_tokens = fr_features
+    score = 2 if en_date and en_date == fr_date else 0
+    return score + len(en_tokens & fr_tokens)
+
+
+def assign_by_url(
+    en_ids: List[int],
+    fr_ids: List[int],
+    en_features: Dict[int, tuple],
+    fr_features: Dict[int, tuple],
+    en_match: List[Optional[int]],
+    fr_taken: List[bool],
+    min_score: int,
+) -> None:
+    candidates = []
+    for en_order, en_id in enumerate(en_ids):
+        for fr_order, fr_id in enumerate(fr_ids):
+            score = url_score(en_features[en_id], fr_features[fr_id])
+            if score >= min_score:
+                candidates.append((-score, en_order, fr_order, en_id, fr_id))
+    # Highest score wins; ties keep feed order, which is what the old first-match scan did.
+    candidates.sort()
+    for _, _, _, en_id, fr_id in candidates:
+        if en_match[en_id] is None and not fr_taken[fr_id]:
+            en_match[en_id] = fr_id
+            fr_taken[fr_id] = True
+
+
+def features_for(entries: List[Dict[str, str]], ids: List[int], cache: Dict[int, tuple]) -> None:
+    for entry_id in ids:
+        if entry_id not in cache:
+            cache[entry_id] = url_features(entries[entry_id])
+
+
+def pair_feeds(
+    news_en: List[Dict[str, str]], news_fr: List[Dict[str, str]]
+) -> Tuple[List[Pair], List[Dict[str, str]], List[Dict[str, str]]]:
+    en_groups: Dict[Tuple[str, str], List[int]] = {}
+    for en_id, entry in enumerate(news_en):
+        en_groups.setdefault(pairing_key(entry), []).append(en_id)
+    fr_groups: Dict[Tuple[str, str], List[int]] = {}
+    for fr_id, entry in enumerate(news_fr):
+        fr_groups.setdefault(pairing_key(entry), []).append(fr_id)
+
+    en_match: List[Optional[int]] = [None] * len(news_en)
+    fr_taken = [False] * len(news_fr)
+    en_features: Dict[int, tuple] = {}
+    fr_features: Dict[int, tuple] = {}
+
+    for key, en_ids in en_groups.items():
+        fr_ids = fr_groups.get(key)
+        if not fr_ids:
+            continue
+        if len(en_ids) == 1 and len(fr_ids) == 1:
+            en_match[en_ids[0]] = fr_ids[0]
+            fr_taken[fr_ids[0]] = True
+            continue
+        features_for(news_en, en_ids, en_features)
+        features_for(news_fr, fr_ids, fr_features)
+        assign_by_url(en_ids, fr_ids, en_features, fr_features, en_match, fr_taken, 0)
+
+    # Leftovers share a PUBDATE but not a minister (or were outnumbered in their group).
+    leftover_en: Dict[str, List[int]] = {}
+    for en_id, fr_id in enumerate(en_match):
+        if fr_id is None:
+            leftover_en.setdefault(news_en[en_id].get("PUBDATE") or "", []).append(en_id)
+    if leftover_en:
+        leftover_fr: Dict[str, List[int]] = {}
+        for fr_id, taken in enumerate(fr_taken):
+            pubdate = news_fr[fr_id].get("PUBDATE") or ""
+            if not taken and pubdate in leftover_en:
+                leftover_fr.setdefault(pubdate, []).append(fr_id)
+        for pubdate, en_ids in leftover_en.items():
+            fr_ids = leftover_fr.get(pubdate)
+            if not fr_ids:
+                continue
+            features_for(news_en, en_ids, en_features)
+            features_for(news_fr, fr_ids, fr_features)
+            assign_by_url(
+                en_ids, fr_ids, en_features, fr_features, en_match, fr_taken, MIN_FALLBACK_SCORE
+            )
+
+    pairs = [(news_en[en_id], news_fr[fr_id]) for en_id, fr_id in enumerate(en_match) if fr_id is not None]
+    unmatched_en = [news_en[en_id] for en_id, fr_id in enumerate(en_match) if fr_id is None]
+    unmatched_fr = [news_fr[fr_id] for fr_id, taken in enumerate(fr_taken) if not taken]
+    return pairs, unmatched_en, unmatched_fr
+
+
+def nested_scan_pairs(news_en: List[Dict[str, str]], news_fr: List[Dict[str, str]]) -> List[Pair]:
+    # The original O(N x M) pairing loop, kept for benchmarking only.
+    pairs = []
+    for en in news_en:
+        for fr in news_fr:
+            if (en.get("PUBDATE") == fr.get("PUBDATE") and
+                normalize_minister_name(en.get("MINISTER", "")) == normalize_minister_name(fr.get("MINISTER", ""))):
+                pairs.append((en, fr))
+                break
+    return pairs
+
+
+def synthetic_feeds(size: int, seed: int = 0) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    rng = random.Random(seed)
+    ministers = [f"Minister {index}" for index in range(60)] + [""] * 20
+    news_en: List[Dict[str, str]] = []
+    news_fr: List[Dict[str, str]] = []
+    base = 1577836800  # 2020-01-01 00:00:00 UTC
+    for index in range(size):
+        # Releases land on five-minute marks, so some (PUBDATE, minister) keys collide.
+        timestamp = base + rng.randrange(size * 12) * 300
+        pubdate = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+        year, month = pubdate[:4], pubdate[5:7]
+        minister = rng.choice(ministers)
+        token = f"item{index}"
+        news_en.append(
+            {
+                "PUBDATE": pubdate,
+                "MINISTER": f"Hon. {minister}" if minister else "",
+                "TITLE": f"<a href='https://www.canada.ca/en/dept/news/{year}/{month}/release-{token}.html'>Release {index}</a>",
+            }
+        )
+        news_fr.append(
+            {
+                "PUBDATE": pubdate,
+                "MINISTER": f"L'hon. {minister}" if minister else "",
+                "TITLE": f"<a href='https://www.canada.ca/fr/min/nouvelles/{year}/{month}/communique-{token}.html'>Communiqué {index}</a>",
+            }
+        )
+    rng.shuffle(news_fr)
+    return news_en, news_fr
+
+
+def run_benchmark(sizes: List[int]) -> None:
+    print(f"{'entries':>10} {'hash join s':>12} {'paired':>9} {'unmatched':>10} {'nested scan s':>14}")
+    for size in sizes:
+        news_en, news_fr = synthetic_feeds(size)
+        started = time.perf_counter()
+        pairs, unmatched_en, _ = pair_feeds(news_en, news_fr)
+        hash_join_seconds = time.perf_counter() - started
+
+        nested_seconds = "skipped"
+        if size <= NESTED_BENCHMARK_LIMIT:
+            started = time.perf_counter()
+            nested_scan_pairs(news_en, news_fr)
+            nested_seconds = f"{time.perf_counter() - started:.3f}"
+        print(f"{size:>10} {hash_join_seconds:>12.3f} {len(pairs):>9} {len(unmatched_en):>10} {nested_seconds:>14}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark EN/FR news feed pairing on synthetic feeds.")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        run_benchmark(args.sizes)
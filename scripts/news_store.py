@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite store for the news, quote, image and half-masting datasets.
+
+Tables are typed and indexed on hash, PUBDATE, DEPT_EN and TYPE_EN, writes are
+upserts, and the CSVs in the repository become exports of the store.
+
+    python -m scripts.news_store import --store data/news.sqlite   # load the CSVs
+    python -m scripts.news_store export --store data/news.sqlite   # regenerate the CSVs
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Sequence
+
+import pandas as pd
+
+from scripts.news_index import detect_line_terminator
+from scripts.row_hashing import HASHED_COLUMNS, column_strings
+
+STORE_PATH = os.path.join("data", "news.sqlite")
+# The quote and image counts live in data/article_counts.csv, not here, so the news export has the
+# columns ingestion writes. Stores made while they were here keep the two columns, unused.
+NEWS_COLUMNS = ["hash"] + HASHED_COLUMNS
+NEWS_KEY = ["PUBDATE", "TITLE_TEXT_EN", "TITLE_URL_EN"]
+QUOTE_COLUMNS = [
+    "id", "hash", "PUBDATE", "TITLE_URL_EN", "TITLE_URL_FR", "QUOTE_INDEX",
+    "QUOTE_EN", "SPEAKER_EN", "SPEAKER_NAME_EN", "SPEAKER_TITLE_EN", "SPEAKER_ORGANIZATION_EN",
+    "QUOTE_FR", "SPEAKER_FR", "SPEAKER_NAME_FR", "SPEAKER_TITLE_FR", "SPEAKER_ORGANIZATION_FR",
+]
+IMAGE_COLUMNS = [
+    "id", "hash", "PUBDATE", "TITLE_URL_EN", "TITLE_URL_FR", "IMAGE_INDEX",
+    "FILENAME", "ALT_TEXT_EN", "ALT_TEXT_FR", "FILE_PATH", "EXIF_JSON",
+    "WIDTH", "HEIGHT", "BYTES", "SHA256",
+]
+HALF_MASTING_COLUMNS = [
+    "id",
+    "notice_en", "period_en", "location_en", "details_en",
+    "notice_fr", "period_fr", "location_fr", "details_fr",
+]
+HALF_MASTING_ENRICHED_COLUMNS = HALF_MASTING_COLUMNS + ["dt_start", "dt_end", "person_candidates"]
+INTEGER_COLUMNS = {"QUOTE_INDEX", "IMAGE_INDEX", "WIDTH", "HEIGHT", "BYTES"}
+
+# table -> (columns, conflict key, CSV export path)
+TABLES = {
+    "news": (NEWS_COLUMNS, NEWS_KEY, "combined_news.csv"),
+    "quotes": (QUOTE_COLUMNS, ["id"], "combined_news_quotes.csv"),
+    "images": (IMAGE_COLUMNS, ["id"], "combined_news_images.csv"),
+    "half_masting": (HALF_MASTING_COLUMNS, ["id"], os.path.join("data", "half_masting_combined.csv")),
+    "half_masting_enriched": (
+        HALF_MASTING_ENRICHED_COLUMNS, ["id"], os.path.join("data", "half_masting_enriched.csv")
+    ),
+}
+INDEXES = {
+    "news": [["hash"], ["PUBDATE"], ["DEPT_EN"], ["TYPE_EN"]],
+    "quotes": [["hash"], ["PUBDATE"]],
+    "images": [["hash"], ["PUBDATE"]],
+}
+# Exports keep the CSV orderings the file-based scripts produce; rows whose article is
+# no longer in the news table go last, in insertion order.
+EXPORT_ORDER = {
+    "news": "PUBDATE, TITLE_TEXT_EN = '', TITLE_TEXT_EN, rowid",
+    "quotes": "news_order IS NULL, news_order, CASE WHEN news_order IS NULL THEN quotes.rowid END, QUOTE_INDEX",
+    "images": "news_order IS NULL, news_order, CASE WHEN news_order IS NULL THEN images.rowid END, IMAGE_INDEX",
+    "half_masting": "id",
+    "half_masting_enriched": "rowid",
+}
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_type(column: str) -> str:
+    return "INTEGER" if column in INTEGER_COLUMNS else "TEXT NOT NULL DEFAULT ''"
+
+
+def open_store(path: str = STORE_PATH) -> sqlite3.Connection:
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for table, (columns, key, _) in TABLES.items():
+        column_sql = ", ".join(f"{quote_identifier(column)} {column_type(column)}" for column in columns)
+        key_sql = ", ".join(quote_identifier(column) for column in key)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_sql}, UNIQUE ({key_sql}))")
+        # Stores made before a column was added get it, empty.
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {quote_identifier(column)} {column_type(column)}")
+        for index_columns in INDEXES.get(table, []):
+            index_name = f"idx_{table}_{'_'.join(index_columns).lower()}"
+            index_sql = ", ".join(quote_identifier(column) for column in index_columns)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({index_sql})")
+    conn.commit()
+    return conn
+
+
+def to_db_value(column: str, value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None if column in INTEGER_COLUMNS else ""
+    if column in INTEGER_COLUMNS:
+        text = str(value).strip()
+        return int(float(text)) if text else None
+    return str(value)
+
+
+def from_db_value(value) -> str:
+    return "" if value is None else str(value)
+
+
+def frame_rows(frame: pd.DataFrame) -> List[Dict[str, str]]:
+    # Format values the way DataFrame.to_csv would, so exports match the pandas writers.
+    strings = pd.DataFrame({column: column_strings(frame[column]) for column in frame.columns})
+    return strings.to_dict("records")
+
+
+def upsert_rows(conn: sqlite3.Connection, table: str, rows: Iterable[Dict[str, str]]) -> int:
+    columns, key, _ = TABLES[table]
+    updates = [column for column in columns if column not in key]
+    assignments = [f"{quote_identifier(column)} = excluded.{quote_identifier(column)}" for column in updates]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(quote_identifier(column) for column in columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT ({', '.join(quote_identifier(column) for column in key)}) "
+        f"DO UPDATE SET {', '.join(assignments)}"
+    )
+    values = [[to_db_value(column, row.get(column)) for column in columns] for row in rows]
+    with conn:
+        conn.executemany(sql, values)
+    return len(values)
+
+
+def replace_article_rows(
+    conn: sqlite3.Connection, table: str, article_hash: str, rows: Sequence[Dict[str, str]]
+) -> None:
+    with conn:
+        conn.execute(f"DELETE FROM {table} WHERE hash = ?", (article_hash,))
+    upsert_rows(conn, table, rows)
+
+
+def select_sql(table: str) -> str:
+    columns, _, _ = TABLES[table]
+    column_sql = ", ".join(f"{table}.{quote_identifier(column)}" for column in columns)
+    if table in {"quotes", "images"}:
+        # Article rows follow the order of their article in the news export.
+        return (
+            "WITH positions AS ("
+            f"SELECT hash, ROW_NUMBER() OVER (ORDER BY {EXPORT_ORDER['news']}) AS position FROM news"
+            "), news_order AS (SELECT hash, MIN(position) AS news_order FROM positions GROUP BY hash) "
+            f"SELECT {column_sql}, news_order.news_order FROM {table} "
+            f"LEFT JOIN news_order ON news_order.hash = {table}.hash "
+            f"ORDER BY {EXPORT_ORDER[table]}"
+        )
+    return f"SELECT {column_sql} FROM {table} ORDER BY {EXPORT_ORDER[table]}"
+
+
+def load_rows(conn: sqlite3.Connection, table: str) -> List[Dict[str, str]]:
+    columns, _, _ = TABLES[table]
+    return [
+        {column: from_db_value(value) for column, value in zip(columns, row)}
+        for row in conn.execute(select_sql(table))
+    ]
+
+
+def count_rows(conn: sqlite3.Connection, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def export_csv(conn: sqlite3.Connection, table: str, path: str = "") -> str:
+    columns, _, default_path = TABLES[table]
+    path = path or default_path
+    # Keep the line endings of the file being replaced; new files get the csv module default.
+    line_terminator = detect_line_terminator(path) if os.path.exists(path) else "\r\n"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh, lineterminator=line_terminator)
+        writer.writerow(columns)
+        for row in conn.execute(select_sql(table)):
+            writer.writerow(from_db_value(value) for value in row[: len(columns)])
+    os.replace(tmp_path, path)
+    return path
+
+
+def import_csv(conn: sqlite3.Connection, table: str, path: str = "") -> int:
+    path = path or TABLES[table][2]
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return upsert_rows(conn, table, csv.DictReader(fh))
+
+
+def ensure_imported(conn: sqlite3.Connection, table: str, path: str = "") -> None:
+    # Bootstrap an empty store from the committed CSV the first time it is used.
+    if count_rows(conn, table) == 0:
+        import_csv(conn, table, path)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load the dataset CSVs into SQLite or export them back out.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLES), default=list(TABLES))
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    conn = open_store(args.store)
+    for table in args.tables:
+        if args.command == "import":
+            print(f"Imported {import_csv(conn, table)} rows into {table}")
+        else:
+            print(f"Exported {count_rows(conn, table)} rows from {table} to {export_csv(conn, table)}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compressed, content-addressed archive of the article pages the extractor fetches.
+
+Every distinct page body is stored once, gzip-compressed, as
+objects/<aa>/<sha256>.html.gz, where <aa> is the first two hex digits of the
+SHA-256 of the UTF-8 body. index.jsonl maps each page URL to the digest of its
+latest body. A line is appended only when a URL is new or its body changed, and
+later lines win. With the archive in place, `extract_news_quotes.py --reparse`
+re-runs the quote, speaker and image extraction on the stored pages instead of
+downloading them again.
+
+The archive lives under .cache/page_archive (not committed; the extraction
+workflow keeps it in the Actions cache).
+
+Summarize it:  python -m scripts.page_archive --archive .cache/page_archive
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+PAGE_ARCHIVE_DIR = os.path.join(".cache", "page_archive")
+INDEX_FILE = "index.jsonl"
+
+
+class PageArchive:
+    def __init__(self, root: str = PAGE_ARCHIVE_DIR, serve_pages: bool = False) -> None:
+        # serve_pages: fetch_page() answers from the archive before going to the network.
+        self.root = root
+        self.serve_pages = serve_pages
+        self._lock = threading.Lock()
+        self.index: Dict[str, str] = {}
+        self.served = 0
+        self.stored = 0
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        index_path = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index[entry["url"]] = entry["sha256"]
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            digest = self.index.get(url)
+        if digest is None:
+            return None
+        try:
+            with gzip.open(self.object_path(digest), "rb") as fh:
+                html = fh.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.served += 1
+        return html
+
+    def put(self, url: str, html: str) -> str:
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written aside and renamed, so a concurrent or interrupted write never leaves half an object.
+            partial = f"{path}.{threading.get_ident()}.tmp"
+            with open(partial, "wb") as fh:
+                fh.write(gzip.compress(body, mtime=0))
+            os.replace(partial, path)
+
+        with self._lock:
+            if self.index.get(url) == digest:
+                return digest
+            self.index[url] = digest
+            self.stored += 1
+            entry = {"url": url, "sha256": digest, "archived_at": datetime.now(timezone.utc).isoformat()}
+            with open(os.path.join(self.root, INDEX_FILE), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+
+def archive_summary(root: str) -> str:
+    archive = PageArchive(root)
+    objects = set(archive.index.values())
+    compressed = raw = 0
+    for digest in objects:
+        path = archive.object_path(digest)
+        compressed += os.path.getsize(path)
+        with gzip.open(path, "rb") as fh:
+            raw += len(fh.read())
+    ratio = raw / compressed if compressed else 0.0
+    return (
+        f"{len(archive.index)} page URLs, {len(objects)} distinct bodies, "
+        f"{raw / 1048576:.1f} MiB of HTML in {compressed / 1048576:.1f} MiB ({ratio:.1f}x)"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize the archive of fetched article pages.")
+    parser.add_argument("--archive", default=PAGE_ARCHIVE_DIR)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    print(archive_summary(parse_args().archive))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Optional month-partitioned layout for the news, quote and image tables.
+
+Each table is kept as one CSV per PUBDATE month, data/partitions/<table>/<YYYY-MM>.csv
+(undated rows in undated.csv), each with the header of the single-file CSV. The
+manifest (data/partitions/manifest.json) records each table's header and its
+partitions in file order, with their row counts and the SHA-256 of their bytes.
+A write serializes every month but rewrites only the partitions whose digest
+changed, so a run that touches a few articles rewrites a few small files and
+leaves a small git diff. The single-file CSVs are the partitions concatenated in
+manifest order, byte for byte, for the consumers that read them:
+
+    python -m scripts.partitioned_tables split --tables quotes images    # from the single files
+    python -m scripts.partitioned_tables concat --tables quotes images   # back to the single files
+    python -m scripts.partitioned_tables stats
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+PARTITIONS_DIR = os.path.join("data", "partitions")
+MANIFEST_NAME = "manifest.json"
+UNDATED = "undated"
+TABLE_PATHS = {
+    "news": "combined_news.csv",
+    "quotes": "combined_news_quotes.csv",
+    "images": "combined_news_images.csv",
+}
+
+
+def partition_of(row: Dict[str, str]) -> str:
+    month = str(row.get("PUBDATE", "")).strip()[:7]
+    return month if re.fullmatch(r"\d{4}-\d{2}", month) else UNDATED
+
+
+def partition_path(root: str, table: str, name: str) -> str:
+    return os.path.join(root, table, f"{name}.csv")
+
+
+def load_manifest(root: str) -> Dict[str, Dict]:
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def write_manifest(root: str, manifest: Dict[str, Dict]) -> None:
+    path = os.path.join(root, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2, sort_keys=True)
+        fh.write("\n")
+    os.replace(f"{path}.tmp", path)
+
+
+def has_table(root: str, table: str) -> bool:
+    return table in load_manifest(root)
+
+
+def read_rows(root: str, table: str) -> Iterator[Dict[str, str]]:
+    # Every row of the table, partition by partition in manifest order.
+    for partition in load_manifest(root)[table]["partitions"]:
+        with open(partition_path(root, table, partition["name"]), newline="", encoding="utf-8") as fh:
+            yield from csv.DictReader(fh)
+
+
+def write_table(root: str, table: str, fieldnames: List[str], rows: Iterable[Dict[str, str]]) -> Tuple[int, int]:
+    # Returns (partitions rewritten, partitions in the table). Months keep the order they first
+    # appear in, and rows their order within a month, so the concatenation is the single file
+    # whenever its rows are grouped by month.
+    months: Dict[str, List[Dict[str, str]]] = {}
+    for row in rows:
+        months.setdefault(partition_of(row), []).append(row)
+
+    manifest = load_manifest(root)
+    previous = manifest.get(table, {})
+    digests = {partition["name"]: partition["sha256"] for partition in previous.get("partitions", [])}
+    if previous.get("fieldnames") != list(fieldnames):
+        # A new header changes every partition.
+        digests = dict.fromkeys(digests, "")
+    os.makedirs(os.path.join(root, table), exist_ok=True)
+    partitions = []
+    rewritten = 0
+    for name, month_rows in months.items():
+        buffer = io.StringIO(newline="")
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(month_rows)
+        data = buffer.getvalue().encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = partition_path(root, table, name)
+        if digests.get(name) != digest or not os.path.exists(path):
+            with open(f"{path}.tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(f"{path}.tmp", path)
+            rewritten += 1
+        partitions.append({"name": name, "rows": len(month_rows), "sha256": digest})
+
+    manifest[table] = {"fieldnames": list(fieldnames), "partitions": partitions}
+    write_manifest(root, manifest)
+    # Months that emptied go only once the manifest no longer lists them.
+    for name in set(digests) - set(months):
+        path = partition_path(root, table, name)
+        if os.path.exists(path):
+            os.remove(path)
+    return rewritten, len(partitions)
+
+
+def split_table(root: str, table: str, path: str = "") -> Tuple[int, int]:
+    with open(path or TABLE_PATHS[table], newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        return write_table(root, table, list(reader.fieldnames or []), reader)
+
+
+def concat_table(root: str, table: str, path: str = "") -> str:
+    # Streams the partitions into one CSV: the header once, then each partition after its own.
+    path = path or TABLE_PATHS[table]
+    with open(f"{path}.tmp", "wb") as out:
+        for index, partition in enumerate(load_manifest(root)[table]["partitions"]):
+            with open(partition_path(root, table, partition["name"]), "rb") as fh:
+                header = fh.readline()
+                if index == 0:
+                    out.write(header)
+                while True:
+                    chunk = fh.read(1 << 20)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Split the dataset CSVs into month partitions or concatenate them back.")
+    parser.add_argument("command", choices=["split", "concat", "stats"])
+    parser.add_argument("--partitions", default=PARTITIONS_DIR)
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLE_PATHS), default=list(TABLE_PATHS))
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    manifest = load_manifest(args.partitions)
+    for table in args.tables:
+        if args.command == "split":
+            rewritten, total = split_table(args.partitions, table)
+            print(f"Split {TABLE_PATHS[table]} into {total} partitions ({rewritten} written)")
+        elif table not in manifest:
+            print(f"{table}: not partitioned under {args.partitions}")
+        elif args.command == "concat":
+            print(f"Concatenated {len(manifest[table]['partitions'])} {table} partitions into {concat_table(args.partitions, table)}")
+        else:
+            partitions = manifest[table]["partitions"]
+            rows = sum(partition["rows"] for partition in partitions)
+            largest = max(partitions, key=lambda partition: partition["rows"], default=None)
+            print(
+                f"{table}: {rows} rows in {len(partitions)} partitions"
+                + (f", largest {largest['name']} with {largest['rows']} rows" if largest else "")
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
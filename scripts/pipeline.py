@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Local runner for the data pipeline the GitHub workflows chain together.
+
+Each stage declares the files it reads and writes. After a stage succeeds the
+runner records the SHA-256 digests it left behind in .cache/pipeline_state.json,
+and the next run skips it while its inputs, outputs and command are unchanged.
+Stages whose dependencies are done run concurrently, so the half-masting scrape
+and enrichment proceed next to news ingestion. The feed merge, the scrape and the
+quote extraction read from canada.ca, so they always run; update_news_data.py
+already stops early when neither feed changed, and the extractor fetches only the
+articles still pending, due for a retry or recent enough to revalidate. Stages
+whose inputs those runs left unchanged are skipped.
+
+Run the pipeline:           python -m scripts.pipeline
+Show what would run:        python -m scripts.pipeline --dry-run
+Run some stages only:       python -m scripts.pipeline --stages extract search_index
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from scripts.news_loader import file_digest
+
+STATE_PATH = os.path.join(".cache", "pipeline_state.json")
+CHART_OUTPUTS = [
+    "type_en_pie_chart.mmd", "loc_en_pie_chart.mmd", "dept_releases_line_chart.mmd", "topic_en_line_chart.mmd",
+    "docs/type_axes_quarter_curves.md", "docs/news_type_30d.mmd", "docs/type_heatmap_180d.svg",
+]
+
+
+class Stage(NamedTuple):
+    name: str
+    command: List[str]
+    inputs: List[str]  # files or directories, relative to the repository root
+    outputs: List[str]
+    after: List[str] = []
+    remote: bool = False  # reads from the network, so local digests cannot tell it is current
+    default: bool = True
+
+
+STAGES = [
+    Stage(
+        "news",
+        ["update_news_data.py", "--incremental"],
+        ["update_news_data.py"],
+        ["combined_news.csv", "data/combined_news_index.csv", "data/news_feed_state.json"],
+        remote=True,
+    ),
+    Stage(
+        "half_masting",
+        ["scripts/scrape_half_masting.py"],
+        ["scripts/scrape_half_masting.py"],
+        ["data/half_masting_combined.csv"],
+        remote=True,
+    ),
+    Stage(
+        "half_masting_enrich",
+        ["scripts/enrich_halfmast.py"],
+        ["scripts/enrich_halfmast.py", "data/half_masting_combined.csv"],
+        ["data/half_masting_enriched.csv"],
+        after=["half_masting"],
+    ),
+    Stage(
+        "extract",
+        ["scripts/extract_news_quotes.py"],
+        [
+            "scripts/extract_news_quotes.py", "scripts/adaptive_concurrency.py", "scripts/article_counts.py",
+            "scripts/async_fetch.py", "scripts/compact_rows.py", "scripts/extract_journal.py",
+            "scripts/fetch_queue.py", "scripts/http_pool.py", "scripts/image_blobs.py", "scripts/news_index.py",
+            "scripts/news_store.py", "scripts/page_archive.py", "scripts/partitioned_tables.py",
+            "scripts/row_hashing.py", "combined_news.csv",
+        ],
+        [
+            "data/article_counts.csv", "combined_news_quotes.csv", "combined_news_images.csv",
+            "data/news_quotes_state.json", "data/news_images",
+        ],
+        after=["news"],
+        # Articles past --limit, retries coming due and recent articles to revalidate all wait on
+        # canada.ca rather than on a local change.
+        remote=True,
+    ),
+    Stage(
+        "search_index",
+        ["scripts/build_search_index.py"],
+        ["scripts/build_search_index.py", "combined_news.csv", "combined_news_quotes.csv", "combined_news_images.csv"],
+        ["docs/search-data.json"],
+        after=["extract"],
+    ),
+    Stage(
+        "charts",
+        ["-m", "scripts.news_charts", "--charts", "type_pie", "location_pie", "dept_30d", "topic_12m",
+         "type_radar", "type_30d", "type_heatmap"],
+        ["scripts/news_charts.py", "scripts/news_cube.py", "scripts/svg_charts.py", "combined_news.csv"],
+        CHART_OUTPUTS,
+        after=["extract"],
+    ),
+    # gen_readme.py replaces README.md with the charts alone, so it only runs when named.
+    Stage(
+        "readme",
+        ["gen_readme.py"],
+        ["gen_readme.py", "type_en_pie_chart.mmd", "dept_releases_line_chart.mmd", "topic_en_line_chart.mmd"],
+        ["README.md"],
+        after=["charts"],
+        default=False,
+    ),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def path_digest(path: Path) -> Optional[str]:
+    if path.is_file():
+        return file_digest(str(path))
+    if path.is_dir():
+        # Directories (downloaded images) are fingerprinted by their listing and sizes.
+        listing = hashlib.sha256()
+        for child in sorted(path.rglob("*")):
+            if child.is_file():
+                listing.update(f"{child.relative_to(path).as_posix()}\0{child.stat().st_size}\n".encode())
+        return "dir:" + listing.hexdigest()
+    return None
+
+
+def digests(paths: Sequence[str]) -> Dict[str, Optional[str]]:
+    return {path: path_digest(ROOT / path) for path in paths}
+
+
+def load_state(path: Path) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def write_state(path: Path, state: Dict[str, Dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def skip_reason(stage: Stage, recorded: Optional[Dict]) -> Optional[str]:
+    # Why the stage can be skipped, or None when it has to run.
+    if stage.remote or not recorded or recorded.get("command") != stage.command:
+        return None
+    if recorded.get("inputs") != digests(stage.inputs) or recorded.get("outputs") != digests(stage.outputs):
+        return None
+    return "inputs unchanged"
+
+
+def run_stage(stage: Stage) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *stage.command], cwd=str(ROOT), capture_output=True, text=True
+    )
+
+
+def selected_stages(names: Sequence[str]) -> List[Stage]:
+    if not names:
+        return [stage for stage in STAGES if stage.default]
+    return [STAGES_BY_NAME[name] for name in names]
+
+
+def run_pipeline(names: Sequence[str], force: bool, dry_run: bool, jobs: int, state_path: Path) -> int:
+    stages = selected_stages(names)
+    wanted = {stage.name for stage in stages}
+    state = load_state(state_path)
+    pending = {stage.name: stage for stage in stages}
+    # Dependencies outside the selection count as done.
+    done = {stage.name for stage in STAGES if stage.name not in wanted}
+    failed: List[str] = []
+    started_at = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        running = {}
+        would_run: List[str] = []
+        while pending or running:
+            progressed = False
+            for name, stage in list(pending.items()):
+                if any(dependency in failed for dependency in stage.after):
+                    print(f"[{name}] not run: {', '.join(d for d in stage.after if d in failed)} failed")
+                    failed.append(name)
+                elif all(dependency in done for dependency in stage.after):
+                    reason = None if force else skip_reason(stage, state.get(name))
+                    # A remote stage runs whatever its dependencies write.
+                    upstream = [] if stage.remote else [dependency for dependency in stage.after if dependency in would_run]
+                    if dry_run:
+                        print(f"[{name}] " + (
+                            f"may run, depending on what {', '.join(upstream)} writes" if upstream
+                            else f"skipped: {reason}" if reason else "would run"
+                        ))
+                        if upstream or not reason:
+                            would_run.append(name)
+                        done.add(name)
+                    elif reason:
+                        print(f"[{name}] skipped: {reason}")
+                        done.add(name)
+                    else:
+                        print(f"[{name}] running: python {' '.join(stage.command)}")
+                        running[executor.submit(run_stage, stage)] = (stage, time.perf_counter())
+                else:
+                    continue
+                del pending[name]
+                progressed = True
+            if not running:
+                if pending and progressed:
+                    continue
+                # Nothing left can start: a dependency cycle among the remaining stages.
+                failed.extend(pending)
+                pending.clear()
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, stage_started = running.pop(future)
+                result = future.result()
+                elapsed = time.perf_counter() - stage_started
+                output = (result.stdout + result.stderr).strip()
+                if output:
+                    print("\n".join(f"[{stage.name}] {line}" for line in output.splitlines()))
+                if result.returncode:
+                    print(f"[{stage.name}] failed with exit code {result.returncode} after {elapsed:.1f}s")
+                    failed.append(stage.name)
+                    state.pop(stage.name, None)
+                    continue
+                print(f"[{stage.name}] done in {elapsed:.1f}s")
+                # Record what the stage left behind; files it both reads and rewrites
+                # (combined_news.csv for the extractor) are compared against that next time.
+                state[stage.name] = {
+                    "command": stage.command,
+                    "inputs": digests(stage.inputs),
+                    "outputs": digests(stage.outputs),
+                }
+                done.add(stage.name)
+
+    if not dry_run:
+        write_state(state_path, state)
+    print(f"Pipeline finished in {time.perf_counter() - started_at:.1f}s" + (f"; failed: {', '.join(failed)}" if failed else ""))
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the news data pipeline, skipping stages whose inputs are unchanged.")
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES_BY_NAME),
+        help="Stages to run (default: all but readme); dependencies outside the list are not run",
+    )
+    parser.add_argument("--force", action="store_true", help="Run the selected stages even if their inputs are unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Show which stages would run")
+    parser.add_argument("--jobs", type=int, default=4, help="Stages to run at the same time")
+    parser.add_argument("--state", default=STATE_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(run_pipeline(args.stages or [], args.force, args.dry_run, args.jobs, ROOT / args.state))
@@ -2,6 +2,10 @@
 """
 Scrape English and French half-masting notices from canada.ca, merge by hidden id, and save combined CSV to data/half_masting_combined.csv
 Requirements: requests, beautifulsoup4
+
+Both pages are fetched through the adaptive concurrency limit the quote extractor
+uses (scripts/adaptive_concurrency.py), so a 429 or 503 from canada.ca is waited
+out (its Retry-After honoured) and retried instead of failing the run.
 """
 
 import os
@@ -12,6 +16,10 @@ from typing import Dict, List
 import requests
 from bs4 import BeautifulSoup
 
+# Allow running as `python scripts/scrape_half_masting.py` as well as with -m.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.adaptive_concurrency import CONCURRENCY, limited_adapter
+
 URLS = {
     'en': 'https://www.canada.ca/en/canadian-heritage/services/half-masting-notices.html',
     'fr': 'https://www.canada.ca/fr/patrimoine-canadien/services/avis-mise-berne.html',
@@ -29,8 +37,17 @@ def clean_text(node):
     return ' '.join(node.stripped_strings)
 
 
-def scrape(url: str) -> List[Dict[str, str]]:
-    r = requests.get(url, headers=HEADERS, timeout=20)
+def make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = limited_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def scrape(url: str, session: requests.Session) -> List[Dict[str, str]]:
+    r = session.get(url, timeout=20)
     r.raise_for_status()
     soup = BeautifulSoup(r.content, 'html.parser')
 
@@ -104,12 +121,16 @@ def write_csv(path: str, rows: List[Dict[str, str]]):
 
 
 if __name__ == '__main__':
+    CONCURRENCY.configure(initial=2, maximum=2)
+    session = make_session()
     try:
-        en_rows = scrape(URLS['en'])
-        fr_rows = scrape(URLS['fr'])
+        en_rows = scrape(URLS['en'], session)
+        fr_rows = scrape(URLS['fr'], session)
     except Exception as e:
         print('Error scraping pages:', e, file=sys.stderr)
         sys.exit(1)
+    finally:
+        print(f'Concurrency: {CONCURRENCY.summary()}')
 
     merged = merge_rows(en_rows, fr_rows)
     out_path = 'data/half_masting_combined.csv'
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the canada.ca article pages, for benchmarking the scrapers.
+
+Serves bilingual article pages shaped like canada.ca news releases (a "Quotes" /
+"Citations" section of blockquotes and a few body images) and the PNGs they
+reference (noise at --photo-size, for memory measurements), over HTTP/1.1
+keep-alive with a fixed delay per response. Every
+response carries an ETag, and a matching If-None-Match gets a 304. Bumping
+server.revisions[n] edits article n after publication. Given a --capacity, it
+throttles like a busy origin: responses slow down in proportion once more
+requests than that are in flight, and those beyond twice the capacity get a 429
+with a Retry-After. It counts the requests it answers, the 304s and 429s among
+them and the most it served at once.
+
+Serve it by hand:  python -m scripts.stand_in_server --port 8765 --latency 0.05
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+
+# Site chrome around the article, about the size canada.ca pages carry.
+HEAD_CHROME = "".join(f'<link rel="stylesheet" href="/etc/designs/canada/wet-boew/css/theme-{index}.css">' for index in range(12))
+HEADER_CHROME = (
+    '<header><nav><ul class="menu">'
+    + "".join(
+        f'<li><a href="/en/services/topic-{index}.html">Topic {index}</a><ul>'
+        + "".join(f'<li><a href="/en/services/topic-{index}/page-{page}.html">Page {page}</a></li>' for page in range(12))
+        + "</ul></li>"
+        for index in range(15)
+    )
+    + '</ul></nav><img src="/etc/designs/canada/wet-boew/assets/sig-blk-en.svg" alt="Government of Canada"></header>'
+)
+FOOTER_CHROME = (
+    '<footer><nav><ul>'
+    + "".join(f'<li><a href="/en/footer/link-{index}.html">Footer link {index}</a></li>' for index in range(60))
+    + '</ul></nav><img src="/etc/designs/canada/wet-boew/assets/wmms-blk.svg" alt="Symbol of the Government of Canada"></footer>'
+)
+
+
+def article_html(number: int, lang: str, revision: int = 0) -> str:
+    heading = "Citations" if lang == "fr" else "Quotes"
+    edit = f" Revision {revision}." if revision else ""
+    quotes = "".join(
+        f'<blockquote><p>“Quote {index + 1} of article {number} ({lang}).{edit}”</p>'
+        f"<p>— The Honourable Person {index + 1}, Minister of Things {number % 7}</p></blockquote>"
+        for index in range(number % 4)
+    )
+    images = "".join(
+        f'<figure><img src="/images/{number}/photo-{index + 1}.png" alt="Photo {index + 1} ({lang})">'
+        f"<figcaption>Caption {index + 1}</figcaption></figure>"
+        for index in range(number % 3 + 1)
+    )
+    return (
+        f'<!DOCTYPE html><html lang="{lang}"><head><title>Article {number}</title>{HEAD_CHROME}</head><body>'
+        f"{HEADER_CHROME}<main><h1>Article {number}</h1><p>{'Body text. ' * 80}</p>{images}"
+        f"<h2>{heading}</h2>{quotes}<h2>Contacts</h2><p>Media relations</p></main>{FOOTER_CHROME}</body></html>"
+    )
+
+
+@lru_cache(maxsize=64)
+def png_bytes(number: int, size: Tuple[int, int] = (64, 48)) -> bytes:
+    buffer = BytesIO()
+    image = Image.new("RGB", size, (number * 37 % 256, number * 91 % 256, 120))
+    if size[0] * size[1] > 64 * 48:
+        # Noise, so a large photo stays large once compressed.
+        image.paste(Image.effect_noise(size, 64).convert("RGB"), mask=Image.new("L", size, number * 13 % 128 + 64))
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        photo_size: Tuple[int, int] = (64, 48),
+        capacity: int = 0,
+        retry_after: float = 1.0,
+    ) -> None:
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.photo_size = photo_size
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.revisions: Dict[int, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def begin(self) -> float:
+        # The delay for this response, or -1 when it is throttled.
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if not self.capacity:
+                return self.latency
+            if self.in_flight > 2 * self.capacity:
+                self.throttled += 1
+                return -1.0
+            return self.latency * max(1.0, self.in_flight / self.capacity)
+
+    def end(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        delay = self.server.begin()
+        try:
+            if delay < 0:
+                self.send_response(429)
+                self.send_header("Retry-After", f"{self.server.retry_after:g}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            time.sleep(delay)
+            parts = self.path.strip("/").split("/")
+            status = 200
+            if parts[0] == "images" and len(parts) == 3:
+                body, content_type = png_bytes(int(parts[1]), self.server.photo_size), "image/png"
+            elif parts[0] in ("en", "fr") and len(parts) == 3 and parts[2].isdigit():
+                number = int(parts[2])
+                html = article_html(number, parts[0], self.server.revisions.get(number, 0))
+                body, content_type = html.encode(), "text/html; charset=utf-8"
+            else:
+                status, body, content_type = 404, b"Not found", "text/plain"
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                with self.server.lock:
+                    self.server.not_modified += 1
+                status, body = 304, b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            self.server.end()
+
+
+def start_server(
+    latency: float = 0.0,
+    port: int = 0,
+    photo_size: Tuple[int, int] = (64, 48),
+    capacity: int = 0,
+    retry_after: float = 1.0,
+) -> StandInServer:
+    # Serves from a daemon thread; call shutdown() and server_close() when done.
+    server = StandInServer(("127.0.0.1", port), latency, photo_size, capacity, retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_news_rows(base_url: str, count: int) -> List[Dict[str, str]]:
+    rows = []
+    for number in range(1, count + 1):
+        rows.append(
+            {
+                "hash": hashlib.sha256(f"article {number}".encode()).hexdigest()[:16],
+                "PUBDATE": f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d} 10:00:00",
+                "TITLE_TEXT_EN": f"Article {number}",
+                "TITLE_URL_EN": f"{base_url}/en/news/{number}",
+                "TITLE_TEXT_FR": f"Article {number}",
+                "TITLE_URL_FR": f"{base_url}/fr/nouvelles/{number}",
+                "TYPE_EN": "News releases",
+                "DEPT_EN": f"Department {number % 5}",
+            }
+        )
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve stand-in canada.ca article pages locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before each response")
+    parser.add_argument("--photo-size", default="64x48", help="WIDTHxHEIGHT of the article photos")
+    parser.add_argument("--capacity", type=int, default=0, help="Requests in flight before throttling, 0 for none")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of a throttled response")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    width, height = (int(value) for value in args.photo_size.split("x"))
+    server = StandInServer(("127.0.0.1", args.port), args.latency, (width, height), args.capacity, args.retry_after)
+    print(f"Serving stand-in articles on {server.base_url}/en/news/<n> and {server.base_url}/fr/nouvelles/<n>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Dependency-free SVG writer for the heatmap charts.
+
+render_heatmap() turns a (rows, columns) count matrix into a standalone SVG with
+Viridis cells, date ticks on the x axis, row labels, axis titles and a colour bar
+legend, laid out like the plotly figure it replaces, without starting plotly or
+a headless browser (kaleido) to export it.
+
+Compare cold-start time with the plotly path:  python -m scripts.svg_charts --benchmark
+"""
+
+import argparse
+import datetime
+import math
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# plotly's "Viridis" colorscale, evenly spaced stops
+VIRIDIS = [
+    "#440154", "#482878", "#3e4989", "#31688e", "#26828e",
+    "#1f9e89", "#35b779", "#6ece58", "#b5de2b", "#fde725",
+]
+FONT = "font-family=\"'Open Sans', verdana, arial, sans-serif\""
+TEXT_COLOUR = "#444"
+
+
+class Layout(NamedTuple):
+    width: int = 700
+    height: int = 800
+    left: int = 160
+    right: int = 85  # room for the colour bar and its labels
+    top: int = 80
+    bottom: int = 83
+    bar_gap: int = 12
+    bar_width: int = 18
+
+
+def hex_rgb(colour: str) -> Tuple[int, int, int]:
+    return int(colour[1:3], 16), int(colour[3:5], 16), int(colour[5:7], 16)
+
+
+def colour_at(fraction: float, stops: Sequence[str] = VIRIDIS) -> str:
+    position = min(max(fraction, 0.0), 1.0) * (len(stops) - 1)
+    low = min(int(position), len(stops) - 2)
+    weight = position - low
+    start, end = hex_rgb(stops[low]), hex_rgb(stops[low + 1])
+    return "#" + "".join(f"{round(a + (b - a) * weight):02x}" for a, b in zip(start, end))
+
+
+def nice_ticks(low: float, high: float, target: int = 6) -> List[float]:
+    if high <= low:
+        return [low]
+    raw = (high - low) / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step) * step
+    return [first + index * step for index in range(int((high - first) / step + 1e-9) + 1)]
+
+
+def date_ticks(dates: Sequence[datetime.date], max_ticks: int = 12) -> List[int]:
+    # Month starts when they are sparse enough, otherwise evenly spaced days.
+    month_starts = [index for index, date in enumerate(dates) if date.day == 1]
+    if 2 <= len(month_starts) <= max_ticks:
+        return month_starts
+    step = max(1, math.ceil(len(dates) / max_ticks))
+    return list(range(0, len(dates), step))
+
+
+def text(x: float, y: float, value: str, anchor: str = "middle", size: int = 12, extra: str = "") -> str:
+    return (
+        f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" {FONT} font-size="{size}" '
+        f'fill="{TEXT_COLOUR}"{extra}>{escape(value)}</text>'
+    )
+
+
+def render_heatmap(
+    matrix: np.ndarray,
+    row_labels: Sequence[str],
+    dates: Sequence[datetime.date],
+    title: str,
+    x_title: str = "Date",
+    y_title: str = "",
+    legend_title: str = "Count",
+    layout: Layout = Layout(),
+) -> str:
+    # Row 0 is drawn at the bottom, as plotly does.
+    matrix = np.asarray(matrix, dtype=float).reshape(len(row_labels), len(dates))
+    zmin = float(matrix.min()) if matrix.size else 0.0
+    zmax = float(matrix.max()) if matrix.size else 1.0
+    span = zmax - zmin or 1.0
+    plot_width = layout.width - layout.left - layout.right
+    plot_height = layout.height - layout.top - layout.bottom
+    cell_width = plot_width / max(len(dates), 1)
+    cell_height = plot_height / max(len(row_labels), 1)
+    plot_bottom = layout.top + plot_height
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width}" height="{layout.height}" '
+        f'viewBox="0 0 {layout.width} {layout.height}">',
+        f'<rect x="0" y="0" width="{layout.width}" height="{layout.height}" fill="#fff"/>',
+        text(layout.left / 4, layout.top / 2, title, anchor="start", size=17),
+        '<g shape-rendering="crispEdges">',
+    ]
+    for row in range(len(row_labels)):
+        # One rect per run of equally coloured days keeps the file small.
+        colours = [colour_at((value - zmin) / span) for value in matrix[row]]
+        parts.append(f'<g transform="translate(0 {plot_bottom - (row + 1) * cell_height:.2f})">')
+        start = 0
+        for column in range(1, len(colours) + 1):
+            if column < len(colours) and colours[column] == colours[start]:
+                continue
+            parts.append(
+                f'<rect x="{layout.left + start * cell_width:.2f}" width="{(column - start) * cell_width + 0.05:.2f}" '
+                f'height="{cell_height + 0.05:.2f}" fill="{colours[start]}"/>'
+            )
+            start = column
+        parts.append("</g>")
+    parts.append("</g>")
+
+    # Row labels and date ticks
+    for row, label in enumerate(row_labels):
+        y = plot_bottom - (row + 0.5) * cell_height
+        parts.append(text(layout.left - 6, y + 4, str(label), anchor="end"))
+    year = None
+    for column in date_ticks(dates):
+        x = layout.left + (column + 0.5) * cell_width
+        parts.append(f'<line x1="{x:.1f}" y1="{plot_bottom}" x2="{x:.1f}" y2="{plot_bottom + 5}" stroke="{TEXT_COLOUR}"/>')
+        parts.append(text(x, plot_bottom + 19, dates[column].strftime("%b %d")))
+        # The year goes under the first tick and wherever it changes.
+        if dates[column].year != year:
+            year = dates[column].year
+            parts.append(text(x, plot_bottom + 34, str(year)))
+    parts.append(text(layout.left + plot_width / 2, layout.height - 20, x_title, size=14))
+    if y_title:
+        middle = layout.top + plot_height / 2
+        parts.append(text(20, middle, y_title, size=14, extra=f' transform="rotate(-90 20 {middle:.1f})"'))
+
+    # Colour bar legend
+    bar_x = layout.left + plot_width + layout.bar_gap
+    parts.append('<defs><linearGradient id="colour-scale" x1="0" y1="1" x2="0" y2="0">')
+    for index, colour in enumerate(VIRIDIS):
+        parts.append(f'<stop offset="{index / (len(VIRIDIS) - 1):.4f}" stop-color="{colour}"/>')
+    parts.append("</linearGradient></defs>")
+    parts.append(
+        f'<rect x="{bar_x}" y="{layout.top}" width="{layout.bar_width}" height="{plot_height}" '
+        f'fill="url(#colour-scale)"/>'
+    )
+    parts.append(text(bar_x, layout.top - 10, legend_title, anchor="start"))
+    for tick in nice_ticks(zmin, zmax):
+        y = plot_bottom - (tick - zmin) / span * plot_height
+        parts.append(
+            f'<line x1="{bar_x + layout.bar_width}" y1="{y:.1f}" x2="{bar_x + layout.bar_width + 4}" '
+            f'y2="{y:.1f}" stroke="{TEXT_COLOUR}"/>'
+        )
+        parts.append(text(bar_x + layout.bar_width + 7, y + 4, f"{tick:g}", anchor="start"))
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def write_heatmap(out: Path, *args, **kwargs) -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(render_heatmap(*args, **kwargs), encoding="utf-8")
+
+
+BENCHMARK_SETUP = """
+import datetime, numpy as np
+rng = np.random.default_rng(0)
+matrix = rng.poisson(3, (12, 180))
+labels = [f"Type {index}" for index in range(12)]
+dates = [datetime.date(2025, 1, 1) + datetime.timedelta(days=day) for day in range(180)]
+"""
+BENCHMARK_SVG = BENCHMARK_SETUP + """
+from pathlib import Path
+from scripts.svg_charts import write_heatmap
+write_heatmap(Path(OUT), matrix, labels, dates, "benchmark", y_title="TYPE_EN")
+"""
+BENCHMARK_PLOTLY = BENCHMARK_SETUP + """
+import plotly.graph_objects as go
+fig = go.Figure(data=go.Heatmap(z=matrix, x=dates, y=labels, colorscale="Viridis", colorbar=dict(title="Count")))
+fig.update_layout(title="benchmark", height=800, margin=dict(l=160, r=40, t=80, b=60))
+fig.write_image(OUT)
+"""
+
+
+def time_script(source: str, out: str) -> Tuple[Optional[float], str]:
+    # A fresh interpreter each time, as a workflow step starts one.
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", f"OUT = {out!r}\n" + source],
+        cwd=str(Path(__file__).resolve().parents[1]),
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        return None, (result.stderr.strip().splitlines() or ["failed"])[-1]
+    return elapsed, f"{Path(out).stat().st_size / 1024:.0f} KiB"
+
+
+def run_benchmark(repeats: int) -> int:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, source in [("native svg", BENCHMARK_SVG), ("plotly + kaleido", BENCHMARK_PLOTLY)]:
+            runs = [time_script(source, str(Path(tmp) / f"{index}.svg")) for index in range(repeats)]
+            if runs[-1][0] is None:
+                print(f"{name:<18} unavailable ({runs[-1][1]})")
+                continue
+            best = min(seconds for seconds, _ in runs)
+            print(f"{name:<18} best of {repeats}: {best:6.2f}s  ({runs[-1][1]})")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the native SVG heatmap writer against plotly.")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        sys.exit(run_benchmark(args.repeats))
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+from bs4.builder import builder_registry
+
+from scripts.extract_news_quotes import HTML_PARSERS
+from scripts.golden_pages import check_corpus, load_corpus, reference_summary
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "golden_pages")
+
+
+def test_expected_output_is_the_reference_parse():
+    for url, lang, html, entry in load_corpus(CORPUS):
+        assert reference_summary(url, html, lang) == {field: entry[field] for field in ("quotes", "speakers", "images")}
+
+
+@pytest.mark.parametrize("parser", HTML_PARSERS)
+def test_extractor_matches_the_golden_pages(parser):
+    if builder_registry.lookup(parser) is None:
+        pytest.skip(f"{parser} is not installed")
+    assert check_corpus(CORPUS, parser) == 0
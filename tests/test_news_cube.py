@@ -0,0 +1,70 @@
+import pandas as pd
+
+from scripts.news_cube import cube_matches_csv, open_cube, read_cube, update_cube
+from scripts.news_index import build_index, incremental_merge
+
+HEADER = ["hash", "PUBDATE", "TITLE_TEXT_EN", "TITLE_URL_EN", "DEPT_EN", "TYPE_EN", "LOCATION_EN", "TOPIC_EN"]
+
+
+def release(day: int, dept: str = "Health Canada") -> list:
+    return [
+        f"h{day:02d}",
+        f"2026-03-{day:02d} 09:00:00",
+        f"Release {day}",
+        f"https://www.canada.ca/en/news/{day}.html",
+        dept,
+        "News releases",
+        "Ottawa",
+        "Health",
+    ]
+
+
+def write_rows(path, rows) -> None:
+    pd.DataFrame(rows, columns=HEADER).to_csv(path, index=False)
+
+
+def dept_total(cube, dept: str) -> int:
+    dim = cube.dims["DEPT_EN"]
+    code = dim.labels.index(dept)
+    return int(dim.cell_count[(dim.cell_key >> 32) == code].sum())
+
+
+def test_cube_is_rebuilt_after_a_mid_file_insert(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_rows("combined_news.csv", [release(1), release(3)])
+    assert open_cube("combined_news.csv").rows == 2
+
+    # Same last row, one more row before it.
+    write_rows("combined_news.csv", [release(1), release(2, "Finance Canada"), release(3)])
+    cube = open_cube("combined_news.csv")
+    assert cube.rows == 3
+    assert dept_total(cube, "Finance Canada") == 1
+
+
+def test_appended_rows_keep_the_cube_current(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_rows("combined_news.csv", [release(1), release(2)])
+    build_index("combined_news.csv", "index.csv")
+    open_cube("combined_news.csv")
+
+    feed = pd.DataFrame([release(2), release(3, "Finance Canada")], columns=HEADER)
+    assert incremental_merge("combined_news.csv", feed, "index.csv") == "appended"
+    assert update_cube("combined_news.csv", feed, "index.csv") == "appended"
+    cube = read_cube()
+    assert cube_matches_csv(cube, "combined_news.csv")
+    assert cube.rows == 3
+    assert dept_total(cube, "Finance Canada") == 1
+
+
+def test_append_discards_a_cube_older_than_the_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_rows("combined_news.csv", [release(1), release(3)])
+    open_cube("combined_news.csv")
+    # Rewritten by a full merge the cube never saw: same row count, same last row.
+    write_rows("combined_news.csv", [release(2, "Finance Canada"), release(3)])
+    build_index("combined_news.csv", "index.csv")
+
+    feed = pd.DataFrame([release(4)], columns=HEADER)
+    assert incremental_merge("combined_news.csv", feed, "index.csv") == "appended"
+    assert update_cube("combined_news.csv", feed, "index.csv") == "discarded"
+    assert read_cube() is None
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from scripts.news_index import incremental_merge, load_index
+
+HEADER = ["hash", "PUBDATE", "TITLE_TEXT_EN", "TITLE_URL_EN", "TEASER"]
+
+
+def write_rows(path, rows) -> None:
+    pd.DataFrame(rows, columns=HEADER).to_csv(path, index=False)
+
+
+def test_append_keeps_rows_with_unicode_line_breaks_whole(tmp_path):
+    csv_path = tmp_path / "combined_news.csv"
+    index_path = tmp_path / "combined_news_index.csv"
+    old = ["aaa", "2026-03-09 09:00:00", "Old release", "https://www.canada.ca/en/old.html", "Plain teaser"]
+    new = [
+        "bbb",
+        "2026-03-10 09:00:00",
+        "New release",
+        "https://www.canada.ca/en/new.html",
+        "First line\u2028second line\u0085third line",
+    ]
+    write_rows(csv_path, [old])
+
+    assert incremental_merge(str(csv_path), pd.DataFrame([old, new], columns=HEADER), str(index_path)) == "appended"
+
+    merged = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    assert merged.values.tolist() == [old, new]
+    _, entries = load_index(str(index_path))
+    assert [entry["hash"] for entry in entries] == ["aaa", "bbb"]
@@ -0,0 +1,27 @@
+from scripts.news_pairing import pair_feeds
+
+
+def entry(url: str, minister: str, pubdate: str = "2026-03-10 09:00:00") -> dict:
+    return {"PUBDATE": pubdate, "MINISTER": minister, "TITLE": f"<a href='{url}'>Title</a>"}
+
+
+def test_fallback_rejects_releases_sharing_only_common_tokens():
+    news_en = [entry("https://www.canada.ca/en/health-canada/news/2026/03/canada-invests-in-health.html", "Hon. Health Minister")]
+    news_fr = [
+        entry(
+            "https://www.canada.ca/fr/patrimoine-canadien/nouvelles/2026/03/le-canada-celebre-les-arts.html",
+            "L'hon. Heritage Minister",
+        )
+    ]
+    pairs, unmatched_en, unmatched_fr = pair_feeds(news_en, news_fr)
+    assert pairs == []
+    assert unmatched_en == news_en
+    assert unmatched_fr == news_fr
+
+
+def test_fallback_pairs_releases_sharing_names_and_numbers():
+    news_en = [entry("https://www.canada.ca/en/finance/news/2026/03/minister-doersen-tables-budget-2026.html", "Hon. Jane Doersen")]
+    news_fr = [entry("https://www.canada.ca/fr/finances/nouvelles/2026/03/la-ministre-doersen-depose-le-budget-2026.html", "")]
+    pairs, unmatched_en, unmatched_fr = pair_feeds(news_en, news_fr)
+    assert pairs == [(news_en[0], news_fr[0])]
+    assert unmatched_en == unmatched_fr == []
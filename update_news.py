@@ -3,6 +3,8 @@ import pandas as pd
 import re
 import requests
 
+from scripts.news_pairing import normalize_minister_name, pair_feeds
+
 # Function to fetch data from a URL
 def fetch_json_data(url):
     response = requests.get(url)
@@ -46,14 +48,6 @@ def extract_title_url(entry):
     entry['TITLE_URL_FR'] = clean_text(title_url_fr)
     return entry
 
-# Function to normalize Minister names
-def normalize_minister_name(name):
-    if name.startswith("Hon. "):
-        return name.replace("Hon. ", "")
-    elif name.startswith("L'hon. "):
-        return name.replace("L'hon. ", "")
-    return name
-
 # Main function to fetch data, process it, and return the DataFrame
 def main():
     url_en = "https://www.canada.ca/en/news.datatable.json"
@@ -81,39 +75,35 @@ def main():
             entry[key] = clean_text(entry[key])
     
     # Combine the data into a single DataFrame based on timestamp and minister name
+    pairs, unmatched_en, unmatched_fr = pair_feeds(news_en, news_fr)
+    if unmatched_en or unmatched_fr:
+        print(f"Unpaired feed entries: {len(unmatched_en)} English, {len(unmatched_fr)} French")
     combined_data = []
-    for en in news_en:
-        match_fr = None
-        for fr in news_fr:
-            if (en.get("PUBDATE") == fr.get("PUBDATE") and
-                normalize_minister_name(en.get("MINISTER", "")) == normalize_minister_name(fr.get("MINISTER", ""))):
-                match_fr = fr
-                break
-        if match_fr:
-            combined_entry = {
-                "PUBDATE": en.get("PUBDATE", ""),
-                "TITLE_EN": en.get("TITLE", ""),
-                "TEASER_EN": en.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_EN": en.get("AUDIENCE", ""),
-                "TYPE_EN": en.get("TYPE", ""),
-                "DEPT_EN": en.get("DEPT", ""),
-                "LOCATION_EN": en.get("LOCATION", ""),
-                "MINISTER_EN": en.get("MINISTER", ""),
-                "TOPIC_EN": en.get("TOPIC", ""),
-                "SUBJECT_EN": en.get("SUBJECT", ""),
-                "TITLE_FR": match_fr.get("TITLE", ""),
-                "TEASER_FR": match_fr.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
-                "TYPE_FR": match_fr.get("TYPE", ""),
-                "DEPT_FR": match_fr.get("DEPT", ""),
-                "LOCATION_FR": match_fr.get("LOCATION", ""),
-                "MINISTER_FR": match_fr.get("MINISTER", ""),
-                "TOPIC_FR": match_fr.get("TOPIC", ""),
-                "SUBJECT_FR": match_fr.get("SUBJECT", "")
-            }
-            combined_data.append(extract_title_url(combined_entry))
+    for en, match_fr in pairs:
+        combined_entry = {
+            "PUBDATE": en.get("PUBDATE", ""),
+            "TITLE_EN": en.get("TITLE", ""),
+            "TEASER_EN": en.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_EN": en.get("AUDIENCE", ""),
+            "TYPE_EN": en.get("TYPE", ""),
+            "DEPT_EN": en.get("DEPT", ""),
+            "LOCATION_EN": en.get("LOCATION", ""),
+            "MINISTER_EN": en.get("MINISTER", ""),
+            "TOPIC_EN": en.get("TOPIC", ""),
+            "SUBJECT_EN": en.get("SUBJECT", ""),
+            "TITLE_FR": match_fr.get("TITLE", ""),
+            "TEASER_FR": match_fr.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
+            "TYPE_FR": match_fr.get("TYPE", ""),
+            "DEPT_FR": match_fr.get("DEPT", ""),
+            "LOCATION_FR": match_fr.get("LOCATION", ""),
+            "MINISTER_FR": match_fr.get("MINISTER", ""),
+            "TOPIC_FR": match_fr.get("TOPIC", ""),
+            "SUBJECT_FR": match_fr.get("SUBJECT", "")
+        }
+        combined_data.append(extract_title_url(combined_entry))
     
     # Create a DataFrame
     df_combined = pd.DataFrame(combined_data)
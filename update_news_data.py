@@ -1,17 +1,15 @@
+import argparse
 import json
 import pandas as pd
 import re
-import requests
-import hashlib
-import time
-
-# Function to fetch data from a URL
-def fetch_json_data(url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return None
+
+from scripts.feed_fetch import FEED_CACHE_DIR, FEED_STATE_PATH, fetch_feeds, load_feed_state, write_feed_state
+from scripts.news_cube import CUBE_DIR, discard_cube, update_cube
+from scripts.news_index import INDEX_PATH, build_index, incremental_merge
+from scripts.news_pairing import normalize_minister_name, pair_feeds
+from scripts.news_store import ensure_imported, export_csv, frame_rows, open_store, upsert_rows
+from scripts.partitioned_tables import split_table
+from scripts.row_hashing import hash_frame
 
 # Function to clean text by removing newline characters
 def clean_text(text):
@@ -48,36 +46,84 @@ def extract_title_url(entry):
     entry['TITLE_URL_FR'] = clean_text(title_url_fr)
     return entry
 
-# Function to normalize Minister names
-def normalize_minister_name(name):
-    if name.startswith("Hon. "):
-        return name.replace("Hon. ", "")
-    elif name.startswith("L'hon. "):
-        return name.replace("L'hon. ", "")
-    return name
-
-# Function to compute MD5 hash of a row
-def hash_row(row):
-    # Sort the items by column names to ensure consistent order
-    items = row.fillna('').items()
-    sorted_items = sorted(items, key=lambda x: x[0])
-    row_str = ','.join(str(value) for key, value in sorted_items)
-    return hashlib.md5(row_str.encode()).hexdigest()
-
-# Main function to fetch data, process it, and return the DataFrame
-def main():
-    timestamp = int(time.time() * 1000)
-    url_en = f"https://www.canada.ca/en/news.datatable.json?_={timestamp}"
-    url_fr = f"https://www.canada.ca/fr/nouvelles.datatable.json?_={timestamp}"
-
-    # Fetch the JSON data
-    data_en = fetch_json_data(url_en)
-    data_fr = fetch_json_data(url_fr)
-
-    if data_en is None or data_fr is None:
-        print("Failed to fetch data from URLs.")
-        return None
+# Function to merge new rows into the existing CSV by re-reading and rewriting all of it
+def full_merge(existing_csv_path, new_data):
+    try:
+        existing_data = pd.read_csv(existing_csv_path)
+        existing_data['PUBDATE'] = pd.to_datetime(existing_data['PUBDATE'])
+
+        # Check if 'hash' column exists in the existing data
+        if 'hash' not in existing_data.columns:
+            # Compute the hash for the existing data
+            existing_data['hash'] = hash_frame(existing_data)
+            print("Backfilled 'hash' column for existing data.")
+
+        # Define the unique identifier columns
+        id_columns = ['PUBDATE', 'TITLE_TEXT_EN', 'TITLE_URL_EN']
+
+        # Combine data and remove duplicates based on unique identifiers
+        combined_data = pd.concat([existing_data, new_data], ignore_index=True)
+        combined_data.drop_duplicates(subset=id_columns, keep='last', inplace=True)
 
+    except FileNotFoundError:
+        # If the file does not exist, use new data as the combined data
+        combined_data = new_data.copy()
+        print("Created new data with 'hash' column.")
+
+    # Sort oldest first so new rows append at the end and CSV diffs stay small.
+    combined_data = combined_data.sort_values(
+        by=['PUBDATE', 'TITLE_TEXT_EN'], ascending=[True, True], kind='mergesort'
+    )
+
+    # Save the updated CSV file
+    combined_data.to_csv(existing_csv_path, index=False)
+    print(f"Updated combined CSV saved to {existing_csv_path}")
+
+# Function to upsert the new rows into the SQLite store and regenerate the CSV from it
+def store_merge(store_path, existing_csv_path, new_data):
+    conn = open_store(store_path)
+    ensure_imported(conn, 'news', existing_csv_path)
+    upserted = upsert_rows(conn, 'news', frame_rows(new_data))
+    export_csv(conn, 'news', existing_csv_path)
+    conn.close()
+    print(f"Upserted {upserted} rows into {store_path} and exported {existing_csv_path}")
+
+# Function to report feed entries that have no counterpart in the other language
+def report_unmatched(unmatched_en, unmatched_fr):
+    for label, entries in (("English", unmatched_en), ("French", unmatched_fr)):
+        if not entries:
+            continue
+        print(f"{len(entries)} {label} feed entries could not be paired:")
+        for entry in entries:
+            print(f"  {entry.get('PUBDATE', '')} {entry.get('TITLE', '')}")
+
+# Function to parse command line options
+def parse_args():
+    parser = argparse.ArgumentParser(description="Merge the canada.ca news feeds into combined_news.csv.")
+    parser.add_argument("--force", action="store_true", help="Merge even if neither feed changed since the last run")
+    parser.add_argument("--feed-state", default=FEED_STATE_PATH)
+    parser.add_argument("--feed-cache-dir", default=FEED_CACHE_DIR)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Append new rows using the sidecar index instead of rewriting the whole CSV",
+    )
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--cube-dir", default=CUBE_DIR, help="Saved chart count cube to keep in step with the CSV")
+    parser.add_argument(
+        "--store",
+        default="",
+        help="Upsert into this SQLite store and export combined_news.csv from it",
+    )
+    parser.add_argument(
+        "--partitions",
+        default="",
+        help="Also keep the news as one CSV per PUBDATE month under this directory (scripts/partitioned_tables.py)",
+    )
+    return parser.parse_args()
+
+# Main function to process the fetched feeds and return the DataFrame
+def main(data_en, data_fr):
     news_en = data_en['data']
     news_fr = data_fr['data']
 
@@ -91,40 +137,37 @@ def main():
         for key in entry:
             entry[key] = clean_text(entry[key])
 
-    # Combine the data into a single DataFrame based on timestamp and minister name
+    # Pair the feeds on timestamp and minister name, falling back to the article URLs
+    pairs, unmatched_en, unmatched_fr = pair_feeds(news_en, news_fr)
+    report_unmatched(unmatched_en, unmatched_fr)
+
+    # Combine the data into a single DataFrame
     combined_data = []
-    for en in news_en:
-        match_fr = None
-        for fr in news_fr:
-            if (en.get("PUBDATE") == fr.get("PUBDATE") and
-                normalize_minister_name(en.get("MINISTER", "")) == normalize_minister_name(fr.get("MINISTER", ""))):
-                match_fr = fr
-                break
-        if match_fr:
-            combined_entry = {
-                "PUBDATE": en.get("PUBDATE", ""),
-                "TITLE_EN": en.get("TITLE", ""),
-                "TEASER_EN": en.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_EN": en.get("AUDIENCE", ""),
-                "TYPE_EN": en.get("TYPE", ""),
-                "DEPT_EN": en.get("DEPT", ""),
-                "LOCATION_EN": en.get("LOCATION", ""),
-                "MINISTER_EN": en.get("MINISTER", ""),
-                "TOPIC_EN": en.get("TOPIC", ""),
-                "SUBJECT_EN": en.get("SUBJECT", ""),
-                "TITLE_FR": match_fr.get("TITLE", ""),
-                "TEASER_FR": match_fr.get("TEASER", ""),
-                "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
-                "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
-                "TYPE_FR": match_fr.get("TYPE", ""),
-                "DEPT_FR": match_fr.get("DEPT", ""),
-                "LOCATION_FR": match_fr.get("LOCATION", ""),
-                "MINISTER_FR": match_fr.get("MINISTER", ""),
-                "TOPIC_FR": match_fr.get("TOPIC", ""),
-                "SUBJECT_FR": match_fr.get("SUBJECT", "")
-            }
-            combined_data.append(extract_title_url(combined_entry))
+    for en, match_fr in pairs:
+        combined_entry = {
+            "PUBDATE": en.get("PUBDATE", ""),
+            "TITLE_EN": en.get("TITLE", ""),
+            "TEASER_EN": en.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_EN": en.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_EN": en.get("AUDIENCE", ""),
+            "TYPE_EN": en.get("TYPE", ""),
+            "DEPT_EN": en.get("DEPT", ""),
+            "LOCATION_EN": en.get("LOCATION", ""),
+            "MINISTER_EN": en.get("MINISTER", ""),
+            "TOPIC_EN": en.get("TOPIC", ""),
+            "SUBJECT_EN": en.get("SUBJECT", ""),
+            "TITLE_FR": match_fr.get("TITLE", ""),
+            "TEASER_FR": match_fr.get("TEASER", ""),
+            "ADDITIONAL_TOPICS_FR": match_fr.get("ADDITIONAL_TOPICS", ""),
+            "AUDIENCE_FR": match_fr.get("AUDIENCE", ""),
+            "TYPE_FR": match_fr.get("TYPE", ""),
+            "DEPT_FR": match_fr.get("DEPT", ""),
+            "LOCATION_FR": match_fr.get("LOCATION", ""),
+            "MINISTER_FR": match_fr.get("MINISTER", ""),
+            "TOPIC_FR": match_fr.get("TOPIC", ""),
+            "SUBJECT_FR": match_fr.get("SUBJECT", "")
+        }
+        combined_data.append(extract_title_url(combined_entry))
 
     # Create a DataFrame
     df_combined = pd.DataFrame(combined_data)
@@ -158,45 +201,55 @@ def main():
     return df_combined_ordered
 
 if __name__ == "__main__":
-    new_data = main()
+    args = parse_args()
+
+    # Fetch both feeds, sending the stored validators so unchanged feeds cost a 304
+    feed_state = load_feed_state(args.feed_state)
+    feeds = fetch_feeds(feed_state, cache_dir=args.feed_cache_dir)
+
+    new_data = None
+    if feeds is None:
+        print("Failed to fetch data from URLs.")
+    elif not args.force and not any(feed.changed for feed in feeds.values()):
+        print("Neither news feed changed since the last run; skipping merge.")
+    else:
+        new_data = main(feeds['en'].data, feeds['fr'].data)
+
     if new_data is not None:
         # Compute the hash for the new data
-        new_data['hash'] = new_data.apply(hash_row, axis=1)
+        new_data['hash'] = hash_frame(new_data)
 
         # Move the 'hash' column to the first position
         columns = new_data.columns.tolist()
         columns.insert(0, columns.pop(columns.index('hash')))
         new_data = new_data[columns]
 
-        # Load the existing CSV
         existing_csv_path = 'combined_news.csv'
-        try:
-            existing_data = pd.read_csv(existing_csv_path)
-            existing_data['PUBDATE'] = pd.to_datetime(existing_data['PUBDATE'])
-
-            # Check if 'hash' column exists in the existing data
-            if 'hash' not in existing_data.columns:
-                # Compute the hash for the existing data
-                existing_data['hash'] = existing_data.apply(hash_row, axis=1)
-                print("Backfilled 'hash' column for existing data.")
-
-            # Define the unique identifier columns
-            id_columns = ['PUBDATE', 'TITLE_TEXT_EN', 'TITLE_URL_EN']
-
-            # Combine data and remove duplicates based on unique identifiers
-            combined_data = pd.concat([existing_data, new_data], ignore_index=True)
-            combined_data.drop_duplicates(subset=id_columns, keep='last', inplace=True)
-
-        except FileNotFoundError:
-            # If the file does not exist, use new data as the combined data
-            combined_data = new_data.copy()
-            print("Created new data with 'hash' column.")
-
-        # Sort oldest first so new rows append at the end and CSV diffs stay small.
-        combined_data = combined_data.sort_values(
-            by=['PUBDATE', 'TITLE_TEXT_EN'], ascending=[True, True], kind='mergesort'
-        )
-
-        # Save the updated CSV file
-        combined_data.to_csv(existing_csv_path, index=False)
-        print(f"Updated combined CSV saved to {existing_csv_path}")
+        merged = None
+        if args.store:
+            store_merge(args.store, existing_csv_path, new_data)
+            merged = "stored"
+        elif args.incremental:
+            # Append only the genuinely new rows; cost follows the feed, not the archive
+            merged = incremental_merge(existing_csv_path, new_data, args.index)
+            if merged is None:
+                print("Incremental merge not possible; falling back to a full merge.")
+
+        if merged is None:
+            full_merge(existing_csv_path, new_data)
+            if args.incremental:
+                build_index(existing_csv_path, args.index)
+
+        # Extend the chart cube with appended rows; any other rewrite leaves it stale
+        if merged == "appended":
+            print(f"Chart cube: {update_cube(existing_csv_path, new_data, args.index, args.cube_dir)}")
+        elif merged != "unchanged":
+            discard_cube(args.cube_dir)
+
+        # Only the months the merge touched are rewritten
+        if args.partitions and merged != "unchanged":
+            rewritten, total = split_table(args.partitions, 'news', existing_csv_path)
+            print(f"News partitions: {rewritten} of {total} rewritten under {args.partitions}")
+
+        # Only remember the feed digests once their rows are safely written
+        write_feed_state({lang: feed.state for lang, feed in feeds.items()}, args.feed_state)